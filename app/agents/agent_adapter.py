@@ -4,21 +4,73 @@ Agent Adapter Module for the Bahai Life Coach.
 This module provides a simplified interface for accessing the LifeCoachAgent.
 """
 
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, Iterator, AsyncIterator
+import asyncio
 import logging
 import os
 import json
 import uuid
+import threading
 
-from app.models.llm import get_llm_model
+from app.models.llm import get_llm_client
+from app.models.rate_limiter import RateLimitExceeded
 from app.utils.memory_db import MemoryDB
-from app.agents.life_coach_agent import LifeCoachAgent
-from app.config.settings import ENABLE_MEMORY_TRACKING
+from app.utils.deadline import Deadline
+from app.agents.async_life_coach_agent import AsyncLifeCoachAgent
+from app.agents.session_registry import get_session_registry
+from app.config.settings import ENABLE_MEMORY_TRACKING, REFLECTION_QUESTIONS_WAIT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class SessionLock:
+    """
+    Lock serializing the turns of one conversation across every entry point.
+    
+    Flask routes (directly or through WsgiToAsgi) hold it from request
+    threads with `with`, native ASGI routes from the event loop with
+    `async with`, so a turn in one can never interleave with a turn or
+    end_session in the other. Waiting for it asynchronously happens in a
+    worker thread, so a busy session never blocks the event loop; the lock
+    is not reentrant.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+    
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._lock.acquire(blocking, timeout)
+    
+    def release(self) -> None:
+        self._lock.release()
+    
+    def locked(self) -> bool:
+        return self._lock.locked()
+    
+    def __enter__(self) -> "SessionLock":
+        self._lock.acquire()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self._lock.release()
+    
+    async def __aenter__(self) -> "SessionLock":
+        if self._lock.acquire(blocking=False):
+            return self
+        
+        waiter = asyncio.get_running_loop().run_in_executor(None, self._lock.acquire)
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The waiting thread still gets the lock; hand it back once it does
+            waiter.add_done_callback(lambda _: self._lock.release())
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._lock.release()
+
 class AgentAdapter:
     """
     Adapter class to provide a unified interface for different agent implementations.
@@ -41,10 +93,10 @@ class AgentAdapter:
         self.google_enabled = google_enabled
         self.include_memories = include_memories
         
-        # Initialize LLM using singleton pattern
+        # Get the pooled LLM client for this model
         # Note: We're not using llm directly in this class anymore, but keeping
         # the initialization for consistency and potential future use
-        self.llm = get_llm_model()
+        self.llm = get_llm_client(llm_model)
         
         # Set conversation ID
         self.conversation_id = conversation_id or str(uuid.uuid4())
@@ -55,6 +107,10 @@ class AgentAdapter:
         # Initialize agent implementation
         self.agent = self._initialize_agent()
         
+        # Serialize turns of the same conversation across request threads
+        # (the Flask routes) and tasks on the event loop (the ASGI routes)
+        self.lock = SessionLock()
+        
         logger.info(f"Agent initialized with model: {llm_model}, "
                     f"conversation_id: {self.conversation_id}, "
                     f"google_enabled: {google_enabled}, "
@@ -65,27 +121,75 @@ class AgentAdapter:
         Initialize the appropriate agent implementation.
         """
         # Pass user_id as conversation_id to maintain existing behavior
-        # This approach ensures backward compatibility
-        return LifeCoachAgent(
+        # This approach ensures backward compatibility. The async agent keeps the
+        # synchronous interface, so the session can serve both entry points.
+        return AsyncLifeCoachAgent(
             conversation_id=self.conversation_id,
             google_enabled=self.google_enabled,
             llm_model=self.llm_model,
             include_memories=self.include_memories
         )
     
-    def process_input(self, user_input: str) -> Tuple[str, Dict[str, Any]]:
+    def update_settings(self,
+                        llm_model: Optional[str] = None,
+                        google_enabled: Optional[bool] = None,
+                        include_memories: Optional[bool] = None) -> None:
+        """
+        Apply per-request settings to a warm session without rebuilding the agent.
+        
+        Args:
+            llm_model: The LLM model to use from now on
+            google_enabled: Whether to enable Google search integration
+            include_memories: Whether to include memories in the prompt
+        """
+        with self.lock:
+            if llm_model and llm_model != self.llm_model:
+                self.agent.set_llm_model(llm_model)
+                self.llm_model = llm_model
+            if google_enabled is not None:
+                self.google_enabled = google_enabled
+            if include_memories is not None:
+                self.include_memories = include_memories
+                self.agent.include_memories = include_memories
+    
+    def busy(self) -> bool:
+        """Check whether a turn (or another locked operation) is in progress."""
+        return self.lock.locked()
+    
+    def suspend(self, blocking: bool = True) -> bool:
+        """
+        Persist the conversation history before the session is evicted,
+        so it can be restored when the conversation continues.
+        
+        Args:
+            blocking: Wait for a turn in progress; otherwise give up at once
+            
+        Returns:
+            True if the history was saved, False if the session was busy
+        """
+        if not self.lock.acquire(blocking):
+            return False
+        try:
+            self.agent.save_transcript()
+        finally:
+            self.lock.release()
+        return True
+    
+    def process_input(self, user_input: str, deadline: Optional[Deadline] = None) -> Tuple[str, Dict[str, Any]]:
         """
         Process user input and return a response.
         
         Args:
             user_input: The user's input message
+            deadline: Optional latency budget for the request
             
         Returns:
             Tuple containing (response_text, metadata)
         """
         try:
             # Get response from agent
-            result = self.agent.provide_coaching(user_input)
+            with self.lock:
+                result = self.agent.provide_coaching(user_input, deadline)
             
             # Extract response and metadata
             response = result.get('response', '')
@@ -93,11 +197,17 @@ class AgentAdapter:
             # Get additional metadata
             metadata = {
                 'conversation_id': self.conversation_id,
-                'insights': result.get('insights', [])
+                'turn': result.get('turn'),
+                'insights': result.get('insights', []),
+                'insights_pending': result.get('insights_pending', False),
+                'skipped_stages': result.get('skipped_stages', [])
             }
             
             return response, metadata
             
+        except RateLimitExceeded:
+            # Surfaced as HTTP 429 with a Retry-After header
+            raise
         except Exception as e:
             logger.error(f"Error processing input: {str(e)}", exc_info=True)
             return f"I'm sorry, I encountered an error processing your request: {str(e)}", {
@@ -105,12 +215,173 @@ class AgentAdapter:
                 'error': str(e)
             }
 
+    def stream_input(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process user input and stream the response as it is generated.
+        
+        Reflection questions generated in the background are pushed as a final
+        'insights' event once ready, after the session lock has been released.
+        
+        Args:
+            user_input: The user's input message
+            
+        Yields:
+            Event dictionaries with a 'type' of 'token', 'done', 'insights' or 'error'
+        """
+        pending_turn = None
+        
+        with self.lock:
+            try:
+                for event in self.agent.stream_coaching(user_input):
+                    if event['type'] == 'token':
+                        yield event
+                    elif event['type'] == 'done':
+                        if event.get('insights_pending'):
+                            pending_turn = event.get('turn')
+                        yield {
+                            'type': 'done',
+                            'response': event.get('response', ''),
+                            'conversation_id': self.conversation_id,
+                            'turn': event.get('turn'),
+                            'insights': event.get('insights', []),
+                            'insights_pending': event.get('insights_pending', False)
+                        }
+                    else:
+                        error_event = {
+                            'type': 'error',
+                            'response': event.get('response', ''),
+                            'conversation_id': self.conversation_id,
+                            'error': event.get('error')
+                        }
+                        if 'retry_after' in event:
+                            error_event['retry_after'] = event['retry_after']
+                        yield error_event
+            except Exception as e:
+                logger.error(f"Error streaming input: {str(e)}", exc_info=True)
+                yield {
+                    'type': 'error',
+                    'response': f"I'm sorry, I encountered an error processing your request: {str(e)}",
+                    'conversation_id': self.conversation_id,
+                    'error': str(e)
+                }
+        
+        # Push the reflection questions as soon as the background job finishes
+        if pending_turn is not None:
+            result = self.agent.get_turn_insights(pending_turn, timeout=REFLECTION_QUESTIONS_WAIT)
+            yield {
+                'type': 'insights',
+                'conversation_id': self.conversation_id,
+                **result
+            }
+
+    async def aprocess_input(self, user_input: str, deadline: Optional[Deadline] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Process user input and return a response without blocking the event loop.
+        
+        Args:
+            user_input: The user's input message
+            deadline: Optional latency budget for the request
+            
+        Returns:
+            Tuple containing (response_text, metadata)
+        """
+        try:
+            async with self.lock:
+                result = await self.agent.aprovide_coaching(user_input, deadline)
+            
+            response = result.get('response', '')
+            metadata = {
+                'conversation_id': self.conversation_id,
+                'turn': result.get('turn'),
+                'insights': result.get('insights', []),
+                'insights_pending': result.get('insights_pending', False),
+                'skipped_stages': result.get('skipped_stages', [])
+            }
+            
+            return response, metadata
+            
+        except RateLimitExceeded:
+            # Surfaced as HTTP 429 with a Retry-After header
+            raise
+        except Exception as e:
+            logger.error(f"Error processing input: {str(e)}", exc_info=True)
+            return f"I'm sorry, I encountered an error processing your request: {str(e)}", {
+                'conversation_id': self.conversation_id,
+                'error': str(e)
+            }
+    
+    async def astream_input(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async counterpart of stream_input().
+        
+        Args:
+            user_input: The user's input message
+            
+        Yields:
+            Event dictionaries with a 'type' of 'token', 'done', 'insights' or 'error'
+        """
+        pending_turn = None
+        
+        async with self.lock:
+            try:
+                async for event in self.agent.astream_coaching(user_input):
+                    if event['type'] == 'token':
+                        yield event
+                    elif event['type'] == 'done':
+                        if event.get('insights_pending'):
+                            pending_turn = event.get('turn')
+                        yield {
+                            'type': 'done',
+                            'response': event.get('response', ''),
+                            'conversation_id': self.conversation_id,
+                            'turn': event.get('turn'),
+                            'insights': event.get('insights', []),
+                            'insights_pending': event.get('insights_pending', False)
+                        }
+                    else:
+                        error_event = {
+                            'type': 'error',
+                            'response': event.get('response', ''),
+                            'conversation_id': self.conversation_id,
+                            'error': event.get('error')
+                        }
+                        if 'retry_after' in event:
+                            error_event['retry_after'] = event['retry_after']
+                        yield error_event
+            except Exception as e:
+                logger.error(f"Error streaming input: {str(e)}", exc_info=True)
+                yield {
+                    'type': 'error',
+                    'response': f"I'm sorry, I encountered an error processing your request: {str(e)}",
+                    'conversation_id': self.conversation_id,
+                    'error': str(e)
+                }
+        
+        # Push the reflection questions once the background job finishes
+        if pending_turn is not None:
+            future = self.agent.turn_insights.get(pending_turn)
+            if future is not None:
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(future), REFLECTION_QUESTIONS_WAIT)
+                except Exception:
+                    pass
+            result = self.agent.get_turn_insights(pending_turn)
+            yield {
+                'type': 'insights',
+                'conversation_id': self.conversation_id,
+                **result
+            }
+
 def get_agent(llm_model: str = 'gemini-2.0-flash',
               google_enabled: bool = False,
               conversation_id: Optional[str] = None,
               include_memories: bool = False) -> AgentAdapter:
     """
-    Factory function to create an agent adapter.
+    Get the agent adapter for a conversation.
+    
+    Warm sessions are reused from the session registry so the agent, its memory
+    manager and the message history survive across turns. A new adapter is only
+    created (and registered) when the conversation is not already active.
     
     Args:
         llm_model: The LLM model to use (e.g., 'gemini-2.0-flash', 'gpt-4o')
@@ -121,7 +392,41 @@ def get_agent(llm_model: str = 'gemini-2.0-flash',
     Returns:
         An initialized agent adapter
     """
-    return AgentAdapter(
+    registry = get_session_registry()
+    
+    if conversation_id:
+        adapter = registry.get(conversation_id)
+        if adapter is not None:
+            adapter.update_settings(
+                llm_model=llm_model,
+                google_enabled=google_enabled,
+                include_memories=include_memories
+            )
+            return adapter
+    
+    adapter = AgentAdapter(
+        llm_model=llm_model,
+        google_enabled=google_enabled,
+        conversation_id=conversation_id,
+        include_memories=include_memories
+    )
+    return registry.add(adapter.conversation_id, adapter)
+
+async def aget_agent(llm_model: str = 'gemini-2.0-flash',
+                     google_enabled: bool = False,
+                     conversation_id: Optional[str] = None,
+                     include_memories: bool = False) -> AgentAdapter:
+    """
+    Async counterpart of get_agent().
+    
+    Creating a session touches the memory database, so the lookup runs in a
+    worker thread instead of on the event loop.
+    
+    Returns:
+        An initialized agent adapter
+    """
+    return await asyncio.to_thread(
+        get_agent,
         llm_model=llm_model,
         google_enabled=google_enabled,
         conversation_id=conversation_id,
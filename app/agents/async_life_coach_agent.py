@@ -0,0 +1,232 @@
+"""
+Async Life Coach Agent Module
+
+This module provides an asyncio variant of the LifeCoachAgent for the ASGI
+entry point. LLM calls go through LangChain's ainvoke/astream, so a turn that
+is waiting on the provider holds no thread, and one worker process can keep
+hundreds of coaching requests in flight. The memory database and the Google
+client libraries are blocking, so those stages run in worker threads via
+asyncio.to_thread, concurrently and with the same per-stage timeouts as the
+synchronous agent; so does the bookkeeping before and after the reply
+(history, memory manager and rolling summary updates).
+
+Conversation state, prompts and context handling are shared with
+LifeCoachAgent, so a session can be served by either entry point.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.agents.life_coach_agent import (
+    LifeCoachAgent,
+    REFLECTION_QUESTIONS_PROMPT,
+    DEFAULT_REFLECTION_QUESTIONS
+)
+from app.models.rate_limiter import RateLimitExceeded
+from app.utils.deadline import Deadline, set_current_deadline, reset_current_deadline
+from app.config.settings import (
+    REFLECTION_QUESTIONS_MODE,
+    CONTEXT_STAGE_TIMEOUT,
+    DEADLINE_INSIGHTS_RESERVE
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def arun_stages(stages: Dict[str, Callable[[], Any]],
+                      timeout: Optional[float] = CONTEXT_STAGE_TIMEOUT,
+                      timeouts: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run blocking stages concurrently in worker threads and collect the ones that finish in time.
+
+    Async counterpart of app.utils.background.run_stages.
+
+    Args:
+        stages: Stage names mapped to the (blocking) callables to run
+        timeout: Default seconds to wait for a stage (None waits indefinitely)
+        timeouts: Optional per-stage timeouts overriding the default
+
+    Returns:
+        A tuple of (results by stage name, names of skipped stages)
+    """
+    if not stages:
+        return {}, []
+
+    names = list(stages)
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(asyncio.to_thread(stages[name]), (timeouts or {}).get(name, timeout))
+          for name in names),
+        return_exceptions=True
+    )
+
+    results: Dict[str, Any] = {}
+    skipped: List[str] = []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            logger.warning(f"Stage {name} timed out and was skipped")
+            skipped.append(name)
+        elif isinstance(outcome, BaseException):
+            logger.error(f"Stage {name} failed: {str(outcome)}")
+            skipped.append(name)
+        else:
+            results[name] = outcome
+    return results, skipped
+
+
+class AsyncLifeCoachAgent(LifeCoachAgent):
+    """
+    LifeCoachAgent with coroutine-based coaching methods.
+
+    The synchronous methods keep working unchanged; aprovide_coaching() and
+    astream_coaching() are their non-blocking counterparts.
+    """
+
+    async def aprovide_coaching(self, user_input: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Process user input and provide a coaching response without blocking the event loop.
+
+        Args:
+            user_input: The user's input message.
+            deadline: Optional latency budget for the turn.
+
+        Returns:
+            A dictionary containing the coaching response, conversation ID, and any insights.
+        """
+        start_time = time.time()
+        deadline = deadline or Deadline()
+        # Lets the rate limiter and hedged calls bound their waits by the deadline
+        deadline_token = set_current_deadline(deadline)
+        try:
+            integration_used = await self._aprepare_turn(user_input, deadline)
+
+            try:
+                if REFLECTION_QUESTIONS_MODE == "structured" and self.enable_memory and self._structured_fits(deadline):
+                    # One round trip returns both the reply and the reflection questions
+                    response = await self.coach_llm.ainvoke(self._build_structured_prompt())
+                    text = response.content if hasattr(response, 'content') else str(response)
+                    coach_response, insights = self._parse_structured_response(text)
+                    return await asyncio.to_thread(self._complete_turn, user_input, coach_response,
+                                                   integration_used, start_time, insights=insights)
+
+                response = await self.coach_llm.ainvoke(self._build_prompt())
+                coach_response = response.content if hasattr(response, 'content') else str(response)
+
+                insights = None
+                if (REFLECTION_QUESTIONS_MODE == "inline" and self.enable_memory
+                        and deadline.allows(DEADLINE_INSIGHTS_RESERVE)):
+                    insights = await self._agenerate_reflection_questions(user_input, coach_response)
+
+                return await asyncio.to_thread(self._complete_turn, user_input, coach_response,
+                                               integration_used, start_time, insights=insights, deadline=deadline)
+
+            except RateLimitExceeded:
+                # Let the caller answer 429 so the client can resend the message later
+                await asyncio.to_thread(self._rollback_user_turn, user_input)
+                raise
+            except Exception as e:
+                logger.error(f"Error generating response: {str(e)}")
+                return {
+                    'response': f"I'm sorry, I encountered an error: {str(e)}. Please try again or contact support.",
+                    'conversation_id': self.conversation_id,
+                    'error': str(e)
+                }
+        finally:
+            reset_current_deadline(deadline_token)
+
+    async def astream_coaching(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user input and stream the coaching response as it is generated.
+
+        Args:
+            user_input: The user's input message.
+
+        Yields:
+            The same events as stream_coaching(): 'token' events followed by a
+            'done' or an 'error' event.
+        """
+        start_time = time.time()
+        integration_used = await self._aprepare_turn(user_input)
+        chunks = []
+        completed = False
+
+        try:
+            async for chunk in self.coach_llm.astream(self._build_prompt()):
+                text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if not text:
+                    continue
+                chunks.append(text)
+                yield {'type': 'token', 'content': text}
+
+            completed = True
+            coach_response = "".join(chunks)
+            insights = None
+            if REFLECTION_QUESTIONS_MODE == "inline" and self.enable_memory:
+                insights = await self._agenerate_reflection_questions(user_input, coach_response)
+            result = await asyncio.to_thread(self._complete_turn, user_input, coach_response,
+                                             integration_used, start_time, insights=insights)
+            yield {'type': 'done', **result}
+
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away mid-stream; keep what was generated in the history
+            if not completed and chunks:
+                self._record_response("".join(chunks))
+            raise
+        except RateLimitExceeded as e:
+            await asyncio.to_thread(self._rollback_user_turn, user_input)
+            yield self._rate_limited_event(e)
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            yield {
+                'type': 'error',
+                'response': f"I'm sorry, I encountered an error: {str(e)}. Please try again or contact support.",
+                'conversation_id': self.conversation_id,
+                'error': str(e)
+            }
+
+    async def _aprepare_turn(self, user_input: str, deadline: Optional[Deadline] = None) -> bool:
+        """
+        Gather context for a turn concurrently and add the user message to the history.
+
+        Args:
+            user_input: The user's input message.
+            deadline: Optional latency budget for the turn.
+
+        Returns:
+            True if a Google integration was used for this turn, False otherwise.
+        """
+        stages, integration_used, is_memory_request = self._plan_context_stages(user_input)
+        timeouts, not_started = self._budget_stages(stages, deadline)
+
+        results, skipped = await arun_stages(stages, timeouts=timeouts)
+        self.skipped_stages = not_started + skipped
+
+        # Memory writes and summary bookkeeping block, so they run off the event loop too
+        await asyncio.to_thread(self._apply_turn_context, user_input, results, integration_used, is_memory_request)
+        return integration_used
+
+    async def _agenerate_reflection_questions(self, user_input: str, coach_response: str) -> List[str]:
+        """
+        Generate reflection questions without blocking the event loop.
+
+        Args:
+            user_input: The user's input message.
+            coach_response: The coach's response.
+
+        Returns:
+            A list of reflection questions.
+        """
+        try:
+            response = await self.aux_llm.ainvoke(REFLECTION_QUESTIONS_PROMPT.format(
+                user_input=user_input,
+                coach_response=coach_response
+            ))
+            return self._parse_reflection_questions(response.content)
+
+        except Exception as e:
+            # Fallback in case of errors
+            logger.error(f"Error generating reflection questions: {str(e)}")
+            return list(DEFAULT_REFLECTION_QUESTIONS)
@@ -0,0 +1,192 @@
+"""
+Context Window Module for the Bahai Life Coach.
+
+This module fits the conversation history into a token budget before it is
+sent to the LLM, so the cost and latency of a turn stay flat as a conversation
+grows. The leading system messages (the life coach system prompt and the
+memory context) are pinned; the oldest turns are dropped first and, when a
+rolling summary is available, replaced by that summary.
+"""
+
+from functools import lru_cache
+from typing import Any, List, Optional
+import logging
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.config.settings import CONTEXT_TOKEN_BUDGET
+from app.models.llm_models import get_model_info
+
+# tiktoken gives exact counts for OpenAI-compatible models when installed
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Providers whose models use OpenAI-compatible tokenizers
+TIKTOKEN_PROVIDERS = {'openai', 'deepseek'}
+
+# Approximate characters per token for providers without a local tokenizer
+CHARS_PER_TOKEN = 4
+
+# Tokens added per message for role markers and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Prefix of the system message that stands in for dropped turns
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model_name: str) -> Any:
+    """Get the tiktoken encoding for a model."""
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=4096)
+def _count_text_tokens(text: str, model_name: Optional[str]) -> int:
+    """Count the tokens in a text, exactly if a tokenizer is available for the model."""
+    if model_name is not None:
+        return len(_get_encoding(model_name).encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class ContextWindow:
+    """
+    Token-budgeted view of a conversation's message history.
+
+    The full history is left untouched; fit() returns the messages that should
+    be sent for the next LLM call.
+    """
+
+    def __init__(self, llm_model: Optional[str] = None, budget: int = CONTEXT_TOKEN_BUDGET):
+        """
+        Initialize the context window.
+
+        Args:
+            llm_model: The LLM model the messages are sent to (selects the tokenizer)
+            budget: Maximum number of prompt tokens per call
+        """
+        self.budget = budget
+        self.tokenizer_model = None
+
+        try:
+            provider = get_model_info(llm_model)['provider'] if llm_model else None
+        except ValueError:
+            provider = None
+
+        if provider in TIKTOKEN_PROVIDERS and tiktoken is not None:
+            self.tokenizer_model = llm_model
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: The text to count
+
+        Returns:
+            The (possibly approximate) number of tokens
+        """
+        return _count_text_tokens(text or "", self.tokenizer_model)
+
+    def count_message_tokens(self, message: Any) -> int:
+        """
+        Count the tokens a message contributes to a prompt.
+
+        Args:
+            message: A LangChain message
+
+        Returns:
+            The number of tokens
+        """
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        return self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def fit(self,
+            messages: List[Any],
+            pinned_count: Optional[int] = None,
+            reserved_tokens: int = 0,
+            summary: Optional[str] = None) -> List[Any]:
+        """
+        Select the messages to send so they fit in the token budget.
+
+        The pinned leading messages are always kept, as is the latest turn.
+        Older turns are kept newest first while they fit. If turns have to be
+        dropped and a summary is given, it is inserted after the pinned messages.
+
+        Args:
+            messages: The full message history
+            pinned_count: Number of leading messages to always keep
+                (defaults to all leading system messages)
+            reserved_tokens: Tokens to leave free for messages added after fitting
+            summary: Optional rolling summary of the conversation
+
+        Returns:
+            The messages to send to the LLM
+        """
+        if pinned_count is None:
+            pinned_count = 0
+            while pinned_count < len(messages) and isinstance(messages[pinned_count], SystemMessage):
+                pinned_count += 1
+        pinned = messages[:pinned_count]
+        turns = self._split_turns(messages[pinned_count:])
+
+        available = self.budget - reserved_tokens - sum(self.count_message_tokens(m) for m in pinned)
+        kept = self._select_turns(turns, available)
+
+        summary_message = None
+        if len(kept) < len(turns) and summary:
+            # Make room for the summary standing in for the dropped turns
+            summary_message = SystemMessage(content=f"{SUMMARY_PREFIX} {summary}")
+            kept = self._select_turns(turns, available - self.count_message_tokens(summary_message))
+
+        dropped = len(turns) - len(kept)
+        if dropped:
+            logger.info(f"Context window dropped {dropped} of {len(turns)} turns to fit {self.budget} tokens"
+                        f"{' (replaced by rolling summary)' if summary_message else ''}")
+
+        result = list(pinned)
+        if summary_message is not None:
+            result.append(summary_message)
+        for turn in reversed(kept):
+            result.extend(turn)
+        return result
+
+    def _select_turns(self, turns: List[List[Any]], available: int) -> List[List[Any]]:
+        """Pick turns newest first while they fit (the latest turn is always kept)."""
+        kept: List[List[Any]] = []
+        for index, turn in enumerate(reversed(turns)):
+            cost = sum(self.count_message_tokens(m) for m in turn)
+            if index > 0 and cost > available:
+                break
+            kept.append(turn)
+            available -= cost
+        return kept
+
+    @staticmethod
+    def _split_turns(messages: List[Any]) -> List[List[Any]]:
+        """
+        Group messages into turns. A turn starts with the user message (or the
+        context system message preceding it) and runs until the next one.
+        """
+        turns: List[List[Any]] = []
+        current: List[Any] = []
+        has_user_message = False
+        for message in messages:
+            starts_turn = isinstance(message, (HumanMessage, SystemMessage))
+            if starts_turn and has_user_message:
+                turns.append(current)
+                current = []
+                has_user_message = False
+            current.append(message)
+            has_user_message = has_user_message or isinstance(message, HumanMessage)
+        if current:
+            turns.append(current)
+        return turns
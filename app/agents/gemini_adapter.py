@@ -3,13 +3,16 @@ Gemini Adapter for the Bahai Life Coach agent.
 
 This module provides an adapter to use Google's Gemini API as an LLM model.
 It integrates with the LangChain library and provides a uniform interface
-for the Bahai Life Coach agent to interact with Gemini models.
+for the Bahai Life Coach agent to interact with Gemini models. Each reply is
+a single generate_content call carrying the full history, with blocking,
+streaming and async variants.
 """
 
 import os
 import logging
 import importlib.util
-from typing import List, Dict, Any, Optional, Union
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterator, AsyncIterator
 
 # Check if google-generativeai is installed
 if importlib.util.find_spec("google.generativeai") is None:
@@ -33,6 +36,9 @@ from app.config.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct system instructions whose models are kept per adapter
+MAX_CACHED_MODELS = 4
+
 class GeminiAdapter:
     """
     An adapter for integrating Google's Gemini AI models with the Bahai Life Coach.
@@ -60,19 +66,68 @@ class GeminiAdapter:
             raise ValueError("Gemini API key is required")
         
         genai.configure(api_key=self.api_key)
+        self.generation_config = GenerationConfig(
+            temperature=TEMPERATURE,
+            max_output_tokens=MAX_TOKENS
+        )
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
-            generation_config=GenerationConfig(
-                temperature=TEMPERATURE,
-                max_output_tokens=MAX_TOKENS
-            )
+            generation_config=self.generation_config
         )
         
+        # Models keyed by system instruction, reused across turns
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        
         logger.info(f"Initialized Gemini adapter with model {self.model_name}")
     
-    async def generate_response(self, messages: List[Dict[str, str]]) -> str:
+    def _get_model(self, system_instruction: Optional[str]) -> Any:
         """
-        Generate a response from Google Gemini.
+        Get the model for a system instruction, reusing it across calls.
+        
+        The system prompt is fixed for a session, so in practice one model object
+        is created per session and reused for every turn.
+        
+        Args:
+            system_instruction: The combined system messages (None if there are none).
+            
+        Returns:
+            The Gemini GenerativeModel.
+        """
+        if not system_instruction:
+            return self.model
+        
+        model = self._models.get(system_instruction)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                generation_config=self.generation_config,
+                system_instruction=system_instruction
+            )
+            self._models[system_instruction] = model
+            while len(self._models) > MAX_CACHED_MODELS:
+                self._models.popitem(last=False)
+        else:
+            self._models.move_to_end(system_instruction)
+        return model
+    
+    def _prepare_request(self, messages: List[Dict[str, str]]) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Build the model and contents for a single generate_content call.
+        
+        Args:
+            messages: List of message dictionaries with role and content.
+            
+        Returns:
+            A tuple of (model, contents).
+        """
+        system_instruction, contents = self._format_messages(messages)
+        return self._get_model(system_instruction), contents
+    
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Generate a response from Google Gemini (blocking).
+        
+        The whole history is sent in one generate_content call.
         
         Args:
             messages: List of message dictionaries with role and content.
@@ -81,55 +136,103 @@ class GeminiAdapter:
             The generated response text.
         """
         try:
-            # Convert the message format to Gemini's expected format
-            formatted_messages = self._format_messages(messages)
-            
-            # Generate the response
-            chat_session = self.model.start_chat()
-            for message in formatted_messages:
-                if message.role == "user":
-                    chat_session.send_message(message.parts[0].text)
-                # Note: Gemini doesn't need the assistant messages as it maintains context
+            model, contents = self._prepare_request(messages)
+            response = model.generate_content(contents, request_options={"timeout": self.timeout})
+            return response.text
+        except Exception as e:
+            logger.error(f"Error generating response from Gemini: {str(e)}")
+            return f"I apologize, but I encountered an error: {str(e)}"
+    
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Stream a response from Google Gemini (blocking).
+        
+        Args:
+            messages: List of message dictionaries with role and content.
             
-            # Get the final response (from the most recent message)
-            response = chat_session.last
+        Yields:
+            Chunks of the response text as they are generated.
+        """
+        model, contents = self._prepare_request(messages)
+        for chunk in model.generate_content(contents, stream=True, request_options={"timeout": self.timeout}):
+            if chunk.text:
+                yield chunk.text
+    
+    async def generate_response(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Generate a response from Google Gemini.
+        
+        The whole history is sent in one non-blocking generate_content call.
+        
+        Args:
+            messages: List of message dictionaries with role and content.
             
-            # Extract and return the text content
+        Returns:
+            The generated response text.
+        """
+        try:
+            model, contents = self._prepare_request(messages)
+            response = await model.generate_content_async(contents, request_options={"timeout": self.timeout})
             return response.text
         except Exception as e:
             logger.error(f"Error generating response from Gemini: {str(e)}")
             return f"I apologize, but I encountered an error: {str(e)}"
     
-    def _format_messages(self, messages: List[Dict[str, str]]) -> List[Any]:
+    async def stream_response(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream a response from Google Gemini without blocking the event loop.
+        
+        Args:
+            messages: List of message dictionaries with role and content.
+            
+        Yields:
+            Chunks of the response text as they are generated.
+        """
+        model, contents = self._prepare_request(messages)
+        response = await model.generate_content_async(
+            contents, stream=True, request_options={"timeout": self.timeout}
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    def _format_messages(self, messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
         """
         Convert messages to the format expected by Gemini.
         
+        System messages become the model's system instruction. Consecutive
+        messages from the same role are merged into one turn, since Gemini
+        expects user and model turns to alternate.
+        
         Args:
             messages: List of message dictionaries with role and content.
             
         Returns:
-            List of Gemini content parts.
+            A tuple of (system instruction or None, list of Gemini contents).
         """
-        # For Gemini's chat model, we need to convert the messages to Content objects
-        from google.generativeai.types import Content
-        
         # Map OpenAI role names to Gemini roles
         role_map = {
-            "system": "user",  # Gemini doesn't have system messages, use as user
             "user": "user",
             "assistant": "model"
         }
         
-        # Format the messages
-        formatted_messages = []
+        system_parts = []
+        contents = []
         for message in messages:
-            role = role_map.get(message.get("role", "user"), "user")
+            role = message.get("role", "user")
             content = message.get("content", "")
+            if not content:
+                continue
+            
+            if role == "system":
+                system_parts.append(content)
+                continue
             
-            # Create a Content object for this message
-            formatted_messages.append(Content(
-                role=role,
-                parts=[{"text": content}]
-            ))
+            role = role_map.get(role, "user")
+            if contents and contents[-1]["role"] == role:
+                contents[-1]["parts"].append(content)
+            else:
+                contents.append({"role": role, "parts": [content]})
         
-        return formatted_messages 
\ No newline at end of file
+        system_instruction = "\n\n".join(system_parts) or None
+        return system_instruction, contents
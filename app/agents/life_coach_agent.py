@@ -3,7 +3,7 @@ Life Coach Agent Module
 
 This module implements the core Bahá'í Life Coach agent functionality.
 The LifeCoachAgent class handles the main conversation flow, memory management,
-and response generation using a singleton LLM pattern and optimized memory access.
+and response generation using pooled LLM clients and optimized memory access.
 
 Conversation Processing Logic:
 
@@ -32,25 +32,64 @@ Conversation Processing Logic:
    - The agent can create insights by analyzing the conversation
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Iterator, Tuple
 import uuid
 import logging
-import os
 import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
-from app.config.settings import ENABLE_GOOGLE_INTEGRATION, ENABLE_MEMORY_TRACKING
+from app.config.settings import (
+    ENABLE_GOOGLE_INTEGRATION, ENABLE_MEMORY_TRACKING, REFLECTION_QUESTIONS_MODE,
+    CONTEXT_STAGE_TIMEOUT, CONTEXT_STAGE_TIMEOUTS, DEADLINE_REPLY_RESERVE, DEADLINE_INSIGHTS_RESERVE
+)
 from app.utils.tiered_memory import TieredMemoryManager
-from app.models.llm import get_llm_model
-from app.prompts.life_coach_prompts import LIFE_COACH_SYSTEM_PROMPT, BAHAI_QUOTES
+from app.models.llm import get_llm_client, get_hedged_llm_client, get_llm_for_purpose
+from app.models.rate_limiter import RateLimitExceeded
+from app.prompts.life_coach_prompts import LIFE_COACH_SYSTEM_PROMPT, BAHAI_QUOTES, STRUCTURED_RESPONSE_INSTRUCTIONS
+from app.agents.structured_output import parse_coaching_turn
+from app.agents.context_window import ContextWindow
 from app.utils.memory_db import MemoryDB
+from app.utils.background import run_stages, submit_background
+from app.utils.deadline import Deadline, set_current_deadline, reset_current_deadline
+from app.integrations.task_extraction import extract_task_with_fallback
+from app.integrations.intents import (
+    detect_intents, MEMORY_RECALL, CALENDAR_MENTION, CALENDAR_VIEW, TASK_MENTION, TASK_VIEW, TASK_CREATE, CREATE_VERB
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of recent turns whose background reflection questions are kept
+MAX_PENDING_INSIGHTS = 20
+
+# Context stages with side effects: they are never skipped or timed out by the
+# latency budget, since abandoning one would hide whether it took effect
+SIDE_EFFECT_STAGES = ('create_task',)
+
+REFLECTION_QUESTIONS_PROMPT = """
+Based on the following conversation between a user and a Bahá'í life coach, generate 3 thought-provoking reflection questions.
+These questions should be personalized, insightful, and encourage deep thinking about the discussed topics.
+They should relate to Bahá'í principles and help the user apply the wisdom to their specific situation.
+Avoid formulaic expressions and create spontaneous, meaningful questions.
+
+User: {user_input}
+
+Coach: {coach_response}
+
+Generate 3 reflection questions:
+"""
+
+# Used when the reflection questions cannot be generated
+DEFAULT_REFLECTION_QUESTIONS = (
+    "How might you apply this wisdom to your current situation?",
+    "What spiritual principle resonates most with you from this conversation?"
+)
+
 # Try to import Google integration modules if enabled
 GOOGLE_IMPORTS_SUCCESSFUL = False
 if ENABLE_GOOGLE_INTEGRATION:
@@ -73,7 +112,7 @@ if ENABLE_GOOGLE_INTEGRATION:
 class LifeCoachAgent:
     """
     A Bahá'í life coach agent that provides coaching based on Bahá'í principles,
-    using an optimized memory system and singleton LLM instance for improved performance.
+    using an optimized memory system and pooled LLM clients for improved performance.
     """
     
     def __init__(self, 
@@ -98,18 +137,23 @@ class LifeCoachAgent:
         self.google_enabled = google_enabled
         self.include_memories = include_memories
         
-        # Initialize LLM using singleton pattern with the specified model
-        # We use get_llm_model() which will use LLM_MODEL from settings unless overridden by env var
-        if llm_model:
-            # Set the environment variable to override the default model
-            os.environ['LLM_MODEL'] = llm_model
-            
-        self.llm = get_llm_model(force_refresh=True)
+        # Get a long-lived client for the specified model from the shared pool
+        # (falls back to LLM_MODEL from settings unless overridden by env var)
+        self.llm = get_llm_client(llm_model or None)
+        
+        # The coaching reply itself is latency-critical and may be hedged
+        self.coach_llm = get_hedged_llm_client(llm_model or None)
+        
+        # Secondary calls (reflection questions, insights, task titles) use a cheaper model
+        self.aux_llm = get_llm_for_purpose('aux', llm_model or None)
+        
+        # Keep the prompt sent on each turn within the token budget
+        self.context_window = ContextWindow(llm_model)
         
         # Set memory tracking based on settings
         self.enable_memory = ENABLE_MEMORY_TRACKING
         if self.enable_memory:
-            self.memory_manager = TieredMemoryManager(user_id=self.user_id)
+            self.memory_manager = TieredMemoryManager(user_id=self.user_id, llm_model=llm_model or None)
             # Start conversation in memory manager
             if self.memory_manager:
                 self.memory_manager.start_conversation(self.conversation_id)
@@ -124,6 +168,16 @@ class LifeCoachAgent:
             SystemMessage(content=LIFE_COACH_SYSTEM_PROMPT)
         ]
         
+        # Number of leading messages (system prompt, memory context) that are
+        # always sent, however long the conversation gets
+        self.pinned_count = 1
+        
+        # Context gathered for the current turn only (Google data, memories)
+        self.turn_context: Optional[str] = None
+        
+        # Context stages dropped for the current turn (failed or too slow)
+        self.skipped_stages: List[str] = []
+        
         # Track if context has been initialized
         self.context_initialized = False
         
@@ -142,8 +196,16 @@ class LifeCoachAgent:
         # Track conversation messages for summary
         self.conversation_messages = []
         
+        # Turn counter and reflection questions generated in the background, by turn
+        self.turn = 0
+        self.turn_insights: "OrderedDict[int, Future]" = OrderedDict()
+        
         # Ensure context is initialized
         self._init_context()
+        
+        # Continue an existing conversation where it left off
+        if conversation_id:
+            self._restore_history()
     
     def _init_context(self):
         """Initialize the conversation context with system prompt and memories."""
@@ -156,83 +218,309 @@ class LifeCoachAgent:
                 if memory_context:
                     self.messages.append(SystemMessage(content=memory_context))
             
+            self.pinned_count = len(self.messages)
             self.context_initialized = True
     
-    def provide_coaching(self, user_input: str) -> Dict[str, Any]:
+    def _restore_history(self) -> None:
+        """Restore the message history of a conversation persisted earlier."""
+        if not self.enable_memory or not self.memory_manager:
+            return
+        
+        messages = self.memory_manager.restore_conversation(self.conversation_id)
+        for message in messages:
+            role = message.get("role")
+            content = message.get("content", "")
+            if role == "user":
+                self.messages.append(HumanMessage(content=content))
+                self.turn += 1
+            elif role == "assistant":
+                self.messages.append(AIMessage(content=content))
+            else:
+                continue
+            self.conversation_messages.append({"role": role, "content": content})
+        
+        if messages:
+            logger.info(f"Restored {len(messages)} messages for conversation {self.conversation_id}")
+    
+    def save_transcript(self) -> bool:
+        """
+        Persist the current conversation transcript without ending the conversation.
+        
+        Returns:
+            True if a transcript was stored, False otherwise
+        """
+        if not self.enable_memory or not self.memory_manager:
+            return False
+        return self.memory_manager.save_transcript()
+    
+    def set_llm_model(self, llm_model: str) -> None:
+        """
+        Switch the LLM model used by this agent, keeping the conversation history.
+        
+        Args:
+            llm_model: The LLM model to use (e.g., 'gemini-2.0-flash', 'gpt-4o')
+        """
+        self.llm = get_llm_client(llm_model)
+        self.coach_llm = get_hedged_llm_client(llm_model)
+        self.aux_llm = get_llm_for_purpose('aux', llm_model)
+        self.context_window = ContextWindow(llm_model)
+        self.llm_model = llm_model
+        if self.memory_manager:
+            self.memory_manager.set_llm_model(llm_model)
+    
+    def provide_coaching(self, user_input: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Process user input and provide coaching response directly using the LLM.
         
+        When the deadline is tight, optional stages (Google data, memories,
+        reflection questions) are cut short or skipped; the result lists them
+        under 'skipped_stages'.
+        
         Args:
             user_input: The user's input message.
+            deadline: Optional latency budget for the turn.
             
         Returns:
             A dictionary containing the coaching response, conversation ID, and any insights.
         """
         start_time = time.time()
+        deadline = deadline or Deadline()
+        # Lets the rate limiter and hedged calls bound their waits by the deadline
+        deadline_token = set_current_deadline(deadline)
+        try:
+            integration_used = self._prepare_turn(user_input, deadline)
+            
+            # Generate the response directly using the LLM
+            try:
+                if REFLECTION_QUESTIONS_MODE == "structured" and self.enable_memory and self._structured_fits(deadline):
+                    # One round trip returns both the reply and the reflection questions
+                    coach_response, insights = self._invoke_structured()
+                    return self._complete_turn(user_input, coach_response, integration_used, start_time,
+                                               insights=insights)
+                
+                response = self.coach_llm.invoke(self._build_prompt())
+                coach_response = response.content if hasattr(response, 'content') else str(response)
+                
+                return self._complete_turn(user_input, coach_response, integration_used, start_time,
+                                           deadline=deadline)
+                
+            except RateLimitExceeded:
+                # Let the caller answer 429 so the client can resend the message later
+                self._rollback_user_turn(user_input)
+                raise
+            except Exception as e:
+                logger.error(f"Error generating response: {str(e)}")
+                return {
+                    'response': f"I'm sorry, I encountered an error: {str(e)}. Please try again or contact support.",
+                    'conversation_id': self.conversation_id,
+                    'error': str(e)
+                }
         
-        # Check for explicit memory requests
-        is_memory_request = False
-        memory_query = None
+        finally:
+            reset_current_deadline(deadline_token)
+    
+    def stream_coaching(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process user input and stream the coaching response as it is generated.
+        
+        Args:
+            user_input: The user's input message.
+            
+        Yields:
+            {'type': 'token', 'content': ...} for each chunk of the response, followed by
+            {'type': 'done', ...} carrying the same fields as provide_coaching(), or
+            {'type': 'error', ...} if generation failed.
+        """
+        start_time = time.time()
+        integration_used = self._prepare_turn(user_input)
+        chunks = []
+        completed = False
+        
+        try:
+            for chunk in self.coach_llm.stream(self._build_prompt()):
+                text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if not text:
+                    continue
+                chunks.append(text)
+                yield {'type': 'token', 'content': text}
+            
+            completed = True
+            result = self._complete_turn(user_input, "".join(chunks), integration_used, start_time)
+            yield {'type': 'done', **result}
+            
+        except GeneratorExit:
+            # The client went away mid-stream; keep what was generated in the history
+            if not completed and chunks:
+                self._record_response("".join(chunks))
+            raise
+        except RateLimitExceeded as e:
+            self._rollback_user_turn(user_input)
+            yield self._rate_limited_event(e)
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            yield {
+                'type': 'error',
+                'response': f"I'm sorry, I encountered an error: {str(e)}. Please try again or contact support.",
+                'conversation_id': self.conversation_id,
+                'error': str(e)
+            }
+    
+    def _prepare_turn(self, user_input: str, deadline: Optional[Deadline] = None) -> bool:
+        """
+        Gather context for a turn and add the user message to the history.
+        
+        The independent context stages (calendar, tasks, task creation and
+        memories) run concurrently, so gathering takes as long as the slowest
+        stage; a stage that exceeds its timeout is left out of the context.
         
-        if "what do you remember about" in user_input.lower() or "recall our discussions on" in user_input.lower():
-            is_memory_request = True
-            memory_query = user_input
+        Args:
+            user_input: The user's input message.
+            deadline: Optional latency budget; stages are cut short to keep
+                enough time for the reply.
             
-        # Check for integration requests
+        Returns:
+            True if a Google integration was used for this turn, False otherwise.
+        """
+        stages, integration_used, is_memory_request = self._plan_context_stages(user_input)
+        timeouts, not_started = self._budget_stages(stages, deadline)
+        
+        # Run the independent stages concurrently; a stage that is too slow is dropped
+        results, skipped = run_stages(stages, timeouts=timeouts)
+        self.skipped_stages = not_started + skipped
+        
+        self._apply_turn_context(user_input, results, integration_used, is_memory_request)
+        return integration_used
+    
+    def _budget_stages(self,
+                       stages: Dict[str, Callable[[], Any]],
+                       deadline: Optional[Deadline]) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        """
+        Fit the context stages into the turn's latency budget.
+        
+        Read stages that cannot fit are removed from the stages dictionary.
+        Side-effect stages (SIDE_EFFECT_STAGES) are exempt: they always run
+        and are waited for without a timeout.
+        
+        Args:
+            stages: The planned stages by name.
+            deadline: Optional latency budget for the turn.
+            
+        Returns:
+            A tuple of (timeout per remaining stage, names of the removed stages).
+        """
+        deadline = deadline or Deadline()
+        optional = [name for name in stages if name not in SIDE_EFFECT_STAGES]
+        timeouts, not_started = deadline.stage_timeouts(optional, CONTEXT_STAGE_TIMEOUT, CONTEXT_STAGE_TIMEOUTS)
+        for name in not_started:
+            logger.info(f"Skipping stage {name}: not enough time left before the deadline")
+            del stages[name]
+        for name in stages:
+            if name in SIDE_EFFECT_STAGES:
+                timeouts[name] = None
+        return timeouts, not_started
+    
+    def _structured_fits(self, deadline: Deadline) -> bool:
+        """
+        Check whether a structured (reply plus questions) call fits the latency budget.
+        
+        Otherwise the plain reply is generated and the questions are deferred.
+        
+        Args:
+            deadline: The latency budget for the turn.
+            
+        Returns:
+            True if there is time for the longer structured call, False otherwise.
+        """
+        if deadline.allows(DEADLINE_REPLY_RESERVE + DEADLINE_INSIGHTS_RESERVE):
+            return True
+        self.skipped_stages.append('reflection_questions')
+        return False
+    
+    def _plan_context_stages(self, user_input: str) -> Tuple[Dict[str, Callable[[], Any]], bool, bool]:
+        """
+        Decide which context stages a turn needs (keyword detection is cheap and runs inline).
+        
+        Args:
+            user_input: The user's input message.
+            
+        Returns:
+            A tuple of (stages by name, whether a Google integration is used,
+            whether this is an explicit memory request).
+        """
+        # Detect every intent of the message in one pass
+        intents = detect_intents(user_input)
+        
+        # Check for explicit memory requests
+        is_memory_request = MEMORY_RECALL in intents
+            
+        stages = {}
         integration_used = False
         if self.google_enabled:
-            # Check for calendar-related keywords
-            if any(keyword in user_input.lower() for keyword in ["calendar", "schedule", "appointment", "meeting", "event"]):
-                self._update_google_data()
-                integration_used = True
-            
-            # Check for task-related keywords
-            if any(keyword in user_input.lower() for keyword in ["task", "todo", "to-do", "to do", "reminder"]):
-                # Check if this is a task creation request
-                if any(verb in user_input.lower() for verb in ["add", "create", "make", "set"]):
-                    self._try_create_task(user_input)
-                    integration_used = True
-                else:
-                    self._update_google_data()
-                    integration_used = True
+            wants_calendar = CALENDAR_MENTION in intents or CALENDAR_VIEW in intents
+            wants_tasks = TASK_MENTION in intents or TASK_VIEW in intents
+            # Check if this is a task creation request
+            wants_new_task = TASK_CREATE in intents or (wants_tasks and CREATE_VERB in intents)
+            
+            if wants_calendar or (wants_tasks and not wants_new_task):
+                stages['calendar'] = self._fetch_calendar_events
+                stages['tasks'] = self._fetch_tasks
+            if wants_new_task:
+                stages['create_task'] = lambda: self._try_create_task(user_input)
+            integration_used = bool(stages)
+        
+        if self.enable_memory and self.memory_manager:
+            conversation_id = self.conversation_id
+            stages['memories'] = lambda: self.memory_manager.get_memories_for_conversation(conversation_id)
+        
+        return stages, integration_used, is_memory_request
+    
+    def _apply_turn_context(self,
+                            user_input: str,
+                            results: Dict[str, Any],
+                            integration_used: bool,
+                            is_memory_request: bool) -> None:
+        """
+        Build the per-turn context from the stage results and add the user message to the history.
+        
+        Args:
+            user_input: The user's input message.
+            results: Results of the context stages that completed, by name.
+            integration_used: Whether a Google integration is used for this turn.
+            is_memory_request: Whether the user explicitly asked about memories.
+        """
+        self._merge_google_results(results)
                 
         # Add any relevant context from Google integration
         context = ""
         if integration_used and self.google_integration_data['calendar_events']:
             context += "\n\nUser's upcoming events:\n"
             for event in self.google_integration_data['calendar_events'][:3]:  # Limit to 3 events
-                start_time = event.get('start', 'Unknown time')
-                context += f"- {event.get('summary', 'Event')} at {start_time}\n"
+                event_start = event.get('start', 'Unknown time')
+                context += f"- {event.get('summary', 'Event')} at {event_start}\n"
         
         if integration_used and self.google_integration_data['tasks']:
             context += "\n\nUser's current tasks:\n"
             for task in self.google_integration_data['tasks'][:3]:  # Limit to 3 tasks
                 context += f"- {task.get('title', 'Task')}\n"
                 
-        # Handle memory queries
-        if is_memory_request and self.enable_memory and self.memory_manager:
-            relevant_memories = self.memory_manager.get_memories_for_conversation(self.conversation_id)
-            if relevant_memories:
+        # Add memories (framed as an answer to the question for explicit memory requests)
+        memories = results.get('memories')
+        if memories:
+            if is_memory_request:
                 context += "\n\nRelevant memories from previous conversations:\n"
-                for memory_type, memory in relevant_memories.items():
-                    if memory:
-                        context += f"- {memory_type.capitalize()}: {memory.get('content', '')}\n"
-        # Get relevant memories if not a specific memory request
-        elif self.enable_memory and self.memory_manager:
-            memories = self.memory_manager.get_memories_for_conversation(self.conversation_id)
-            if memories:
+            else:
                 context += "\n\nRelevant information from previous conversations:\n"
-                for memory_type, memory in memories.items():
-                    if memory:
-                        context += f"- {memory_type.capitalize()}: {memory.get('content', '')}\n"
+            for memory_type, memory in memories.items():
+                if memory:
+                    context += f"- {memory_type.capitalize()}: {memory.get('content', '')}\n"
         
-        # If we have context, add it as a system message
-        if context:
-            self.messages.append(SystemMessage(content=f"Context for your response:{context}"))
+        # Fill the per-turn context slot (replaced every turn, never kept in the history)
+        self.turn_context = f"Context for your response:{context}" if context else None
             
         # Add user message to history
         user_msg = HumanMessage(content=user_input)
         self.messages.append(user_msg)
+        self.turn += 1
         
         # Track for conversation summary and memory
         self.conversation_messages.append({"role": "user", "content": user_input})
@@ -240,50 +528,228 @@ class LifeCoachAgent:
         # Add message to memory manager
         if self.enable_memory and self.memory_manager:
             self.memory_manager.add_message("user", user_input)
+    
+    def _rollback_user_turn(self, user_input: str) -> None:
+        """
+        Remove the user message added by _prepare_turn() when no reply could be generated.
         
-        # Generate the response directly using the LLM
-        try:
-            response = self.llm.invoke(self.messages)
-            coach_response = response.content if hasattr(response, 'content') else str(response)
-            
-            # Add assistant message to history
-            ai_msg = AIMessage(content=coach_response)
-            self.messages.append(ai_msg)
+        Args:
+            user_input: The user's input message.
+        """
+        if self.messages and isinstance(self.messages[-1], HumanMessage) and self.messages[-1].content == user_input:
+            self.messages.pop()
+            self.turn -= 1
+        if self.conversation_messages and self.conversation_messages[-1] == {"role": "user", "content": user_input}:
+            self.conversation_messages.pop()
+        if self.enable_memory and self.memory_manager:
+            self.memory_manager.remove_last_message("user")
+    
+    def _rate_limited_event(self, error: RateLimitExceeded) -> Dict[str, Any]:
+        """
+        Build the stream event sent when a reply was rejected by the rate limiter.
+        
+        Args:
+            error: The rate limit error
             
-            # Track for conversation summary
-            self.conversation_messages.append({"role": "assistant", "content": coach_response})
+        Returns:
+            An 'error' event carrying the Retry-After hint
+        """
+        logger.warning(f"Coaching reply rate limited: {str(error)}")
+        return {
+            'type': 'error',
+            'response': "I'm receiving a lot of messages right now. Please try again in a moment.",
+            'conversation_id': self.conversation_id,
+            'error': str(error),
+            'retry_after': error.retry_after
+        }
+    
+    def _build_prompt(self) -> List[Any]:
+        """
+        Assemble the messages to send for the current turn.
+        
+        The history is fitted into the context window's token budget and the
+        per-turn context slot is placed right before the latest user message,
+        so everything ahead of it stays byte-identical from turn to turn.
+        Turns dropped from the window are replaced by the rolling summary.
+        
+        Returns:
+            The messages to send to the LLM.
+        """
+        summary = None
+        if self.enable_memory and self.memory_manager:
+            summary = self.memory_manager.get_rolling_summary()
+        
+        if not self.turn_context:
+            return self.context_window.fit(self.messages, pinned_count=self.pinned_count, summary=summary)
+        
+        slot = SystemMessage(content=self.turn_context)
+        prompt = self.context_window.fit(
+            self.messages,
+            pinned_count=self.pinned_count,
+            reserved_tokens=self.context_window.count_message_tokens(slot),
+            summary=summary
+        )
+        
+        # Insert the slot before the latest user message
+        for index in range(len(prompt) - 1, -1, -1):
+            if isinstance(prompt[index], HumanMessage):
+                prompt.insert(index, slot)
+                break
+        else:
+            prompt.append(slot)
+        return prompt
+    
+    def _record_response(self, coach_response: str) -> None:
+        """
+        Add the coach's response to the history and memory manager.
+        
+        Args:
+            coach_response: The coach's response.
+        """
+        # Add assistant message to history
+        ai_msg = AIMessage(content=coach_response)
+        self.messages.append(ai_msg)
+        
+        # Track for conversation summary
+        self.conversation_messages.append({"role": "assistant", "content": coach_response})
+        
+        # Add to memory manager
+        if self.enable_memory and self.memory_manager:
+            self.memory_manager.add_message("assistant", coach_response)
+    
+    def _invoke_structured(self) -> Tuple[str, List[str]]:
+        """
+        Generate the reply and reflection questions in a single structured LLM call.
+        
+        Falls back to treating the output as a plain reply (and parsing any
+        questions out of it) when it does not match the CoachingTurn schema.
+        
+        Returns:
+            A tuple of (coach_response, reflection_questions).
+        """
+        response = self.coach_llm.invoke(self._build_structured_prompt())
+        text = response.content if hasattr(response, 'content') else str(response)
+        return self._parse_structured_response(text)
+    
+    def _build_structured_prompt(self) -> List[Any]:
+        """Assemble the messages for a structured (reply plus questions) call."""
+        return self._build_prompt() + [SystemMessage(content=STRUCTURED_RESPONSE_INSTRUCTIONS)]
+    
+    def _parse_structured_response(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Split a structured LLM response into the reply and reflection questions.
+        
+        Args:
+            text: The raw LLM output.
             
-            # Add to memory manager
-            if self.enable_memory and self.memory_manager:
-                self.memory_manager.add_message("assistant", coach_response)
+        Returns:
+            A tuple of (coach_response, reflection_questions).
+        """
+        turn = parse_coaching_turn(text)
+        if turn is not None:
+            questions = turn.reflection_questions or self._parse_reflection_questions(turn.reply)
+            return turn.reply, questions
+        
+        logger.warning("Falling back to plain-text parsing of the structured response")
+        return text.strip(), self._parse_reflection_questions(text)
+    
+    def _complete_turn(self,
+                       user_input: str,
+                       coach_response: str,
+                       integration_used: bool,
+                       start_time: float,
+                       insights: Optional[List[str]] = None,
+                       deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Record the coach's response and build the result of a turn.
+        
+        Args:
+            user_input: The user's input message.
+            coach_response: The coach's response.
+            integration_used: Whether a Google integration was used for this turn.
+            start_time: When processing of the turn started.
+            insights: Reflection questions already generated with the response, if any.
+            deadline: Optional latency budget; inline reflection questions are
+                moved to the background when it is nearly spent.
             
-            # Extract insights for reflection only if memory tracking is enabled
+        Returns:
+            A dictionary containing the coaching response, conversation ID, and any insights.
+        """
+        self._record_response(coach_response)
+        
+        # Extract insights for reflection only if memory tracking is enabled
+        insights_pending = False
+        if insights is None:
+            insights = []
             if self.enable_memory:
-                insights = self._generate_reflection_questions(user_input, coach_response)
-            else:
-                insights = []
-            
-            # Log response time
-            end_time = time.time()
-            logger.info(f"Response generated in {end_time - start_time:.2f} seconds")
-            
-            # Return the response with all necessary information
-            result = {
-                'response': coach_response,
-                'conversation_id': self.conversation_id,
-                'insights': insights,
-                'integration_used': integration_used
-            }
-            
-            return result
+                if REFLECTION_QUESTIONS_MODE == "inline" and (deadline is None or deadline.allows(DEADLINE_INSIGHTS_RESERVE)):
+                    insights = self._generate_reflection_questions(user_input, coach_response)
+                else:
+                    # Keep the second LLM round trip off the critical path (a streamed
+                    # reply cannot carry structured questions, so they go here too)
+                    if REFLECTION_QUESTIONS_MODE == "inline":
+                        self.skipped_stages.append('reflection_questions')
+                    self._schedule_reflection_questions(self.turn, user_input, coach_response)
+                    insights_pending = True
+        
+        # Log response time
+        end_time = time.time()
+        logger.info(f"Response generated in {end_time - start_time:.2f} seconds")
+        
+        # Return the response with all necessary information
+        return {
+            'response': coach_response,
+            'conversation_id': self.conversation_id,
+            'turn': self.turn,
+            'insights': insights,
+            'insights_pending': insights_pending,
+            'integration_used': integration_used,
+            'skipped_stages': list(self.skipped_stages)
+        }
+    
+    def _schedule_reflection_questions(self, turn: int, user_input: str, coach_response: str) -> None:
+        """
+        Generate the reflection questions for a turn on the background executor.
+        
+        Args:
+            turn: The turn number the questions belong to.
+            user_input: The user's input message.
+            coach_response: The coach's response.
+        """
+        self.turn_insights[turn] = submit_background(
+            self._generate_reflection_questions, user_input, coach_response
+        )
+        
+        # Only keep the most recent turns
+        while len(self.turn_insights) > MAX_PENDING_INSIGHTS:
+            self.turn_insights.popitem(last=False)
+    
+    def get_turn_insights(self, turn: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the reflection questions generated in the background for a turn.
+        
+        Args:
+            turn: The turn number.
+            timeout: Seconds to wait for the questions (don't wait if None).
             
+        Returns:
+            A dictionary with the 'status' ('pending', 'ready' or 'unknown') and 'insights'.
+        """
+        future = self.turn_insights.get(turn)
+        if future is None:
+            return {'status': 'unknown', 'turn': turn, 'insights': []}
+        
+        try:
+            if timeout is None and not future.done():
+                return {'status': 'pending', 'turn': turn, 'insights': []}
+            insights = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return {'status': 'pending', 'turn': turn, 'insights': []}
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
-            return {
-                'response': f"I'm sorry, I encountered an error: {str(e)}. Please try again or contact support.",
-                'conversation_id': self.conversation_id,
-                'error': str(e)
-            }
+            logger.error(f"Error getting reflection questions for turn {turn}: {str(e)}")
+            insights = []
+        
+        return {'status': 'ready', 'turn': turn, 'insights': insights}
     
     def start_new_conversation(self) -> Dict[str, Any]:
         """
@@ -319,6 +785,7 @@ class LifeCoachAgent:
                 SystemMessage(content=LIFE_COACH_SYSTEM_PROMPT),
                 SystemMessage(content=prompt)
             ]
+            self.pinned_count = len(self.messages)
             
             # Mark context as initialized
             self.context_initialized = True
@@ -368,46 +835,42 @@ class LifeCoachAgent:
         """
         # Use the LLM to generate personalized reflection questions
         try:
-            # Create a prompt for the LLM
-            prompt = f"""
-Based on the following conversation between a user and a Bahá'í life coach, generate 3 thought-provoking reflection questions.
-These questions should be personalized, insightful, and encourage deep thinking about the discussed topics.
-They should relate to Bahá'í principles and help the user apply the wisdom to their specific situation.
-Avoid formulaic expressions and create spontaneous, meaningful questions.
-
-User: {user_input}
-
-Coach: {coach_response}
-
-Generate 3 reflection questions:
-"""
-            
-            # Get response from LLM
-            response = self.llm.invoke(prompt).content
-            
-            # Parse out the questions (assuming they're numbered or on separate lines)
-            questions = []
-            for line in response.strip().split('\n'):
-                # Remove any numbering or bullet points
-                clean_line = line.strip()
-                if clean_line.startswith('1.') or clean_line.startswith('2.') or clean_line.startswith('3.'):
-                    clean_line = clean_line[2:].strip()
-                elif clean_line.startswith('-'):
-                    clean_line = clean_line[1:].strip()
-                    
-                if clean_line and '?' in clean_line and len(clean_line) > 10:
-                    questions.append(clean_line)
+            response = self.aux_llm.invoke(REFLECTION_QUESTIONS_PROMPT.format(
+                user_input=user_input,
+                coach_response=coach_response
+            )).content
             
-            # Return at least 1, maximum 3 questions
-            return questions[:3] or ["How does this perspective align with your spiritual values?"]
+            return self._parse_reflection_questions(response)
             
         except Exception as e:
             # Fallback in case of errors
             logger.error(f"Error generating reflection questions: {str(e)}")
-            return [
-                "How might you apply this wisdom to your current situation?",
-                "What spiritual principle resonates most with you from this conversation?"
-            ]
+            return list(DEFAULT_REFLECTION_QUESTIONS)
+    
+    def _parse_reflection_questions(self, text: str) -> List[str]:
+        """
+        Parse reflection questions out of free-form LLM output.
+        
+        Args:
+            text: The LLM output, with questions numbered or on separate lines.
+            
+        Returns:
+            A list of 1-3 reflection questions.
+        """
+        questions = []
+        for line in text.strip().split('\n'):
+            # Remove any numbering or bullet points
+            clean_line = line.strip()
+            if clean_line.startswith('1.') or clean_line.startswith('2.') or clean_line.startswith('3.'):
+                clean_line = clean_line[2:].strip()
+            elif clean_line.startswith('-'):
+                clean_line = clean_line[1:].strip()
+                
+            if clean_line and '?' in clean_line and len(clean_line) > 10:
+                questions.append(clean_line)
+        
+        # Return at least 1, maximum 3 questions
+        return questions[:3] or ["How does this perspective align with your spiritual values?"]
     
     def end_conversation(self, remember: bool = True) -> Optional[str]:
         """
@@ -426,13 +889,36 @@ Generate 3 reflection questions:
         if self.enable_memory and self.memory_manager:
             memory_id = self.memory_manager.end_conversation(remember)
         
-        # Reset current conversation
+        self._reset_conversation()
+        return memory_id
+    
+    def end_conversation_in_background(self, remember: bool = True) -> Optional[str]:
+        """
+        End the current conversation and queue memory creation as a background job.
+        
+        Args:
+            remember: Whether to create a memory from this conversation
+            
+        Returns:
+            Job ID if a memory job was queued, None otherwise
+        """
+        if not self.conversation_id:
+            return None
+            
+        job_id = None
+        if self.enable_memory and self.memory_manager:
+            job_id = self.memory_manager.end_conversation_in_background(remember)
+        
+        self._reset_conversation()
+        return job_id
+    
+    def _reset_conversation(self) -> None:
+        """Start over with a fresh conversation ID and history."""
         self.conversation_id = str(uuid.uuid4())
         self.conversation_messages = []
         self.messages = [SystemMessage(content=LIFE_COACH_SYSTEM_PROMPT)]
+        self.pinned_count = 1
         self.context_initialized = False
-        
-        return memory_id
     
     def add_explicit_memory(self, content: str, memory_type: str = "short") -> Optional[str]:
         """
@@ -462,98 +948,76 @@ Generate 3 reflection questions:
         return self.memory_manager.get_memories_for_conversation(self.conversation_id)
     
     def _update_google_data(self) -> None:
-        """Update calendar events and tasks from Google APIs."""
+        """Update calendar events and tasks from Google APIs (fetched concurrently)."""
         if not self.google_enabled:
             return
         
-        try:
-            # Get calendar events
-            calendar_events = get_upcoming_events(max_results=5)
-            logger.info(f"Retrieved {len(calendar_events)} calendar events")
-            
-            # Get tasks
-            tasks = get_tasks(max_results=10)
-            logger.info(f"Retrieved {len(tasks)} tasks")
-            
-            # Update integration data
-            self.google_integration_data = {
-                'enabled': self.google_enabled,
-                'integration_used': True,
-                'calendar_events': calendar_events,
-                'tasks': tasks
-            }
-            
-        except Exception as e:
-            logger.error(f"Error updating Google data: {str(e)}")
+        results, _ = run_stages({'calendar': self._fetch_calendar_events, 'tasks': self._fetch_tasks})
+        self._merge_google_results(results)
+    
+    def _fetch_calendar_events(self) -> List[Dict[str, Any]]:
+        """Get upcoming calendar events from the Google Calendar API."""
+        calendar_events = get_upcoming_events(max_results=5)
+        logger.info(f"Retrieved {len(calendar_events)} calendar events")
+        return calendar_events
+    
+    def _fetch_tasks(self) -> List[Dict[str, Any]]:
+        """Get tasks from the Google Tasks API."""
+        tasks = get_tasks(max_results=10)
+        logger.info(f"Retrieved {len(tasks)} tasks")
+        return tasks
+    
+    def _merge_google_results(self, results: Dict[str, Any]) -> None:
+        """
+        Merge the results of the Google stages into the integration data.
+        
+        Args:
+            results: Stage results by name ('calendar', 'tasks', 'create_task')
+        """
+        if 'calendar' in results:
+            self.google_integration_data['calendar_events'] = results['calendar']
+        if 'tasks' in results:
+            self.google_integration_data['tasks'] = results['tasks']
+        
+        created_task = results.get('create_task')
+        if created_task:
+            tasks = self.google_integration_data.get('tasks', [])
+            tasks.append(created_task)
+            self.google_integration_data['tasks'] = tasks
+        
+        if any(name in results for name in ('calendar', 'tasks', 'create_task')):
+            self.google_integration_data['enabled'] = self.google_enabled
+            self.google_integration_data['integration_used'] = True
             
-    def _try_create_task(self, user_message: str) -> bool:
+    def _try_create_task(self, user_message: str) -> Optional[Dict[str, Any]]:
         """
         Try to create a task based on the user message.
         
+        Runs as a context stage, so the created task is returned for the caller
+        to merge into the integration data instead of being added here.
+        
         Args:
             user_message: The user's message containing a task request.
             
         Returns:
-            True if task creation was attempted, False otherwise.
+            The created task, or None if no task was created.
         """
         if not self.google_enabled:
-            return False
+            return None
         
         try:
-            # Extract task title using LLM
-            task_detection_prompt = f"""
-You are helping to extract a task from a user message. The user wants to create a new task or reminder.
-From the following message, identify the main task title. Return ONLY the task title, nothing else.
-
-User message: {user_message}
-
-Task title:
-"""
-            
-            try:
-                task_title = self.llm.invoke(task_detection_prompt).content.strip()
-                
-                # Create the task
-                if task_title:
-                    task = create_task(task_title)
-                    if task:
-                        # Update tasks in integration data
-                        tasks = self.google_integration_data.get('tasks', [])
-                        tasks.append(task)
-                        self.google_integration_data['tasks'] = tasks
-                        
-                        logger.info(f"Created task: {task_title}")
-                        return True
-                        
-            except Exception as e:
-                logger.error(f"Error extracting task title with LLM: {str(e)}")
-                
-                # Fallback to simple extraction if LLM fails
-                task_indicators = ["add task ", "create task ", "remind me to ", "i need to "]
-                task_title = None
-                
-                for indicator in task_indicators:
-                    if indicator in user_message.lower():
-                        task_title = user_message.lower().split(indicator, 1)[1].strip()
-                        task_title = task_title.capitalize()
-                        break
-                
-                if task_title:
-                    # Create the task
-                    task = create_task(task_title)
-                    if task:
-                        # Update tasks in integration data
-                        tasks = self.google_integration_data.get('tasks', [])
-                        tasks.append(task)
-                        self.google_integration_data['tasks'] = tasks
-                        
-                        logger.info(f"Created task (fallback method): {task_title}")
-                        return True
-                        
+            # Common phrasings are parsed locally; the LLM only sees the ambiguous ones
+            extracted = extract_task_with_fallback(user_message, self.aux_llm)
+            if extracted:
+                task = create_task(extracted['title'], due_date=extracted['due_date'])
+                if task:
+                    logger.info(f"Created task ({extracted['method']}): {extracted['title']}")
+                    return task
+                    
         except Exception as e:
             logger.error(f"Error creating task: {str(e)}")
             
-        return False
+        return None
 
     def get_response(self, user_input: str) -> str:
         """
@@ -626,7 +1090,7 @@ Conversation:
 Key insights (brief bullet points):
 """
                 # Get insights from LLM
-                response = self.llm.invoke(prompt).content
+                response = self.aux_llm.invoke(prompt).content
                 
                 # Parse out the insights (bullet points or numbered)
                 insights = []
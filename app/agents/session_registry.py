@@ -0,0 +1,238 @@
+"""
+Session Registry Module for the Bahai Life Coach.
+
+This module keeps warm agent sessions in memory, keyed by conversation ID, so
+consecutive turns of a conversation reuse the same agent, memory manager and
+message history instead of rebuilding them on every request.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from app.config.settings import (
+    SESSION_MAX_COUNT, SESSION_IDLE_TTL, SESSION_SUSPEND_RETRY_DELAY, SESSION_SUSPEND_MAX_WAIT
+)
+from app.utils.background import submit_background
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Global registry instance (singleton pattern)
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+
+class SessionRegistry:
+    """
+    Thread-safe registry of active sessions with LRU and idle-TTL eviction.
+
+    Sessions are ordered by last access, so the least recently used session is
+    always at the front. Evicted sessions are handed to the `on_evict` callback
+    (outside the registry lock) so they can persist their state. Sessions the
+    `is_busy` callback reports as busy (a turn in progress) are never evicted;
+    the registry may exceed its size limit until they are idle.
+    """
+
+    def __init__(self,
+                 max_sessions: int = SESSION_MAX_COUNT,
+                 idle_ttl: float = SESSION_IDLE_TTL,
+                 on_evict: Optional[Callable[[str, Any], None]] = None,
+                 is_busy: Optional[Callable[[Any], bool]] = None):
+        """
+        Initialize the session registry.
+
+        Args:
+            max_sessions: Maximum number of sessions kept in memory
+            idle_ttl: Seconds of inactivity after which a session is evicted
+            on_evict: Optional callback invoked with (conversation_id, session) on eviction
+            is_busy: Optional callback telling whether a session must not be evicted now
+        """
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.is_busy = is_busy
+        self._sessions: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> Optional[Any]:
+        """
+        Get a session and mark it as recently used.
+
+        Args:
+            conversation_id: The conversation ID
+
+        Returns:
+            The session if present and not expired, None otherwise
+        """
+        with self._lock:
+            evicted = self._collect_expired()
+            entry = self._sessions.get(conversation_id)
+            session = None
+            if entry is not None:
+                session = entry[0]
+                self._sessions[conversation_id] = (session, time.monotonic())
+                self._sessions.move_to_end(conversation_id)
+
+        self._notify_evicted(evicted)
+        return session
+
+    def add(self, conversation_id: str, session: Any) -> Any:
+        """
+        Register a session unless one already exists for the conversation.
+
+        Args:
+            conversation_id: The conversation ID
+            session: The session to register
+
+        Returns:
+            The registered session (the existing one if another request won the race)
+        """
+        with self._lock:
+            evicted = self._collect_expired()
+            entry = self._sessions.get(conversation_id)
+            if entry is not None:
+                session = entry[0]
+            self._sessions[conversation_id] = (session, time.monotonic())
+            self._sessions.move_to_end(conversation_id)
+
+            # Enforce the maximum number of sessions (LRU eviction, skipping busy sessions)
+            excess = len(self._sessions) - self.max_sessions
+            if excess > 0:
+                for candidate in list(self._sessions):
+                    if excess <= 0:
+                        break
+                    if candidate == conversation_id or self._busy(self._sessions[candidate][0]):
+                        continue
+                    evicted.append((candidate, self._sessions.pop(candidate)))
+                    excess -= 1
+
+        self._notify_evicted(evicted)
+        return session
+
+    def pop(self, conversation_id: str) -> Optional[Any]:
+        """
+        Remove a session without invoking the eviction callback.
+
+        Args:
+            conversation_id: The conversation ID
+
+        Returns:
+            The removed session, or None if it was not registered
+        """
+        with self._lock:
+            entry = self._sessions.pop(conversation_id, None)
+        return entry[0] if entry is not None else None
+
+    def evict_expired(self) -> int:
+        """
+        Evict all sessions that have been idle longer than the TTL.
+
+        Returns:
+            Number of evicted sessions
+        """
+        with self._lock:
+            evicted = self._collect_expired()
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get statistics about the registry."""
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl': self.idle_ttl
+            }
+
+    def __contains__(self, conversation_id: str) -> bool:
+        with self._lock:
+            return conversation_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _busy(self, session: Any) -> bool:
+        """Check whether a session must not be evicted now."""
+        return self.is_busy is not None and self.is_busy(session)
+
+    def _collect_expired(self) -> list:
+        """Pop idle expired sessions from the front of the LRU order (lock must be held)."""
+        evicted = []
+        if not self.idle_ttl or self.idle_ttl <= 0:
+            return evicted
+
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+        for conversation_id, (session, last_access) in self._sessions.items():
+            if last_access > cutoff:
+                break
+            if not self._busy(session):
+                expired.append(conversation_id)
+        for conversation_id in expired:
+            evicted.append((conversation_id, self._sessions.pop(conversation_id)))
+        return evicted
+
+    def _notify_evicted(self, evicted: list) -> None:
+        """Invoke the eviction callback for evicted sessions."""
+        for conversation_id, (session, _) in evicted:
+            logger.info(f"Evicting idle session {conversation_id}")
+            if self.on_evict is None:
+                continue
+            try:
+                self.on_evict(conversation_id, session)
+            except Exception as e:
+                logger.error(f"Error evicting session {conversation_id}: {str(e)}")
+
+
+def _session_busy(session: Any) -> bool:
+    """Check whether a session is in the middle of a turn."""
+    busy = getattr(session, 'busy', None)
+    return bool(busy and busy())
+
+
+def _suspend_session(conversation_id: str, session: Any) -> None:
+    """
+    Persist an evicted session so its history can be restored later.
+
+    Runs on the background executor rather than on the request thread that
+    triggered the eviction, which must not wait for another session's turn.
+    """
+    if hasattr(session, 'suspend'):
+        submit_background(_suspend_when_idle, conversation_id, session, time.monotonic())
+
+
+def _suspend_when_idle(conversation_id: str, session: Any, started: float) -> None:
+    """Suspend a session, retrying later instead of waiting while a turn holds it."""
+    if session.suspend(blocking=False):
+        return
+    if time.monotonic() - started > SESSION_SUSPEND_MAX_WAIT:
+        logger.error(f"Gave up saving evicted session {conversation_id}: still busy")
+        return
+    timer = threading.Timer(
+        SESSION_SUSPEND_RETRY_DELAY, submit_background,
+        (_suspend_when_idle, conversation_id, session, started)
+    )
+    timer.daemon = True
+    timer.start()
+
+
+def get_session_registry() -> SessionRegistry:
+    """
+    Get the shared session registry (singleton pattern).
+
+    Returns:
+        The session registry
+    """
+    global _registry_instance
+
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = SessionRegistry(on_evict=_suspend_session, is_busy=_session_busy)
+
+    return _registry_instance
@@ -0,0 +1,63 @@
+"""
+Structured Output Module for the Bahai Life Coach.
+
+This module defines the schema used when the model returns the coaching reply
+and its reflection questions in a single JSON response, and the parser that
+validates such responses.
+"""
+
+import json
+import logging
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Matches a JSON object, optionally wrapped in a Markdown code fence
+JSON_BLOCK_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+
+class CoachingTurn(BaseModel):
+    """A coaching reply together with its reflection questions."""
+
+    reply: str = Field(min_length=1)
+    reflection_questions: List[str] = Field(default_factory=list)
+
+    @field_validator('reply')
+    @classmethod
+    def strip_reply(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("reply must not be empty")
+        return value
+
+    @field_validator('reflection_questions')
+    @classmethod
+    def clean_questions(cls, value: List[str]) -> List[str]:
+        questions = [question.strip() for question in value if question and question.strip()]
+        return questions[:3]
+
+
+def parse_coaching_turn(text: str) -> Optional[CoachingTurn]:
+    """
+    Parse and validate a structured coaching response.
+
+    Args:
+        text: The raw model output
+
+    Returns:
+        The validated coaching turn, or None if the output does not match the schema
+    """
+    match = JSON_BLOCK_PATTERN.search(text or "")
+    if not match:
+        return None
+
+    try:
+        return CoachingTurn.model_validate(json.loads(match.group(0)))
+    except (ValueError, ValidationError) as e:
+        logger.warning(f"Structured coaching response did not validate: {str(e)}")
+        return None
@@ -0,0 +1,211 @@
+"""
+ASGI entry point for the Bahai Life Coach.
+
+The chat endpoints are served natively on the event loop by the async agent,
+so a request waiting on the LLM provider holds no thread and one worker process
+can keep hundreds of conversations in flight. Every other route is delegated
+to the existing Flask app through asgiref's WSGI adapter.
+
+Run with:
+    uvicorn app.asgi:app --host 0.0.0.0 --port 5555
+"""
+
+import asyncio
+import json
+import logging
+from http.cookies import SimpleCookie
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app.web import create_app
+from app.web.routes import format_sse
+from app.agents.agent_adapter import aget_agent
+from app.utils.memory_jobs import get_memory_job_queue
+from app.models.rate_limiter import RateLimitExceeded
+from app.utils.deadline import Deadline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The Flask app serves everything except the async chat endpoints
+flask_app = create_app()
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def read_json(receive: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Read and decode a JSON request body."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return json.loads(body) if body else {}
+
+
+async def send_json(send: Callable[[Dict[str, Any]], Awaitable[None]],
+                    payload: Dict[str, Any],
+                    status: int = 200,
+                    headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    """Send a JSON response."""
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii"))
+        ] + (headers or [])
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def get_flask_session(scope: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read the settings stored in the Flask session cookie.
+
+    Args:
+        scope: The ASGI connection scope
+
+    Returns:
+        The session contents (empty if there is no valid session cookie)
+    """
+    cookie_header = b"; ".join(value for name, value in scope.get("headers", []) if name == b"cookie")
+    if not cookie_header:
+        return {}
+
+    cookies = SimpleCookie()
+    cookies.load(cookie_header.decode("latin-1"))
+    morsel = cookies.get(flask_app.config.get("SESSION_COOKIE_NAME", "session"))
+    if morsel is None:
+        return {}
+
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        return serializer.loads(morsel.value) if serializer else {}
+    except Exception:
+        return {}
+
+
+async def get_chat_agent(scope: Dict[str, Any], data: Dict[str, Any]):
+    """Get the agent for a chat request, with settings from the payload or the session."""
+    settings = data.get("settings") or get_flask_session(scope)
+    return await aget_agent(
+        llm_model=settings.get("llm_model", "gemini-2.0-flash"),
+        google_enabled=settings.get("google_enabled", False),
+        conversation_id=data.get("conversation_id"),
+        include_memories=data.get("include_memories", False)
+    )
+
+
+async def chat(scope, receive, send) -> None:
+    """Handle chat API requests (async counterpart of the Flask /api/chat route)."""
+    try:
+        data = await read_json(receive)
+        try:
+            deadline = Deadline.from_ms(data.get("deadline_ms"))
+        except ValueError as e:
+            await send_json(send, {"status": "error", "error": str(e)}, status=400)
+            return
+        agent = await get_chat_agent(scope, data)
+
+        response, metadata = await agent.aprocess_input(data.get("message", ""), deadline)
+
+        await send_json(send, {
+            "status": "success",
+            "response": response,
+            "conversation_id": metadata.get("conversation_id"),
+            "turn": metadata.get("turn"),
+            "insights": metadata.get("insights", []),
+            "insights_pending": metadata.get("insights_pending", False),
+            "skipped_stages": metadata.get("skipped_stages", [])
+        })
+
+    except RateLimitExceeded as e:
+        logger.warning(f"Chat request rate limited: {str(e)}")
+        await send_json(send, {"status": "error", "error": str(e), "retry_after": e.retry_after},
+                        status=429, headers=[(b"retry-after", str(e.retry_after).encode("ascii"))])
+
+    except Exception as e:
+        logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
+        await send_json(send, {"status": "error", "error": str(e)})
+
+
+async def chat_stream(scope, receive, send) -> None:
+    """Stream the chat reply as Server-Sent Events, stopping when the client disconnects."""
+    try:
+        data = await read_json(receive)
+        agent = await get_chat_agent(scope, data)
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}", exc_info=True)
+        await send_json(send, {"status": "error", "error": str(e)})
+        return
+
+    async def stream_events():
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no")
+            ]
+        })
+        async for event in agent.astream_input(data.get("message", "")):
+            event_type = event.pop("type")
+            await send({
+                "type": "http.response.body",
+                "body": format_sse(event_type, event).encode("utf-8"),
+                "more_body": True
+            })
+        await send({"type": "http.response.body", "body": b""})
+
+    async def wait_for_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    # Cancel generation (keeping the partial reply) if the client goes away
+    stream_task = asyncio.ensure_future(stream_events())
+    disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+    done, pending = await asyncio.wait({stream_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    if stream_task in done and stream_task.exception() is not None:
+        logger.error(f"Error streaming chat: {str(stream_task.exception())}")
+
+
+# Routes served natively on the event loop
+ASYNC_ROUTES = {
+    ("POST", "/api/chat"): chat,
+    ("POST", "/api/chat/stream"): chat_stream
+}
+
+
+async def lifespan(receive, send) -> None:
+    """Handle ASGI lifespan events."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Start the memory job worker, resuming jobs left over from the last run
+            get_memory_job_queue()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if handler is not None:
+            await handler(scope, receive, send)
+            return
+
+    await wsgi_app(scope, receive, send)
@@ -40,12 +40,72 @@ HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
 # Provider-specific Settings
 # ------------------------------
 # Gemini settings
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")  # Model used by the native Gemini adapter
 GEMINI_LOCATION = "us-central1"
 GEMINI_TIMEOUT = 300  # Timeout in seconds
 
 # OLLAMA settings
 OLLAMA_BASE_URL = "http://localhost:11434"
 
+# Client pool settings (shared keep-alive HTTP connections per provider)
+LLM_POOL_MAX_CONNECTIONS = 20
+LLM_POOL_KEEPALIVE_EXPIRY = 60  # Seconds an idle connection is kept open
+LLM_REQUEST_TIMEOUT = 60  # Seconds before a provider call is abandoned (and failed over)
+# Models used per call purpose instead of the selected coaching model; "aux"
+# covers secondary calls (reflection questions, insights, task titles, summaries).
+# None uses the '<purpose>_model' of the selected model's provider in LLM_MODELS
+LLM_PURPOSE_MODELS = {
+    "aux": os.getenv("LLM_AUX_MODEL") or None
+}
+
+# ------------------------------
+# LLM Failover Configuration
+# ------------------------------
+# Models tried in order when the selected model's provider fails or its circuit
+# breaker is open (one attempt per provider and request)
+ENABLE_LLM_FAILOVER = True
+LLM_FALLBACK_MODELS = ["gemini-2.0-flash", "gpt-4o", "deepseek-chat"]
+# A provider's breaker opens when at least CIRCUIT_BREAKER_ERROR_RATE of its last
+# CIRCUIT_BREAKER_WINDOW calls failed or took longer than the latency threshold
+CIRCUIT_BREAKER_WINDOW = 20
+CIRCUIT_BREAKER_MIN_CALLS = 5
+CIRCUIT_BREAKER_ERROR_RATE = 0.5
+CIRCUIT_BREAKER_LATENCY_THRESHOLD = 30.0  # Seconds
+CIRCUIT_BREAKER_OPEN_SECONDS = 30  # Seconds before a half-open probe is sent
+# Hedged requests for the main coaching call: if the first token is later than
+# HEDGE_PERCENTILE of the model's recent latencies, a duplicate request is sent to
+# HEDGE_MODEL (None for the same model) and the slower of the two is cancelled
+ENABLE_HEDGING = False
+HEDGE_PERCENTILE = 95
+HEDGE_MODEL = None
+HEDGE_MIN_SAMPLES = 20  # Latencies observed before hedging starts
+HEDGE_MIN_DELAY = 0.5  # Seconds; never hedge earlier than this
+HEDGE_LATENCY_WINDOW = 200  # Recent latencies kept per model
+HEDGE_MAX_WAIT = 60  # Seconds a hedged call waits for a leg (further capped by the request deadline)
+
+# ------------------------------
+# Rate Limiting Configuration
+# ------------------------------
+# Per-provider limits live under 'rate_limits' in LLM_MODELS. Calls queue for at
+# most this many seconds (interactive chat is served before background work) and
+# are rejected at once with a Retry-After hint when the expected wait is longer
+RATE_LIMIT_MAX_WAIT = 10
+RATE_LIMIT_BACKGROUND_MAX_WAIT = 120
+# Assumed seconds a call holds a concurrency slot, until calls have been timed;
+# used to estimate the wait for a slot when the concurrency cap is reached
+RATE_LIMIT_CALL_SECONDS = 5.0
+
+# ------------------------------
+# Response Cache Configuration
+# ------------------------------
+# Responses to plain string prompts (auxiliary calls such as task extraction,
+# insights and summaries) are cached by (model, temperature, prompt)
+ENABLE_RESPONSE_CACHE = True
+RESPONSE_CACHE_DB = "data/llm_cache.db"
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # Seconds an entry stays valid
+RESPONSE_CACHE_MAX_ENTRIES = 5000  # Least recently used entries are evicted beyond this
+RESPONSE_CACHE_TOUCH_INTERVAL = 3600  # Seconds before a hit records its last use again
+
 # ------------------------------
 # Web Server Configuration
 # ------------------------------
@@ -55,6 +115,7 @@ FLASK_SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "bahai-life-coach-secret-key")
 FLASK_PORT = 5555
 FLASK_HOST = "0.0.0.0"  # Allow connections from any IP
 FLASK_DEBUG = False
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"  # Verbose integration error messages
 
 # ------------------------------
 # Database Configuration
@@ -72,6 +133,12 @@ GOOGLE_API_SCOPES = [
     "https://www.googleapis.com/auth/tasks"
 ]
 GOOGLE_TIMEZONE = "America/Los_Angeles"
+# Seconds a Google API HTTP request may take, so a hung call cannot hold a
+# context stage worker after its stage timed out
+GOOGLE_API_TIMEOUT = 5
+
+# Task requests parsed by the local rules with at least this confidence skip the LLM
+TASK_EXTRACTION_MIN_CONFIDENCE = 0.7
 
 # ------------------------------
 # Speech Configuration
@@ -87,6 +154,71 @@ SPEECH_PAUSE_THRESHOLD = 2.0  # Seconds of silence before auto-sending
 # ------------------------------
 ENABLE_MEMORY_TRACKING = True
 MEMORY_STORAGE_PATH = "memory_storage"
+# Fold each exchange into a running conversation summary in the background,
+# so the end-of-session memory is ready without a final summarization call
+ENABLE_ROLLING_SUMMARY = True
+ROLLING_SUMMARY_WAIT = 10  # Seconds to wait for an in-flight update at session end
+# Ending a session queues transcript storage and memory creation as a durable
+# job in the memory database; failed jobs are retried up to this many times,
+# with an exponential backoff so a provider incident can pass between attempts
+MEMORY_JOB_MAX_ATTEMPTS = 3
+MEMORY_JOB_RETRY_DELAY = 60  # Seconds before the first retry, doubled for each later one
+MEMORY_JOB_MAX_RETRY_DELAY = 1800  # Seconds
+# Page size of /api/memories/search when the client sends no limit, and the
+# largest page a client may request
+MEMORY_SEARCH_DEFAULT_LIMIT = 20
+MEMORY_SEARCH_MAX_LIMIT = 100
+# SQLite tuning for the memory database; each thread keeps one connection open
+MEMORY_DB_BUSY_TIMEOUT = 10  # Seconds to wait for a lock held by another writer
+MEMORY_DB_CACHE_SIZE_KB = 16384  # Page cache per connection
+MEMORY_DB_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the file mapped into memory
+MEMORY_DB_CACHED_STATEMENTS = 256  # Prepared statements kept per connection
+# Memory bodies the file-based memory store keeps in memory, least recently
+# used evicted first (the rest are read from disk on demand)
+MEMORY_BODY_CACHE_SIZE = 5000
+
+# ------------------------------
+# Session Configuration
+# ------------------------------
+SESSION_MAX_COUNT = 200  # Maximum number of warm agent sessions kept in memory
+SESSION_IDLE_TTL = 1800  # Seconds of inactivity before a session is evicted
+# An evicted session is saved on the background executor once its current turn
+# ends; the save is retried this often, for at most this long
+SESSION_SUSPEND_RETRY_DELAY = 1.0  # Seconds
+SESSION_SUSPEND_MAX_WAIT = 600  # Seconds
+
+# ------------------------------
+# Context Window Configuration
+# ------------------------------
+# Maximum prompt tokens sent per turn; the oldest turns are dropped first while
+# the system prompt and memory context are always kept
+CONTEXT_TOKEN_BUDGET = 12000
+
+# ------------------------------
+# Background Processing Configuration
+# ------------------------------
+BACKGROUND_WORKERS = 4  # Threads for work kept off the request path
+# How reflection questions are generated: "inline" (before the reply is returned),
+# "background" (after the reply, fetched via /api/insights or pushed on the stream)
+# or "structured" (returned together with the reply by a single JSON LLM call)
+REFLECTION_QUESTIONS_MODE = "background"
+REFLECTION_QUESTIONS_WAIT = 30  # Seconds a stream waits to push background reflection questions
+# Context gathering (Google data, task creation, memories) runs as concurrent
+# stages before the LLM call; a read stage slower than the timeout is dropped.
+# Task creation has a side effect, so it is always waited for
+CONTEXT_STAGE_WORKERS = 8
+CONTEXT_STAGE_TIMEOUT = 3.0  # Seconds
+CONTEXT_STAGE_TIMEOUTS = {}  # Per-stage overrides
+
+# ------------------------------
+# Latency Budget Configuration
+# ------------------------------
+# Default budget for a chat request when the client sends no deadline_ms (None
+# for no deadline). Optional stages are cut short or skipped to meet it
+TURN_DEADLINE_MS = None
+DEADLINE_REPLY_RESERVE = 1.5  # Seconds always kept for generating the reply
+DEADLINE_MIN_STAGE_TIME = 0.25  # Seconds; a context stage with less time left is not started
+DEADLINE_INSIGHTS_RESERVE = 3.0  # Seconds needed to generate reflection questions before replying
 
 def validate_configuration():
     """Validate configuration and log relevant information."""
@@ -17,9 +17,11 @@ except ImportError:
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+import httplib2
 
-from app.config.settings import DEBUG
+from app.config.settings import DEBUG, GOOGLE_API_TIMEOUT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -57,6 +59,21 @@ def get_google_credentials():
     
     return creds
 
+def build_service(service_name: str, version: str, creds: Credentials):
+    """
+    Build a Google API client whose HTTP requests time out after GOOGLE_API_TIMEOUT seconds.
+    
+    Args:
+        service_name: The API name (e.g. 'calendar', 'tasks').
+        version: The API version.
+        creds: OAuth2 credentials.
+        
+    Returns:
+        The API client.
+    """
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=GOOGLE_API_TIMEOUT))
+    return build(service_name, version, http=http)
+
 def get_upcoming_events(max_results=10, time_min=None, calendar_id='primary'):
     """
     Get upcoming events from Google Calendar.
@@ -77,7 +94,7 @@ def get_upcoming_events(max_results=10, time_min=None, calendar_id='primary'):
             return _get_mock_events(max_results)
         
         # Build the service
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         # Set default time_min to now if not provided
         if not time_min:
@@ -184,7 +201,7 @@ class GoogleCalendarCreateTool(BaseTool):
         """Run the tool."""
         try:
             creds = get_google_credentials()
-            service = build('calendar', 'v3', credentials=creds)
+            service = build_service('calendar', 'v3', creds)
             
             # Parse start and end times
             # For simplicity, we'll use the datetime library, but in a full implementation
@@ -267,7 +284,7 @@ class GoogleCalendarViewTool(BaseTool):
         """Run the tool."""
         try:
             creds = get_google_credentials()
-            service = build('calendar', 'v3', credentials=creds)
+            service = build_service('calendar', 'v3', creds)
             
             # Parse time boundaries
             # For simplicity in this example
@@ -12,10 +12,9 @@ from langchain_core.tools import BaseTool
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 
 from app.config.settings import DEBUG
-from app.integrations.google.calendar import get_google_credentials
+from app.integrations.google.calendar import build_service, get_google_credentials
 
 # Use direct pydantic imports instead of the deprecated langchain_core ones
 try:
@@ -49,7 +48,7 @@ def get_tasks(max_results=10, list_id=None):
             return _get_mock_tasks(max_results)
         
         # Build the service
-        service = build('tasks', 'v1', credentials=creds)
+        service = build_service('tasks', 'v1', creds)
         
         # Get the task list ID if not provided
         if not list_id:
@@ -109,7 +108,7 @@ def create_task(title, notes=None, due_date=None, list_id=None):
             return _create_mock_task(title, notes, due_date)
         
         # Build the service
-        service = build('tasks', 'v1', credentials=creds)
+        service = build_service('tasks', 'v1', creds)
         
         # Get the task list ID if not provided
         if not list_id:
@@ -249,7 +248,7 @@ class GoogleTaskCreateTool(BaseTool):
         """Run the tool."""
         try:
             creds = get_google_credentials()
-            service = build('tasks', 'v1', credentials=creds)
+            service = build_service('tasks', 'v1', creds)
             
             # If no list ID is provided, get the default task list
             if not list_id:
@@ -316,7 +315,7 @@ class GoogleTaskViewTool(BaseTool):
         """Run the tool."""
         try:
             creds = get_google_credentials()
-            service = build('tasks', 'v1', credentials=creds)
+            service = build_service('tasks', 'v1', creds)
             
             # If no list ID is provided, get the default task list
             if not list_id:
@@ -394,7 +393,7 @@ class GoogleTaskCompleteTool(BaseTool):
         """Run the tool."""
         try:
             creds = get_google_credentials()
-            service = build('tasks', 'v1', credentials=creds)
+            service = build_service('tasks', 'v1', creds)
             
             # If no list ID is provided, get the default task list
             if not list_id:
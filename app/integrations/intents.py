@@ -0,0 +1,160 @@
+"""
+Intent detection for the Bahai Life Coach agent.
+
+The agent, the integration manager and the memory extractor each used to scan
+a message with their own keyword checks and regexes. This module tokenizes a
+message once and walks a token trie built from all intent phrases, so every
+intent (memory recall, calendar view/create, task create/view/complete,
+explicit "remember" requests, and plain calendar/task mentions) is found in a
+single pass over the message.
+
+Phrases are written with groups of alternatives, e.g.
+"(add|create|make) (a|an|the|) (task|to-do)"; an empty alternative makes the
+group optional. They are expanded into token sequences when the module loads.
+"""
+
+import itertools
+import re
+from typing import Dict, List, Tuple
+
+# Intent names
+MEMORY_RECALL = "memory_recall"
+REMEMBER = "remember"
+CALENDAR_CREATE = "calendar_create"
+CALENDAR_VIEW = "calendar_view"
+TASK_CREATE = "task_create"
+TASK_VIEW = "task_view"
+TASK_COMPLETE = "task_complete"
+CALENDAR_MENTION = "calendar_mention"
+TASK_MENTION = "task_mention"
+CREATE_VERB = "create_verb"
+
+INTENT_PHRASES = {
+    MEMORY_RECALL: [
+        "what do you remember about",
+        "recall our (discussions|discussion|conversations|conversation) (on|about)"
+    ],
+    REMEMBER: [
+        "remember (that|this)",
+        "please remember",
+        "please remember that",
+        "can you remember",
+        "can you remember that",
+        "store this (information|fact)"
+    ],
+    CALENDAR_CREATE: [
+        "(schedule|create|add|set up|organize|book|plan) (a|an|the|) (meeting|event|appointment|reminder)",
+        "remind me (to|about|of)",
+        "(add|put) (this|that|it) (on|in) my calendar",
+        "add (an|a) event",
+        "schedule (for|on|at)"
+    ],
+    CALENDAR_VIEW: [
+        "(show|check|view|get|what is|what's) my (calendar|schedule|agenda)",
+        "(what do i have|what's|what is) (planned|scheduled|) (today|tomorrow|this week|next week|on)",
+        "(do i have|are there) any (events|meetings|appointments)"
+    ],
+    TASK_CREATE: [
+        "(add|create|make) (a|an|the|) (task|to-do|todo|item|reminder)",
+        "remind me to",
+        "add to my (to-do|todo) list",
+        "i need to (remember to|do)"
+    ],
+    TASK_VIEW: [
+        "(show|check|view|get|what is|what's) my (tasks|to-do list|todo list)",
+        "what do i need to do",
+        "(show|list) (all|my|) (tasks|to-dos|todos)"
+    ],
+    TASK_COMPLETE: [
+        "(mark|set) (as|) completed",
+        "(i've|i have|i) (finished|completed|done)",
+        "(mark|check) off"
+    ],
+    CALENDAR_MENTION: [
+        "(calendar|calendars|schedule|schedules|scheduled|appointment|appointments|meeting|meetings|event|events)"
+    ],
+    TASK_MENTION: [
+        "(task|tasks|todo|todos|to-do|to-dos|to do|reminder|reminders)"
+    ],
+    CREATE_VERB: [
+        "(add|adding|create|creating|make|making|set|setting)"
+    ]
+}
+
+# Words (with inner apostrophes or hyphens) and sentence ends, which phrases never cross
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*|[.!?]", re.IGNORECASE)
+_GROUP_PATTERN = re.compile(r"\(([^)]*)\)|([^\s()]+)")
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'"})
+
+# Key under which a trie node stores the intents of the phrases ending there
+_INTENTS = ""
+
+
+def _expand(phrase: str) -> List[List[str]]:
+    """Expand a phrase with groups of alternatives into token sequences."""
+    slots = []
+    for group, word in _GROUP_PATTERN.findall(phrase):
+        slots.append([option.split() for option in group.split("|")] if group or not word else [[word]])
+    return [[token for part in combination for token in part] for combination in itertools.product(*slots)]
+
+
+def _build_trie(intent_phrases: Dict[str, List[str]]) -> Dict[str, dict]:
+    """Build a token trie of all intent phrases."""
+    root: Dict[str, dict] = {}
+    for intent, phrases in intent_phrases.items():
+        for phrase in phrases:
+            for tokens in _expand(phrase):
+                node = root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_INTENTS, []).append(intent)
+    return root
+
+
+_TRIE = _build_trie(INTENT_PHRASES)
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Split a message into lower-cased tokens.
+
+    Args:
+        text: The message
+
+    Returns:
+        (token, start offset, end offset) tuples
+    """
+    # Tokens are lower-cased one by one so offsets stay valid in the original text
+    normalized = text.translate(_APOSTROPHES)
+    return [(match.group().lower(), match.start(), match.end()) for match in _TOKEN_PATTERN.finditer(normalized)]
+
+
+def detect_intents(text: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Detect all intents in a message in a single pass.
+
+    Args:
+        text: The message
+
+    Returns:
+        Intent names mapped to the (start, end) character spans of their
+        matches (the longest match at each position). Intents that were not
+        detected are absent.
+    """
+    if not text:
+        return {}
+
+    tokens = tokenize(text)
+    found: Dict[str, List[Tuple[int, int]]] = {}
+    for i, (_, start, _) in enumerate(tokens):
+        node = _TRIE
+        longest: Dict[str, int] = {}
+        for j in range(i, len(tokens)):
+            node = node.get(tokens[j][0])
+            if node is None:
+                break
+            for intent in node.get(_INTENTS, ()):
+                longest[intent] = tokens[j][2]
+        for intent, end in longest.items():
+            found.setdefault(intent, []).append((start, end))
+    return found
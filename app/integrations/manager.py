@@ -31,6 +31,14 @@ except ImportError:
     GOOGLE_INTEGRATIONS_AVAILABLE = False
 
 from app.config.settings import DEBUG
+from app.integrations.intents import (
+    detect_intents,
+    CALENDAR_CREATE,
+    CALENDAR_VIEW,
+    TASK_CREATE,
+    TASK_VIEW,
+    TASK_COMPLETE
+)
 
 class IntegrationManager:
     """Manager for handling integrations with external services."""
@@ -79,113 +87,78 @@ class IntegrationManager:
         Returns:
             Dictionary with integration details if detected, None otherwise
         """
-        # Check for calendar-related actions
-        calendar_patterns = [
-            r"(schedule|create|add|set up|organize|book|plan)\s+(a|an|the)?\s*(meeting|event|appointment|reminder)",
-            r"remind me (to|about|of)",
-            r"(add|put) (this|that|it) (on|in) my calendar",
-            r"add (an|a) event",
-            r"schedule (for|on|at)"
-        ]
+        intents = detect_intents(text)
         
-        for pattern in calendar_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                # Extract potential event details
-                title = self._extract_event_title(text)
-                time_info = self._extract_time_info(text)
-                
-                return {
-                    'action': 'create_calendar_event',
-                    'tool': 'google_calendar_create',
-                    'params': {
-                        'title': title or "New Event",
-                        'start_time': time_info.get('start_time'),
-                        'end_time': time_info.get('end_time'),
-                        'description': time_info.get('description')
-                    }
+        # Check for calendar-related actions
+        if CALENDAR_CREATE in intents:
+            # Extract potential event details
+            title = self._extract_event_title(text)
+            time_info = self._extract_time_info(text)
+            
+            return {
+                'action': 'create_calendar_event',
+                'tool': 'google_calendar_create',
+                'params': {
+                    'title': title or "New Event",
+                    'start_time': time_info.get('start_time'),
+                    'end_time': time_info.get('end_time'),
+                    'description': time_info.get('description')
                 }
+            }
         
         # Check for calendar view actions
-        calendar_view_patterns = [
-            r"(show|check|view|get|what( is|'s))\s+my\s+(calendar|schedule|agenda)",
-            r"(what do I have|what's|what is)(\s+planned|\s+scheduled)?\s+(today|tomorrow|this week|next week|on)",
-            r"(do I have|are there) any (events|meetings|appointments)"
-        ]
-        
-        for pattern in calendar_view_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                # Extract potential time range
-                time_info = self._extract_time_info(text)
-                
-                return {
-                    'action': 'view_calendar_events',
-                    'tool': 'google_calendar_view',
-                    'params': {
-                        'time_min': time_info.get('start_time'),
-                        'time_max': time_info.get('end_time'),
-                        'query': time_info.get('query')
-                    }
+        if CALENDAR_VIEW in intents:
+            # Extract potential time range
+            time_info = self._extract_time_info(text)
+            
+            return {
+                'action': 'view_calendar_events',
+                'tool': 'google_calendar_view',
+                'params': {
+                    'time_min': time_info.get('start_time'),
+                    'time_max': time_info.get('end_time'),
+                    'query': time_info.get('query')
                 }
+            }
         
         # Check for task-related actions
-        task_patterns = [
-            r"(add|create|make)\s+(a|an|the)?\s*(task|to-?do|item|reminder)",
-            r"(remind me to|add to my to-?do list)",
-            r"I need to (remember to|do)"
-        ]
-        
-        for pattern in task_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                # Extract potential task details
-                title = self._extract_task_title(text)
-                due_date = self._extract_due_date(text)
-                
-                return {
-                    'action': 'create_task',
-                    'tool': 'google_task_create',
-                    'params': {
-                        'title': title or "New Task",
-                        'notes': None,
-                        'due_date': due_date
-                    }
+        if TASK_CREATE in intents:
+            # Extract potential task details
+            title = self._extract_task_title(text)
+            due_date = self._extract_due_date(text)
+            
+            return {
+                'action': 'create_task',
+                'tool': 'google_task_create',
+                'params': {
+                    'title': title or "New Task",
+                    'notes': None,
+                    'due_date': due_date
                 }
+            }
         
         # Check for task view actions
-        task_view_patterns = [
-            r"(show|check|view|get|what( is|'s))\s+my\s+(tasks|to-?do list)",
-            r"what do I need to do",
-            r"(show|list) (all|my)?\s*(tasks|to-?dos)"
-        ]
-        
-        for pattern in task_view_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return {
-                    'action': 'view_tasks',
-                    'tool': 'google_task_view',
-                    'params': {
-                        'show_completed': 'completed' in text.lower()
-                    }
+        if TASK_VIEW in intents:
+            return {
+                'action': 'view_tasks',
+                'tool': 'google_task_view',
+                'params': {
+                    'show_completed': 'completed' in text.lower()
                 }
+            }
         
         # Check for task completion actions
-        task_complete_patterns = [
-            r"(mark|set)\s+(as)?\s*completed",
-            r"(I('ve| have)|i) (finished|completed|done)",
-            r"(mark|check) off"
-        ]
-        
-        for pattern in task_complete_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                # This is tricky since we need the task ID, which we don't know from text alone
-                # We'll need the LLM to prompt for more information or clarify
-                return {
-                    'action': 'complete_task',
-                    'tool': 'google_task_complete',
-                    'params': {
-                        'task_id': None  # We don't have this from the text alone
-                    },
-                    'needs_more_info': True
-                }
+        if TASK_COMPLETE in intents:
+            # This is tricky since we need the task ID, which we don't know from text alone
+            # We'll need the LLM to prompt for more information or clarify
+            return {
+                'action': 'complete_task',
+                'tool': 'google_task_complete',
+                'params': {
+                    'task_id': None  # We don't have this from the text alone
+                },
+                'needs_more_info': True
+            }
         
         # No integration action detected
         return None
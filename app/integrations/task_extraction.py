@@ -0,0 +1,194 @@
+"""
+Task extraction for the Bahai Life Coach agent.
+
+Most task requests use a handful of phrasings ("remind me to X by Friday",
+"add a task to X"), which precompiled rules parse locally in microseconds. Each
+rule-based extraction gets a confidence score; only when it is below
+TASK_EXTRACTION_MIN_CONFIDENCE (or no rule matches) is the LLM asked for the
+title. Counters record how often each path is taken.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.integrations.google.date_parser import parse_natural_language_date
+from app.config.settings import TASK_EXTRACTION_MIN_CONFIDENCE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TASK_TITLE_PROMPT = """
+You are helping to extract a task from a user message. The user wants to create a new task or reminder.
+From the following message, identify the main task title. Return ONLY the task title, nothing else.
+
+User message: {user_message}
+
+Task title:
+"""
+
+# Optional politeness before the request ("please", "can you", "could you please")
+_PREFIX = r"^\s*(?:(?:hey|ok|okay|so)[,\s]+)?(?:(?:can|could|would|will)\s+you\s+)?(?:please\s+)?"
+
+# Request phrasings with the confidence of a clean match; group 'title' holds the rest
+_TASK_PATTERNS = [
+    (re.compile(_PREFIX + r"remind\s+me\s+to\s+(?P<title>[^.!?\n]+)", re.IGNORECASE), 0.95),
+    (re.compile(_PREFIX + r"(?:don'?t|do\s+not)\s+let\s+me\s+forget\s+to\s+(?P<title>[^.!?\n]+)", re.IGNORECASE), 0.9),
+    (re.compile(_PREFIX + r"(?:add|create|make|set(?:\s+up)?)\s+(?:me\s+)?(?:a\s+|an\s+|the\s+|new\s+)*"
+                r"(?:task|to-?do|todo|reminder)(?:\s+item)?\s*(?:to\s+|for\s+|about\s+|called\s+|titled\s+|:\s*)?"
+                r"(?P<title>[^.!?\n]+)", re.IGNORECASE), 0.9),
+    (re.compile(_PREFIX + r"add\s+(?P<title>[^.!?\n]+?)\s+to\s+my\s+(?:task\s+list|tasks|to-?do(?:\s+list)?|todo(?:\s+list)?|list)",
+                re.IGNORECASE), 0.85),
+    (re.compile(r"\bi\s+need\s+to\s+(?:remember\s+to\s+)?(?P<title>[^.!?\n]+)", re.IGNORECASE), 0.6),
+]
+
+# Trailing due-date phrase, e.g. "by Friday", "on 05/01/2026", "tomorrow"
+_WEEKDAYS = r"(?:mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?"
+_DATE_WORDS = (r"(?:today|tonight|tomorrow|(?:the\s+)?day\s+after\s+tomorrow|(?:this|next)\s+(?:week(?:end)?|month)"
+               r"|(?:next\s+)?" + _WEEKDAYS + r"|\d{1,2}[/\-]\d{1,2}[/\-]\d{4})")
+_DUE_PATTERN = re.compile(
+    r"\s+(?:(?:by|on|before|until|due(?:\s+(?:by|on))?)\s+(?P<due>.+?)|(?P<bare>" + _DATE_WORDS + r"))\s*$",
+    re.IGNORECASE
+)
+
+# Words that make a title depend on earlier context ("remind me to do it")
+_VAGUE_TITLE = re.compile(
+    r"^(?:(?:it|that|this|them|those|these)\b|(?:\w+\s+)?(?:it|that|this|them|those|these|something|stuff|things?)"
+    r"(?:\s+(?:later|again|too|now))?$)",
+    re.IGNORECASE
+)
+
+# Path counters
+_stats = {'rule': 0, 'llm': 0, 'rule_fallback': 0, 'failed': 0}
+_stats_lock = threading.Lock()
+
+
+def _record(path: str) -> None:
+    with _stats_lock:
+        _stats[path] += 1
+
+
+def get_task_extraction_stats() -> Dict[str, Any]:
+    """
+    Get how often each extraction path was taken.
+
+    Returns:
+        Counts for 'rule' (rules were confident), 'llm' (the LLM extracted the
+        title), 'rule_fallback' (the LLM failed and a low-confidence rule match
+        was used) and 'failed', plus the share handled by rules alone.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    total = sum(stats.values())
+    stats['rule_rate'] = stats['rule'] / total if total else 0.0
+    return stats
+
+
+def _split_due_date(rest: str) -> Tuple[str, Optional[str], bool]:
+    """
+    Split a trailing due-date phrase off the text after the request verb.
+
+    Returns:
+        A tuple of (title text, due date as YYYY-MM-DD or None, whether a date
+        phrase was found but could not be parsed)
+    """
+    match = _DUE_PATTERN.search(rest)
+    if not match:
+        return rest, None, False
+
+    phrase = (match.group('due') or match.group('bare')).strip().rstrip(".!?")
+    parsed = parse_natural_language_date(phrase)
+    if parsed is None:
+        # "by the river" is part of the title, not a date
+        return rest, None, match.group('bare') is None
+    return rest[:match.start()], parsed.date().isoformat(), False
+
+
+def _clean_title(title: str) -> str:
+    """Tidy an extracted title."""
+    title = title.strip().strip("\"'").strip()
+    title = re.sub(r"^(?:to|that\s+i\s+(?:need|have)\s+to)\s+", "", title, flags=re.IGNORECASE)
+    title = re.sub(r"[\s,;:]*(?:please|for\s+me|thanks?(?:\s+you)?)?[\s,;:.!?]*$", "", title, flags=re.IGNORECASE)
+    return title[:1].upper() + title[1:]
+
+
+def extract_task(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract a task from a message with the local rules.
+
+    Args:
+        text: The user's message
+
+    Returns:
+        A dictionary with the 'title', 'due_date' (YYYY-MM-DD or None) and the
+        'confidence' of the match (0-1), or None if no rule matches
+    """
+    for pattern, confidence in _TASK_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+
+        rest, due_date, unparsed_date = _split_due_date(match.group('title'))
+        title = _clean_title(rest)
+        words = title.split()
+        if not words:
+            continue
+
+        if len(words) > 12:
+            confidence -= 0.3  # A rambling clause rather than a task title
+        if _VAGUE_TITLE.match(title):
+            confidence -= 0.4  # Needs the conversation to resolve
+        if re.search(r"\b(?:and\s+then|but|because|although)\b", title, re.IGNORECASE):
+            confidence -= 0.2  # Likely more than one thing
+        if unparsed_date:
+            confidence -= 0.2
+        if len(text.strip()) > len(match.group(0).strip()) + 40:
+            confidence -= 0.1  # The request is buried in a longer message
+
+        return {
+            'title': title,
+            'due_date': due_date,
+            'confidence': round(max(0.0, confidence), 2)
+        }
+
+    return None
+
+
+def extract_task_with_fallback(text: str, llm: Any) -> Optional[Dict[str, Any]]:
+    """
+    Extract a task, asking the LLM only when the rules are not confident.
+
+    Args:
+        text: The user's message
+        llm: LLM client used for low-confidence messages
+
+    Returns:
+        A dictionary with the 'title', 'due_date' and the 'method' used
+        ('rule', 'llm' or 'rule_fallback'), or None if no title was found
+    """
+    result = extract_task(text)
+    if result and result['confidence'] >= TASK_EXTRACTION_MIN_CONFIDENCE:
+        _record('rule')
+        return {**result, 'method': 'rule'}
+
+    try:
+        title = llm.invoke(TASK_TITLE_PROMPT.format(user_message=text)).content.strip()
+        if title:
+            _record('llm')
+            return {
+                'title': _clean_title(title),
+                'due_date': result['due_date'] if result else None,
+                'confidence': None,
+                'method': 'llm'
+            }
+    except Exception as e:
+        logger.error(f"Error extracting task title with LLM: {str(e)}")
+
+    if result:
+        _record('rule_fallback')
+        return {**result, 'method': 'rule_fallback'}
+
+    _record('failed')
+    return None
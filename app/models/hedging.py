@@ -0,0 +1,414 @@
+"""
+Hedged Request Module for the Bahai Life Coach Agent.
+
+Provider latency has a long tail: the slowest few percent of calls take
+several times the median. A hedged client sends the request to the primary
+model and, if no first token has arrived by a high percentile of that model's
+observed latency, sends a duplicate to a backup model (or the same model).
+Whichever answers first wins and the other request is cancelled, which trims
+the tail at the cost of a few percent of duplicate calls.
+
+Waiting for the legs is bounded by HEDGE_MAX_WAIT and by the deadline of the
+current request, so two hung providers cannot hold a request forever.
+"""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from app.config.settings import (
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_MIN_DELAY,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MAX_WAIT
+)
+from app.utils.deadline import get_current_deadline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Global latency tracker instance (singleton pattern)
+_tracker_instance = None
+_tracker_lock = threading.Lock()
+
+# Marker put on a leg's queue when its stream ends
+_END = object()
+
+
+class LatencyTracker:
+    """
+    Thread-safe record of recent call latencies per model and call kind.
+    """
+
+    def __init__(self, window: int = HEDGE_LATENCY_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        """
+        Initialize an empty tracker.
+
+        Args:
+            window: Number of recent latencies kept per key
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self._samples: Dict[Tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, kind: str, latency: float) -> None:
+        """
+        Record a latency.
+
+        Args:
+            model_name: The model that served the call
+            kind: 'first_token' for streams, 'response' for whole calls
+            latency: Seconds until the first token or the full response
+        """
+        with self._lock:
+            samples = self._samples.get((model_name, kind))
+            if samples is None:
+                samples = self._samples[(model_name, kind)] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def percentile(self, model_name: str, kind: str, percentile: float) -> Optional[float]:
+        """
+        Get a latency percentile.
+
+        Args:
+            model_name: The model name
+            kind: 'first_token' or 'response'
+            percentile: The percentile (0-100)
+
+        Returns:
+            The latency in seconds, or None if there are not enough samples yet
+        """
+        with self._lock:
+            samples = sorted(self._samples.get((model_name, kind), ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """
+    Get the shared latency tracker (singleton pattern).
+
+    Returns:
+        The latency tracker
+    """
+    global _tracker_instance
+
+    if _tracker_instance is None:
+        with _tracker_lock:
+            if _tracker_instance is None:
+                _tracker_instance = LatencyTracker()
+
+    return _tracker_instance
+
+
+class HedgedLLM:
+    """
+    LLM client that hedges slow calls with a duplicate request.
+
+    Exposes invoke, stream, ainvoke and astream like the routed clients it
+    wraps. Until enough latencies have been observed for the primary model no
+    hedge is sent.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 primary: Any,
+                 backup: Any,
+                 backup_model: Optional[str] = None,
+                 percentile: float = HEDGE_PERCENTILE,
+                 tracker: Optional[LatencyTracker] = None):
+        """
+        Initialize the hedged client.
+
+        Args:
+            model_name: The primary model name (the key for its latency statistics)
+            primary: Client for the primary model
+            backup: Client the hedge request is sent to
+            backup_model: The backup model name (defaults to the primary model)
+            percentile: Latency percentile after which the hedge is sent
+            tracker: Latency tracker (defaults to the shared one)
+        """
+        self.model_name = model_name
+        self.primary = primary
+        self.backup = backup
+        self.backup_model = backup_model or model_name
+        self.percentile = percentile
+        self.tracker = tracker or get_latency_tracker()
+
+    def _wait_until(self) -> float:
+        """Monotonic time after which waiting for the legs is abandoned."""
+        deadline = get_current_deadline()
+        wait = deadline.cap(HEDGE_MAX_WAIT) if deadline else HEDGE_MAX_WAIT
+        return time.monotonic() + wait
+
+    def _get(self, results: queue.Queue, wait_until: float) -> Any:
+        """Take the next item from a leg queue, raising TimeoutError once the wait is over."""
+        try:
+            return results.get(timeout=max(0.0, wait_until - time.monotonic()))
+        except queue.Empty:
+            raise TimeoutError(f"No response from {self.model_name} within the time allowed") from None
+
+    def _start_leg(self, target: Any, name: str) -> None:
+        """Run a leg in a daemon thread, carrying over the caller's context (deadline, priority)."""
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(target,), name=name, daemon=True).start()
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        """Seconds to wait for the primary before hedging (None disables the hedge)."""
+        delay = self.tracker.percentile(self.model_name, kind, self.percentile)
+        return max(delay, HEDGE_MIN_DELAY) if delay is not None else None
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """
+        Invoke the primary model, hedging if it is slower than usual.
+
+        A blocking call cannot be interrupted, so the losing request is left to
+        finish in its thread and its result is discarded.
+        """
+        delay = self._hedge_delay('response')
+        if delay is None:
+            return self._timed_invoke(self.primary, self.model_name, prompt, *args, **kwargs)
+
+        results: "queue.Queue[Tuple[str, bool, Any]]" = queue.Queue()
+        wait_until = self._wait_until()
+
+        def run(leg: str, client: Any, model_name: str) -> None:
+            try:
+                results.put((leg, True, self._timed_invoke(client, model_name, prompt, *args, **kwargs)))
+            except Exception as e:
+                results.put((leg, False, e))
+
+        self._start_leg(lambda: run("primary", self.primary, self.model_name), "hedge-primary")
+        legs = 1
+        try:
+            leg, ok, value = results.get(timeout=max(0.0, min(delay, wait_until - time.monotonic())))
+        except queue.Empty:
+            logger.info(f"No response from {self.model_name} after {delay:.2f}s, hedging with {self.backup_model}")
+            self._start_leg(lambda: run("backup", self.backup, self.backup_model), "hedge-backup")
+            legs = 2
+            leg, ok, value = self._get(results, wait_until)
+
+        # Fall back to the other leg if the first one to finish failed
+        while not ok and legs > 1:
+            legs -= 1
+            leg, ok, value = self._get(results, wait_until)
+        if not ok:
+            raise value
+        return value
+
+    def stream(self, prompt: Any, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """
+        Stream from the primary model, hedging if its first token is late.
+
+        Each leg streams into its own queue from a worker thread. Once a leg
+        produces its first chunk, the other leg is told to stop and closes its
+        stream (and with it the provider connection).
+        """
+        delay = self._hedge_delay('first_token')
+        if delay is None:
+            yield from self._timed_stream(self.primary, self.model_name, prompt, *args, **kwargs)
+            return
+
+        first: "queue.Queue[Tuple[str, bool, Any]]" = queue.Queue()
+        legs: Dict[str, Tuple[queue.Queue, threading.Event]] = {}
+
+        def start(leg: str, client: Any, model_name: str) -> None:
+            chunks: queue.Queue = queue.Queue()
+            stop = threading.Event()
+            legs[leg] = (chunks, stop)
+
+            def run() -> None:
+                stream = self._timed_stream(client, model_name, prompt, *args, **kwargs)
+                started = False
+                try:
+                    for chunk in stream:
+                        if stop.is_set():
+                            break
+                        if not started:
+                            started = True
+                            first.put((leg, True, chunk))
+                        else:
+                            chunks.put(chunk)
+                    chunks.put(_END)
+                    if not started:
+                        first.put((leg, True, _END))
+                except Exception as e:
+                    chunks.put(e)
+                    if not started:
+                        first.put((leg, False, e))
+                finally:
+                    stream.close()
+
+            self._start_leg(run, f"hedge-{leg}")
+
+        wait_until = self._wait_until()
+        start("primary", self.primary, self.model_name)
+        try:
+            leg, ok, value = first.get(timeout=max(0.0, min(delay, wait_until - time.monotonic())))
+        except queue.Empty:
+            logger.info(f"No first token from {self.model_name} after {delay:.2f}s, hedging with {self.backup_model}")
+            start("backup", self.backup, self.backup_model)
+            try:
+                leg, ok, value = self._get(first, wait_until)
+            except TimeoutError:
+                for _, stop in legs.values():
+                    stop.set()
+                raise
+
+        # Fall back to the other leg if the first one to finish failed
+        if not ok and len(legs) > 1:
+            leg, ok, value = self._get(first, wait_until)
+        if not ok:
+            raise value
+
+        # Cancel the losing leg
+        for other, (_, stop) in legs.items():
+            if other != leg:
+                stop.set()
+                logger.info(f"Hedged stream won by {leg} leg, cancelling {other} leg")
+
+        chunks, stop = legs[leg]
+        try:
+            if value is _END:
+                return
+            yield value
+            while True:
+                # Once tokens flow, only a stalled stream is abandoned
+                chunk = self._get(chunks, time.monotonic() + HEDGE_MAX_WAIT)
+                if chunk is _END:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stop.set()
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of invoke(); the losing request is cancelled."""
+        delay = self._hedge_delay('response')
+        wait_until = self._wait_until()
+        primary = asyncio.ensure_future(self._timed_ainvoke(self.primary, self.model_name, prompt, *args, **kwargs))
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=max(0.0, min(delay, wait_until - time.monotonic())))
+        if done:
+            return primary.result()
+
+        logger.info(f"No response from {self.model_name} after {delay:.2f}s, hedging with {self.backup_model}")
+        backup = asyncio.ensure_future(self._timed_ainvoke(self.backup, self.backup_model, prompt, *args, **kwargs))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wait_until - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"No response from {self.model_name} within the time allowed")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both legs failed
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, prompt: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Async counterpart of stream(); the losing stream is cancelled and closed."""
+        delay = self._hedge_delay('first_token')
+        if delay is None:
+            async for chunk in self._timed_astream(self.primary, self.model_name, prompt, *args, **kwargs):
+                yield chunk
+            return
+
+        wait_until = self._wait_until()
+        streams = {"primary": self._timed_astream(self.primary, self.model_name, prompt, *args, **kwargs)}
+        firsts = {"primary": asyncio.ensure_future(streams["primary"].__anext__())}
+
+        done, _ = await asyncio.wait(set(firsts.values()),
+                                     timeout=max(0.0, min(delay, wait_until - time.monotonic())))
+        if not done:
+            logger.info(f"No first token from {self.model_name} after {delay:.2f}s, hedging with {self.backup_model}")
+            streams["backup"] = self._timed_astream(self.backup, self.backup_model, prompt, *args, **kwargs)
+            firsts["backup"] = asyncio.ensure_future(streams["backup"].__anext__())
+
+        winner = None
+        first_chunk = None
+        pending = set(firsts.values())
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, timeout=max(0.0, wait_until - time.monotonic()),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for leg, task in firsts.items():
+                if task in done and winner is None and (task.exception() is None or not pending):
+                    winner = leg
+
+        # Cancel and close the losing leg
+        for leg, task in firsts.items():
+            if leg != winner:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                try:
+                    await streams[leg].aclose()
+                except Exception:
+                    pass
+        if winner is None:
+            raise TimeoutError(f"No first token from {self.model_name} within the time allowed")
+
+        stream = streams[winner]
+        try:
+            try:
+                first_chunk = firsts[winner].result()
+            except StopAsyncIteration:
+                return
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def _timed_invoke(self, client: Any, model_name: str, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Invoke a client and record its latency."""
+        start_time = time.monotonic()
+        result = client.invoke(prompt, *args, **kwargs)
+        self.tracker.record(model_name, 'response', time.monotonic() - start_time)
+        return result
+
+    def _timed_stream(self, client: Any, model_name: str, prompt: Any, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """Stream from a client and record its time to first token."""
+        start_time = time.monotonic()
+        started = False
+        for chunk in client.stream(prompt, *args, **kwargs):
+            if not started:
+                started = True
+                self.tracker.record(model_name, 'first_token', time.monotonic() - start_time)
+            yield chunk
+
+    async def _timed_ainvoke(self, client: Any, model_name: str, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of _timed_invoke()."""
+        start_time = time.monotonic()
+        result = await client.ainvoke(prompt, *args, **kwargs)
+        self.tracker.record(model_name, 'response', time.monotonic() - start_time)
+        return result
+
+    async def _timed_astream(self, client: Any, model_name: str, prompt: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Async counterpart of _timed_stream()."""
+        start_time = time.monotonic()
+        started = False
+        async for chunk in client.astream(prompt, *args, **kwargs):
+            if not started:
+                started = True
+                self.tracker.record(model_name, 'first_token', time.monotonic() - start_time)
+            yield chunk
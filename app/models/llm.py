@@ -2,19 +2,22 @@
 LLM Module for the Bahai Life Coach Agent.
 
 This module provides a centralized interface for accessing various LLM providers
-through a singleton pattern for efficiency.
+through a thread-safe pool of long-lived clients for efficiency. Clients handed
+to the agents are routed, failing over to other providers during an incident.
 """
 
 import os
 import logging
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global LLM instance (singleton pattern)
-_llm_instance = None
+# Global client pool instance (singleton pattern)
+_client_pool = None
+_client_pool_lock = threading.Lock()
 
 # Import LLM providers
 try:
@@ -35,9 +38,21 @@ except ImportError:
     logger.warning("Deepseek not available. Install with: pip install langchain-deepseek")
     Deepseek = None
 
+# httpx ships with the OpenAI SDK and lets OpenAI-compatible providers share connections
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # Import model information
-from app.models.llm_models import get_model_info, get_model_api_key
-from app.config.settings import LLM_MODEL
+from app.models.llm_models import get_model_info, get_model_api_key, get_provider_info
+from app.config.settings import (
+    LLM_MODEL, LLM_POOL_MAX_CONNECTIONS, LLM_POOL_KEEPALIVE_EXPIRY, LLM_REQUEST_TIMEOUT, ENABLE_LLM_FAILOVER,
+    ENABLE_HEDGING, HEDGE_MODEL, ENABLE_RESPONSE_CACHE, LLM_PURPOSE_MODELS
+)
+from app.models.router import RoutedLLM
+from app.models.hedging import HedgedLLM
+from app.models.response_cache import CachedLLM
 
 # Map of provider names to classes
 MODEL_CLASSES = {
@@ -47,81 +62,305 @@ MODEL_CLASSES = {
     # Add other providers here
 }
 
-def get_llm_model(force_refresh: bool = False) -> Any:
+def _resolve_provider(model_name: str) -> Tuple[str, Any, str, Dict[str, Any]]:
     """
-    Get the LLM instance using singleton pattern with refresh capability.
+    Resolve the provider class for a model, falling back to an available provider.
     
     Args:
-        force_refresh: If True, creates a new instance even if one exists
+        model_name: The name of the model
         
     Returns:
-        The LLM instance
+        Tuple of (provider_name, provider_class, model_name, model_info)
     """
-    global _llm_instance
+    model_info = get_model_info(model_name)
+    provider_name = model_info['provider']
+    ProviderClass = MODEL_CLASSES.get(provider_name)
     
-    if force_refresh or _llm_instance is None:
-        model_name = os.getenv('LLM_MODEL', LLM_MODEL)
-        logger.info(f"Using LLM model: {model_name}")
+    if ProviderClass is None:
+        logger.error(f"Provider {provider_name} implementation not available. Please install the required package.")
+        # Attempt to find an available provider
+        for p_name, p_class in MODEL_CLASSES.items():
+            if p_class is not None:
+                logger.warning(f"Falling back to available provider: {p_name}")
+                # Get default model for the available provider
+                provider_name = p_name
+                ProviderClass = p_class
+                model_name = get_provider_info(p_name)['default_model']
+                model_info = get_model_info(model_name)
+                break
+    
+    # If still None, we can't proceed
+    if ProviderClass is None:
+        logger.error("No LLM providers available. Please install at least one provider package.")
+        raise ImportError("No LLM providers available")
+    
+    return provider_name, ProviderClass, model_name, model_info
+
+class LLMClientPool:
+    """
+    Thread-safe pool of long-lived LLM clients.
+    
+    Clients are keyed by (provider, model, temperature, max_tokens) and reused
+    across agents and requests, so each combination pays for client construction
+    (and the provider's connection setup) only once. OpenAI-compatible providers
+    additionally share one keep-alive HTTP connection pool per provider.
+    """
+    
+    def __init__(self):
+        """Initialize an empty client pool."""
+        self._clients: Dict[Tuple[str, str, Optional[float], Optional[int]], Any] = {}
+        self._http_clients: Dict[str, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self,
+            model_name: str,
+            temperature: Optional[float] = None,
+            max_tokens: Optional[int] = None) -> Any:
+        """
+        Get a pooled client, creating it on first use.
         
-        try:
-            # Get model configuration
-            model_info = get_model_info(model_name)
-            provider_name = model_info['provider']
-            api_key = get_model_api_key(model_name)
-            
-            # Get the provider class
-            ProviderClass = MODEL_CLASSES.get(provider_name)
+        Args:
+            model_name: The name of the model (e.g., 'gemini-2.0-flash', 'gpt-4o')
+            temperature: Optional sampling temperature (provider default if None)
+            max_tokens: Optional output token limit (provider default if None)
             
-            if ProviderClass is None:
-                logger.error(f"Provider {provider_name} implementation not available. Please install the required package.")
-                # Attempt to find an available provider
-                for p_name, p_class in MODEL_CLASSES.items():
-                    if p_class is not None:
-                        logger.warning(f"Falling back to available provider: {p_name}")
-                        # Get default model for the available provider
-                        provider_name = p_name
-                        ProviderClass = p_class
-                        alt_model_info = get_model_info(model_info['models'][0])
-                        model_name = alt_model_info['default_model']
-                        api_key = get_model_api_key(model_name)
-                        break
-            
-            # If still None, we can't proceed
-            if ProviderClass is None:
-                logger.error("No LLM providers available. Please install at least one provider package.")
-                raise ImportError("No LLM providers available")
-            
-            # Check for API key
-            if not api_key:
-                logger.error(f"API key for model {model_name} not found (expected in {model_info['api_key_env']} environment variable)")
-                raise ValueError(f"API key for model {model_name} not found. Set {model_info['api_key_env']} environment variable.")
-            
-            # Initialize the LLM
-            api_param_name = model_info.get('api_param', 'api_key')
+        Returns:
+            The LLM client instance
+        """
+        provider_name, ProviderClass, model_name, model_info = _resolve_provider(model_name)
+        key = (provider_name, model_name, temperature, max_tokens)
+        
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(ProviderClass, provider_name, model_name, model_info,
+                                             temperature, max_tokens)
+                self._clients[key] = client
+        return client
+    
+    def evict(self, model_name: Optional[str] = None) -> int:
+        """
+        Remove clients from the pool so they are re-created on next use.
+        
+        Args:
+            model_name: Only evict clients for this model (all clients if None)
             
-            # Create kwargs with the appropriate api_key parameter name
-            kwargs = {
-                'model': model_name,
-                api_param_name: api_key
+        Returns:
+            Number of evicted clients
+        """
+        with self._lock:
+            keys = [key for key in self._clients if model_name is None or key[1] == model_name]
+            for key in keys:
+                del self._clients[key]
+        return len(keys)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get statistics about the pooled clients."""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'keys': [list(key) for key in self._clients],
+                'http_pools': list(self._http_clients.keys())
             }
-            
-            # Initialize the provider with the correct parameters
-            _llm_instance = ProviderClass(**kwargs)
-            logger.info(f"Successfully initialized LLM with model: {model_name} (provider: {provider_name})")
-            
+    
+    def _create_client(self,
+                       ProviderClass: Any,
+                       provider_name: str,
+                       model_name: str,
+                       model_info: Dict[str, Any],
+                       temperature: Optional[float],
+                       max_tokens: Optional[int]) -> Any:
+        """Create a new provider client (pool lock must be held)."""
+        api_key = get_model_api_key(model_name)
+        
+        # Check for API key
+        if not api_key:
+            logger.error(f"API key for model {model_name} not found (expected in {model_info['api_key_env']} environment variable)")
+            raise ValueError(f"API key for model {model_name} not found. Set {model_info['api_key_env']} environment variable.")
+        
+        # Create kwargs with the appropriate api_key parameter name
+        api_param_name = model_info.get('api_param', 'api_key')
+        kwargs = {
+            'model': model_name,
+            api_param_name: api_key,
+            'timeout': LLM_REQUEST_TIMEOUT
+        }
+        
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        if max_tokens is not None:
+            kwargs[model_info.get('max_tokens_param', 'max_tokens')] = max_tokens
+        
+        # Share keep-alive connections between clients of the same provider
+        if model_info.get('pooled_http') and httpx is not None:
+            sync_client, async_client = self._get_http_clients(provider_name)
+            kwargs['http_client'] = sync_client
+            kwargs['http_async_client'] = async_client
+        
+        try:
+            client = ProviderClass(**kwargs)
         except Exception as e:
             logger.error(f"Error initializing LLM with model {model_name}: {str(e)}")
             raise
+        
+        logger.info(f"Successfully initialized LLM with model: {model_name} (provider: {provider_name})")
+        return client
+    
+    def _get_http_clients(self, provider_name: str) -> Tuple[Any, Any]:
+        """Get the shared sync/async HTTP clients for a provider (pool lock must be held)."""
+        if provider_name not in self._http_clients:
+            limits = httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_CONNECTIONS,
+                keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY
+            )
+            self._http_clients[provider_name] = (
+                httpx.Client(limits=limits),
+                httpx.AsyncClient(limits=limits)
+            )
+        return self._http_clients[provider_name]
+
+def get_client_pool() -> LLMClientPool:
+    """
+    Get the shared LLM client pool (singleton pattern).
+    
+    Returns:
+        The client pool
+    """
+    global _client_pool
+    
+    if _client_pool is None:
+        with _client_pool_lock:
+            if _client_pool is None:
+                _client_pool = LLMClientPool()
+    
+    return _client_pool
+
+def get_llm_client(model_name: Optional[str] = None,
+                   temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None) -> Any:
+    """
+    Get a long-lived client for a specific model from the client pool.
+    
+    The client is wrapped in a RoutedLLM, which admits calls through the
+    provider's rate limiter and, with failover enabled, falls back along
+    LLM_FALLBACK_MODELS when the model's provider is failing or saturated.
+    With the response cache enabled, repeated string prompts are answered
+    from the cache.
     
-    return _llm_instance
+    Args:
+        model_name: The name of the model, or None for the configured default
+        temperature: Optional sampling temperature (provider default if None)
+        max_tokens: Optional output token limit (provider default if None)
+        
+    Returns:
+        The LLM instance
+    """
+    model_name = model_name or os.getenv('LLM_MODEL', LLM_MODEL)
+    fallback_models = None if ENABLE_LLM_FAILOVER else []
+    client = RoutedLLM(model_name, get_client_pool(), fallback_models=fallback_models,
+                       temperature=temperature, max_tokens=max_tokens)
+    if ENABLE_RESPONSE_CACHE:
+        return CachedLLM(client, model_name, temperature=temperature)
+    return client
+
+def get_hedged_llm_client(model_name: Optional[str] = None,
+                          temperature: Optional[float] = None,
+                          max_tokens: Optional[int] = None) -> Any:
+    """
+    Get a client for latency-critical calls that hedges slow requests.
+    
+    When hedging is disabled this is the same as get_llm_client().
+    
+    Args:
+        model_name: The name of the model, or None for the configured default
+        temperature: Optional sampling temperature (provider default if None)
+        max_tokens: Optional output token limit (provider default if None)
+        
+    Returns:
+        The LLM instance
+    """
+    model_name = model_name or os.getenv('LLM_MODEL', LLM_MODEL)
+    primary = get_llm_client(model_name, temperature=temperature, max_tokens=max_tokens)
+    if not ENABLE_HEDGING:
+        return primary
+    
+    backup_model = HEDGE_MODEL or model_name
+    backup = get_llm_client(backup_model, temperature=temperature, max_tokens=max_tokens)
+    return HedgedLLM(model_name, primary, backup, backup_model=backup_model)
+
+def get_model_for_purpose(purpose: str, model_name: Optional[str] = None) -> str:
+    """
+    Resolve the model used for a kind of call.
+    
+    LLM_PURPOSE_MODELS in settings takes precedence; otherwise the
+    '<purpose>_model' entry of the base model's provider in LLM_MODELS is used,
+    falling back to the base model itself.
+    
+    Args:
+        purpose: The call purpose (e.g., 'aux')
+        model_name: The base model, or None for the configured default
+        
+    Returns:
+        The model name
+    """
+    model_name = model_name or os.getenv('LLM_MODEL', LLM_MODEL)
+    configured = LLM_PURPOSE_MODELS.get(purpose)
+    if configured:
+        return configured
+    try:
+        return get_model_info(model_name).get(f'{purpose}_model') or model_name
+    except ValueError:
+        return model_name
+
+def get_llm_for_purpose(purpose: str,
+                        model_name: Optional[str] = None,
+                        temperature: Optional[float] = None,
+                        max_tokens: Optional[int] = None) -> Any:
+    """
+    Get a client for a kind of call, e.g. a cheaper model for auxiliary prompts.
+    
+    Args:
+        purpose: The call purpose (e.g., 'aux')
+        model_name: The base model, or None for the configured default
+        temperature: Optional sampling temperature (provider default if None)
+        max_tokens: Optional output token limit (provider default if None)
+        
+    Returns:
+        The LLM instance
+    """
+    return get_llm_client(get_model_for_purpose(purpose, model_name),
+                          temperature=temperature, max_tokens=max_tokens)
+
+def get_llm_model(force_refresh: bool = False) -> Any:
+    """
+    Get the LLM instance for the configured default model.
+    
+    Args:
+        force_refresh: If True, creates a new instance even if one exists
+        
+    Returns:
+        The LLM instance
+    """
+    model_name = os.getenv('LLM_MODEL', LLM_MODEL)
+    
+    if force_refresh:
+        get_client_pool().evict(model_name)
+        logger.info(f"Using LLM model: {model_name}")
+    
+    return get_llm_client(model_name)
 
 def get_llm(provider: str = 'gemini') -> Any:
     """
     Legacy function for backward compatibility only.
     
     This function maintains backward compatibility with code that still uses
-    the provider-centric approach. New code should use get_llm_model() directly
-    and specify the model via LLM_MODEL in settings or environment variables.
+    the provider-centric approach. New code should use get_llm_client() or
+    get_llm_model() directly.
     
     Args:
         provider: The LLM provider to use (e.g., 'gemini', 'openai')
@@ -130,22 +369,18 @@ def get_llm(provider: str = 'gemini') -> Any:
         The LLM instance
     """
     # Get default model for this provider from llm_models.py
-    from app.models.llm_models import get_provider_info
     provider_info = get_provider_info(provider)
     
-    # Set the environment variable to the default model for this provider
-    os.environ['LLM_MODEL'] = provider_info['default_model']
-    return get_llm_model(force_refresh=True)
+    return get_llm_client(provider_info['default_model'])
 
 # Clear the LLM cache (useful for testing or when settings change)
 def reset_llm():
     """
-    Reset the LLM singleton by clearing the cache.
+    Reset the LLM client pool.
     This forces re-initialization on the next call to get_llm_model().
     """
-    global _llm_instance
-    _llm_instance = None
-    logger.info("LLM singleton has been reset")
+    get_client_pool().evict()
+    logger.info("LLM client pool has been reset")
 
 class MockLLM:
     """A mock LLM that returns predefined responses for testing"""
@@ -163,6 +398,18 @@ class MockLLM:
         from langchain_core.messages import AIMessage
         return AIMessage(content="This is a mock response. Please configure a valid LLM provider.")
         
+    def stream(self, prompt, *args, **kwargs):
+        """Mock stream method compatible with langchain"""
+        yield self.invoke(prompt)
+    
+    async def ainvoke(self, prompt, *args, **kwargs):
+        """Mock async invoke method compatible with langchain"""
+        return self.invoke(prompt)
+    
+    async def astream(self, prompt, *args, **kwargs):
+        """Mock async stream method compatible with langchain"""
+        yield self.invoke(prompt)
+        
     def generate_response(self, messages):
         """Generate a response based on messages"""
         return "This is a mock response. Please configure a valid LLM provider." 
\ No newline at end of file
@@ -24,22 +24,36 @@ LLM_MODELS = {
         'description': 'OpenAI ChatGPT and GPT-4 models',
         'models': ['gpt-3.5-turbo', 'gpt-4o', 'gpt-4-turbo', 'gpt-4.5-preview'],
         'default_model': 'gpt-4o',
+        'aux_model': 'gpt-3.5-turbo',
         'api_key_env': 'OPENAI_API_KEY',
         'model_env': 'OPENAI_MODEL',
         'module': 'langchain_openai',
         'class': 'ChatOpenAI',
-        'api_param': 'openai_api_key'
+        'api_param': 'openai_api_key',
+        'pooled_http': True,
+        'rate_limits': {
+            'requests_per_minute': 500,
+            'tokens_per_minute': 30000,
+            'max_concurrent': 20
+        }
     },
     'gemini': {
         'name': 'Google Gemini',
         'description': 'Google Gemini AI models',
         'models': ['gemini-pro', 'gemini-1.5-pro', 'gemini-2.0-flash'],
         'default_model': 'gemini-2.0-flash',
+        'aux_model': 'gemini-2.0-flash',
         'api_key_env': 'GEMINI_API_KEY',
         'model_env': 'GEMINI_MODEL',
         'module': 'langchain_google_genai',
         'class': 'ChatGoogleGenerativeAI',
         'api_param': 'google_api_key',
+        'max_tokens_param': 'max_output_tokens',
+        'rate_limits': {
+            'requests_per_minute': 2000,
+            'tokens_per_minute': 4000000,
+            'max_concurrent': 20
+        },
         'extra_settings': {
             'GEMINI_LOCATION': 'us-central1',
             'GEMINI_TIMEOUT': 300
@@ -50,11 +64,18 @@ LLM_MODELS = {
         'description': 'Deepseek AI models',
         'models': ['deepseek-chat', 'deepseek-coder', 'deepseek-reasoner'],
         'default_model': 'deepseek-chat',
+        'aux_model': 'deepseek-chat',
         'api_key_env': 'DEEPSEEK_API_KEY',
         'model_env': 'DEEPSEEK_MODEL',
         'module': 'langchain_deepseek',
         'class': 'ChatDeepseek',
         'api_param': 'api_key',
+        'pooled_http': True,
+        'rate_limits': {
+            'requests_per_minute': 300,
+            'tokens_per_minute': 1000000,
+            'max_concurrent': 10
+        },
         'extra_settings': {
             'DEEPSEEK_TIMEOUT': 300
         }
@@ -0,0 +1,393 @@
+"""
+Rate Limiter Module for the Bahai Life Coach Agent.
+
+This module keeps LLM traffic within each provider's limits so bursts queue
+briefly on our side instead of turning into provider 429s. Every provider (or
+model, when configured) has token buckets for requests and tokens per minute
+plus a cap on concurrent calls, configured under 'rate_limits' in LLM_MODELS.
+
+Waiting calls are served by priority, so interactive chat goes ahead of
+background work such as summaries and reflection questions. A call whose
+expected wait exceeds its bound is rejected right away with RateLimitExceeded,
+which carries a Retry-After hint for the HTTP layer.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.models.llm_models import get_model_info
+from app.utils.deadline import Deadline
+from app.config.settings import RATE_LIMIT_MAX_WAIT, RATE_LIMIT_BACKGROUND_MAX_WAIT, RATE_LIMIT_CALL_SECONDS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Maximum seconds to wait for each priority
+MAX_WAIT = {
+    PRIORITY_INTERACTIVE: RATE_LIMIT_MAX_WAIT,
+    PRIORITY_BACKGROUND: RATE_LIMIT_BACKGROUND_MAX_WAIT
+}
+
+# Priority of LLM calls made in the current context
+_request_priority = contextvars.ContextVar("llm_request_priority", default=PRIORITY_INTERACTIVE)
+
+# Approximate characters per token for estimating prompt size
+CHARS_PER_TOKEN = 4
+
+# Weight of the latest call in the moving average of call durations
+CALL_SECONDS_SMOOTHING = 0.2
+
+# Global limiter registry
+_limiters: Dict[str, "RateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot be admitted within its wait bound."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+def set_request_priority(priority: int) -> contextvars.Token:
+    """
+    Set the priority of LLM calls made in the current context.
+
+    Args:
+        priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+
+    Returns:
+        A token that can be passed to reset_request_priority()
+    """
+    return _request_priority.set(priority)
+
+
+def reset_request_priority(token: contextvars.Token) -> None:
+    """Restore the priority that was active before set_request_priority()."""
+    _request_priority.reset(token)
+
+
+def get_request_priority() -> int:
+    """Get the priority of LLM calls made in the current context."""
+    return _request_priority.get()
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """
+    Roughly estimate the number of tokens in a prompt.
+
+    Args:
+        prompt: A string or a list of LangChain messages
+
+    Returns:
+        The estimated token count
+    """
+    if isinstance(prompt, str):
+        chars = len(prompt)
+    elif isinstance(prompt, (list, tuple)):
+        chars = sum(len(getattr(message, 'content', message) or "") for message in prompt)
+    else:
+        chars = len(str(prompt))
+    return chars // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate (not thread-safe on its own).
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Refill rate, which is also the bucket capacity
+        """
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds the amount (capped at the capacity)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take the amount from the bucket (the level may go negative for oversized requests)."""
+        self._refill()
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Thread-safe admission control for one provider or model.
+
+    Calls wait in a priority queue; only the head of the queue can be admitted,
+    so a stream of interactive calls always goes ahead of waiting background
+    calls, and calls of equal priority are served first come, first served.
+    """
+
+    def __init__(self,
+                 name: str,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_concurrent: Optional[int] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Name of the limited provider or model (used in logs)
+            requests_per_minute: Request rate limit (None for unlimited)
+            tokens_per_minute: Prompt token rate limit (None for unlimited)
+            max_concurrent: Maximum calls in flight (None for unlimited)
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.call_seconds = RATE_LIMIT_CALL_SECONDS  # Moving average of slot hold times
+        self._waiters: List[Tuple[int, int]] = []  # Heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self,
+                tokens: int = 0,
+                priority: Optional[int] = None,
+                deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """
+        Wait for admission and hold a slot for the duration of the block.
+
+        Args:
+            tokens: Estimated prompt tokens of the call
+            priority: Call priority (defaults to the context's priority)
+            deadline: Deadline of the request making the call; the call never
+                waits past it
+
+        Raises:
+            RateLimitExceeded: If the call cannot be admitted within its wait bound
+        """
+        entry, deadline = self._enqueue(tokens, priority, deadline)
+        try:
+            with self._condition:
+                while True:
+                    wait = self._try_admit(entry, tokens)
+                    if wait == 0:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._exceeded(wait)
+                    self._condition.wait(min(wait, remaining))
+        except BaseException:
+            self._dequeue(entry)
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def aacquire(self,
+                       tokens: int = 0,
+                       priority: Optional[int] = None,
+                       deadline: Optional[Deadline] = None):
+        """
+        Async counterpart of acquire(); waits without blocking the event loop.
+        """
+        entry, deadline = self._enqueue(tokens, priority, deadline)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_admit(entry, tokens)
+                if wait == 0:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._exceeded(wait)
+                # Poll, since releases notify threads rather than the event loop
+                await asyncio.sleep(min(wait, remaining, 0.05))
+        except BaseException:
+            self._dequeue(entry)
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the limiter's current load."""
+        with self._condition:
+            return {
+                'in_flight': self.in_flight,
+                'queued': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+                'call_seconds': self.call_seconds
+            }
+
+    def _enqueue(self,
+                 tokens: int,
+                 priority: Optional[int],
+                 deadline: Optional[Deadline] = None) -> Tuple[Tuple[int, int], float]:
+        """
+        Join the queue, or reject the call at once if its expected wait is too long.
+
+        The wait bound is the priority's MAX_WAIT, shortened to the time left
+        before the request's deadline.
+
+        Returns:
+            A tuple of (queue entry, monotonic time at which waiting gives up)
+        """
+        priority = get_request_priority() if priority is None else priority
+        max_wait = MAX_WAIT.get(priority, RATE_LIMIT_MAX_WAIT)
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None:
+            max_wait = min(max_wait, remaining)
+
+        with self._condition:
+            expected = self._expected_wait(tokens, priority)
+            if expected > max_wait:
+                logger.warning(f"Rejecting call to {self.name}: expected wait {expected:.1f}s exceeds {max_wait:.1f}s")
+                raise self._exceeded(expected)
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+        return entry, time.monotonic() + max_wait
+
+    def _dequeue(self, entry: Tuple[int, int]) -> None:
+        """Leave the queue without being admitted."""
+        with self._condition:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def _try_admit(self, entry: Tuple[int, int], tokens: int) -> float:
+        """
+        Admit the call if it is at the head of the queue and capacity is free
+        (condition lock must be held).
+
+        Returns:
+            0 if admitted, otherwise the seconds to wait before trying again
+        """
+        if self._waiters[0] != entry:
+            return 1.0  # Woken up early when the head is admitted or leaves
+        if self.max_concurrent is not None and self.in_flight >= self.max_concurrent:
+            return 1.0  # Woken up early by a release
+        wait = self._refill_wait(tokens)
+        if wait > 0:
+            return wait
+
+        heapq.heappop(self._waiters)
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(tokens)
+        self.in_flight += 1
+        self._condition.notify_all()
+        return 0
+
+    def _refill_wait(self, tokens: int) -> float:
+        """Seconds until both buckets can cover the call (condition lock must be held)."""
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def _expected_wait(self, tokens: int, priority: int) -> float:
+        """
+        Estimate how long a new call would wait (condition lock must be held).
+
+        Both the buckets and the concurrency cap must admit the calls queued
+        ahead of it first. Slots free up as calls finish, which takes
+        call_seconds on average (half of it for the calls already in flight).
+        """
+        ahead = sum(1 for waiter_priority, _ in self._waiters if waiter_priority <= priority)
+        wait = self._refill_wait(tokens)
+        if self.requests and ahead:
+            wait += ahead / self.requests.rate
+
+        if self.max_concurrent is not None:
+            # Calls that must finish before a slot is free for this one
+            blocking = self.in_flight + ahead + 1 - self.max_concurrent
+            if blocking > 0:
+                rounds = math.ceil(blocking / self.max_concurrent)
+                wait = max(wait, self.call_seconds * (rounds - 0.5))
+        return wait
+
+    def _exceeded(self, retry_after: float) -> RateLimitExceeded:
+        return RateLimitExceeded(f"Rate limit for {self.name} exceeded, retry in {retry_after:.1f}s",
+                                 retry_after=retry_after)
+
+    def _release(self, held: float) -> None:
+        """
+        Free a concurrency slot.
+
+        Args:
+            held: Seconds the call held the slot
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self.call_seconds += CALL_SECONDS_SMOOTHING * (held - self.call_seconds)
+            self._condition.notify_all()
+
+
+def get_rate_limiter(model_name: str) -> Optional[RateLimiter]:
+    """
+    Get the limiter for a model, configured from its provider's 'rate_limits'.
+
+    Limits in the provider's 'model_rate_limits' apply to that model alone;
+    otherwise all models of the provider share one limiter.
+
+    Args:
+        model_name: The model name
+
+    Returns:
+        The rate limiter, or None if the provider has no limits configured
+    """
+    model_info = get_model_info(model_name)
+    model_limits = model_info.get('model_rate_limits', {}).get(model_name)
+    limits = model_limits or model_info.get('rate_limits')
+    if not limits:
+        return None
+
+    key = model_name if model_limits else model_info['provider']
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = _limiters[key] = RateLimiter(
+                    key,
+                    requests_per_minute=limits.get('requests_per_minute'),
+                    tokens_per_minute=limits.get('tokens_per_minute'),
+                    max_concurrent=limits.get('max_concurrent')
+                )
+    return limiter
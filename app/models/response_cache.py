@@ -0,0 +1,319 @@
+"""
+Response Cache Module for the Bahai Life Coach Agent.
+
+Auxiliary prompts (task title extraction, conversation insights, summaries)
+are built from their inputs alone, so retried requests and re-runs of the
+memory scripts send the exact same prompt again. This module stores LLM
+responses in SQLite keyed by a hash of (model, temperature, prompt), so a
+repeated prompt is answered without a provider call, across restarts.
+
+Entries expire after RESPONSE_CACHE_TTL seconds and the least recently used
+ones are evicted beyond RESPONSE_CACHE_MAX_ENTRIES. Only plain string prompts
+are cached; conversation turns (lists of messages) always go to the provider.
+A response is stored under the model that actually served it, so an answer
+produced by a fallback model after a failover is never returned for the
+preferred model.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import AIMessage
+
+from app.models.router import SERVED_MODEL_KEY
+from app.config.settings import (
+    RESPONSE_CACHE_DB, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TOUCH_INTERVAL
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a lock held by another writer
+BUSY_TIMEOUT = 10
+
+# Global cache instance (singleton pattern)
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def make_cache_key(model_name: str, temperature: Optional[float], prompt: str) -> str:
+    """
+    Build the cache key for a prompt.
+
+    Args:
+        model_name: The model the prompt is sent to
+        temperature: The sampling temperature (None for the provider default)
+        prompt: The prompt text
+
+    Returns:
+        A hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (model_name, "default" if temperature is None else repr(float(temperature)), prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded, expiring store of LLM responses backed by SQLite.
+
+    Each thread reuses one connection, opened in WAL mode so lookups do not
+    wait for a writer, and a hit only writes back its last use when the
+    stored one is older than RESPONSE_CACHE_TOUCH_INTERVAL, so most hits are
+    pure reads.
+    """
+
+    def __init__(self,
+                 db_path: str = RESPONSE_CACHE_DB,
+                 ttl: float = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 touch_interval: float = RESPONSE_CACHE_TOUCH_INTERVAL):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to SQLite database file
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of entries kept
+            touch_interval: Seconds before a hit updates the entry's last use again
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # Guards the counters
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._initialize_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the cache database, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # Connections must not be shared with a forked child
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _initialize_db(self):
+        """Create the cache table if it doesn't exist"""
+        conn = self._get_connection()
+        with conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            ''')
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used ON llm_response_cache (last_used)"
+            )
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The response text, or None on a miss or an expired entry
+        """
+        now = time.time()
+        conn = self._get_connection()
+        row = conn.execute(
+            "SELECT response, created_at, last_used FROM llm_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and now - row[1] > self.ttl:
+            with conn:
+                conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            self._count('misses')
+            return None
+
+        # LRU order only needs to be approximate, so skip most writes
+        if now - row[2] > self.touch_interval:
+            with conn:
+                conn.execute("UPDATE llm_response_cache SET last_used = ? WHERE key = ?", (now, key))
+        self._count('hits')
+        return row[0]
+
+    def put(self, key: str, model_name: str, response: str) -> None:
+        """
+        Store a response, evicting the least recently used entries beyond the size limit.
+
+        Args:
+            key: The cache key
+            model_name: The model that produced the response
+            response: The response text
+        """
+        now = time.time()
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache (key, model, response, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, model_name, response, now, now)
+            )
+            count = conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+            if count > self.max_entries:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM llm_response_cache WHERE key IN (
+                        SELECT key FROM llm_response_cache ORDER BY last_used LIMIT ?
+                    )
+                    """,
+                    (count - self.max_entries,)
+                )
+                self._count('evictions', cursor.rowcount)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        conn = self._get_connection()
+        with conn:
+            conn.execute("DELETE FROM llm_response_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        entries = self._get_connection().execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'max_entries': self.max_entries
+            }
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the shared response cache (singleton pattern).
+
+    Returns:
+        The response cache
+    """
+    global _cache_instance
+
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = ResponseCache()
+
+    return _cache_instance
+
+
+class CachedLLM:
+    """
+    LLM client wrapper that answers repeated string prompts from the response cache.
+
+    invoke and ainvoke consult the cache for string prompts called without
+    extra arguments; everything else (message lists, streams, other
+    attributes) is passed straight to the wrapped client.
+    """
+
+    def __init__(self,
+                 client: Any,
+                 model_name: str,
+                 temperature: Optional[float] = None,
+                 cache: Optional[ResponseCache] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            client: The LLM client to wrap
+            model_name: The model name (part of the cache key)
+            temperature: The sampling temperature (part of the cache key)
+            cache: Response cache (defaults to the shared one)
+        """
+        self.client = client
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache or get_response_cache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def _cacheable(self, prompt: Any, args: tuple, kwargs: Dict[str, Any]) -> bool:
+        """Check whether a call may be answered from the cache."""
+        return isinstance(prompt, str) and not args and not kwargs
+
+    def _lookup_key(self, prompt: str) -> str:
+        return make_cache_key(self.model_name, self.temperature, prompt)
+
+    def _lookup(self, key: str) -> Optional[AIMessage]:
+        try:
+            response = self.cache.get(key)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM response cache: {str(e)}")
+            return None
+        return AIMessage(content=response) if response is not None else None
+
+    def _store(self, prompt: str, result: Any) -> None:
+        text = result.content if hasattr(result, 'content') else str(result)
+        if not isinstance(text, str) or not text.strip():
+            return
+        # Key and record the response under the model that served it (after a
+        # failover that is a fallback model, not the one requested)
+        metadata = getattr(result, 'response_metadata', None)
+        served_model = (metadata.get(SERVED_MODEL_KEY) if isinstance(metadata, dict) else None) or self.model_name
+        if served_model != self.model_name:
+            logger.info(f"Caching response from fallback model {served_model} (requested {self.model_name})")
+        try:
+            self.cache.put(make_cache_key(served_model, self.temperature, prompt), served_model, text)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing LLM response cache: {str(e)}")
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Invoke the client, answering repeated string prompts from the cache."""
+        if not self._cacheable(prompt, args, kwargs):
+            return self.client.invoke(prompt, *args, **kwargs)
+
+        cached = self._lookup(self._lookup_key(prompt))
+        if cached is not None:
+            return cached
+        result = self.client.invoke(prompt)
+        self._store(prompt, result)
+        return result
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of invoke(); cache reads and writes run in a worker thread."""
+        if not self._cacheable(prompt, args, kwargs):
+            return await self.client.ainvoke(prompt, *args, **kwargs)
+
+        cached = await asyncio.to_thread(self._lookup, self._lookup_key(prompt))
+        if cached is not None:
+            return cached
+        result = await self.client.ainvoke(prompt)
+        await asyncio.to_thread(self._store, prompt, result)
+        return result
@@ -0,0 +1,456 @@
+"""
+LLM Routing Module for the Bahai Life Coach Agent.
+
+This module routes LLM calls over an ordered list of models with a circuit
+breaker per provider. A provider whose recent calls fail (or are too slow)
+too often is taken out of rotation for a while, so during a provider incident
+each request degrades to the next model in the fallback list immediately
+instead of waiting on the failing provider first. After the cool-down a
+single probe request is let through to test whether the provider recovered.
+
+Only provider failures (timeouts, connection errors, 5xx and 429 responses)
+fail over and count against a breaker. Errors caused by the request itself
+(bad requests, content-policy refusals, context-length errors) would fail on
+every provider, so they are raised to the caller at once.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.models.llm_models import get_model_info
+from app.models.rate_limiter import RateLimitExceeded, estimate_tokens, get_rate_limiter
+from app.utils.deadline import get_current_deadline
+from app.config.settings import (
+    LLM_FALLBACK_MODELS,
+    CIRCUIT_BREAKER_WINDOW,
+    CIRCUIT_BREAKER_MIN_CALLS,
+    CIRCUIT_BREAKER_ERROR_RATE,
+    CIRCUIT_BREAKER_LATENCY_THRESHOLD,
+    CIRCUIT_BREAKER_OPEN_SECONDS
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# response_metadata key under which a routed call records the model that served it
+SERVED_MODEL_KEY = "served_model"
+
+# Exception class name fragments of provider SDK errors that mean the provider
+# is unavailable, for errors that carry no HTTP status
+_PROVIDER_FAILURE_NAMES = (
+    "Timeout", "Connect", "Unavailable", "DeadlineExceeded", "ServerError",
+    "InternalError", "RateLimit", "ResourceExhausted", "Overloaded"
+)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """Get the HTTP status of a provider SDK error, if it has one."""
+    for status in (getattr(error, 'status_code', None), getattr(error, 'code', None)):
+        if isinstance(status, int):
+            return status
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Check whether an LLM call failed because of the provider rather than the request.
+
+    Args:
+        error: The exception raised by the provider client
+
+    Returns:
+        True for timeouts, connection errors, 5xx and 429 responses (worth
+        failing over), False for errors the request itself caused
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status == 408 or status >= 500
+    return any(fragment in type(error).__name__ for fragment in _PROVIDER_FAILURE_NAMES)
+
+# Global breaker registry (one breaker per provider)
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one LLM provider.
+
+    The breaker tracks the outcome of the most recent calls. A call counts as
+    bad if it failed on the provider's side or took longer than the latency
+    threshold. When the share
+    of bad calls reaches the error rate the breaker opens and rejects calls;
+    after the open period it lets a single probe through (half-open) and closes
+    again if the probe succeeds.
+    """
+
+    def __init__(self,
+                 name: str,
+                 window: int = CIRCUIT_BREAKER_WINDOW,
+                 min_calls: int = CIRCUIT_BREAKER_MIN_CALLS,
+                 error_rate: float = CIRCUIT_BREAKER_ERROR_RATE,
+                 latency_threshold: Optional[float] = CIRCUIT_BREAKER_LATENCY_THRESHOLD,
+                 open_seconds: float = CIRCUIT_BREAKER_OPEN_SECONDS):
+        """
+        Initialize a closed circuit breaker.
+
+        Args:
+            name: Name of the protected provider (used in logs)
+            window: Number of recent calls considered
+            min_calls: Minimum number of calls in the window before the breaker can open
+            error_rate: Share of bad calls (0-1) at which the breaker opens
+            latency_threshold: Seconds after which a successful call counts as bad (None to disable)
+            open_seconds: Seconds the breaker stays open before a probe is allowed
+        """
+        self.name = name
+        self.min_calls = max(1, int(min_calls))
+        self.error_rate = error_rate
+        self.latency_threshold = latency_threshold
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=max(1, int(window)))  # True for bad calls
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may be sent to the provider.
+
+        Returns:
+            True if the call may proceed (a half-open breaker admits one probe at a time)
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit breaker for {self.name} is half-open, probing")
+
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a successful call.
+
+        Args:
+            latency: Seconds the call took (time to first token for streams)
+        """
+        slow = self.latency_threshold is not None and latency > self.latency_threshold
+        if slow:
+            logger.warning(f"{self.name} call took {latency:.2f}s (threshold {self.latency_threshold}s)")
+        self._record(bad=slow)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._record(bad=True)
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without an outcome (e.g. a cancelled stream)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the breaker state and recent error rate."""
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                'state': self.state,
+                'recent_calls': calls,
+                'recent_error_rate': (sum(self._outcomes) / calls) if calls else 0.0
+            }
+
+    def _record(self, bad: bool) -> None:
+        """Update the state with the outcome of a call."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if bad:
+                    self._open()
+                else:
+                    logger.info(f"Circuit breaker for {self.name} closed")
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(bad)
+            calls = len(self._outcomes)
+            if self.state == CLOSED and calls >= self.min_calls and sum(self._outcomes) / calls >= self.error_rate:
+                self._open()
+
+    def _open(self) -> None:
+        """Open the breaker (lock must be held)."""
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        logger.warning(f"Circuit breaker for {self.name} opened for {self.open_seconds}s")
+
+
+def get_circuit_breaker(provider_name: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker for a provider, creating it on first use.
+
+    Args:
+        provider_name: The provider name (e.g., 'gemini', 'openai')
+
+    Returns:
+        The provider's circuit breaker
+    """
+    breaker = _breakers.get(provider_name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(provider_name, CircuitBreaker(provider_name))
+    return breaker
+
+
+def get_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the state of every provider's circuit breaker."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+class NoAvailableProviderError(RuntimeError):
+    """Raised when every model in the route failed or has an open circuit breaker."""
+
+
+class RoutedLLM:
+    """
+    LLM client that fails over along an ordered list of models.
+
+    Exposes the subset of the LangChain chat model interface the agents use
+    (invoke, stream, ainvoke, astream). Each call goes to the first model whose
+    provider's breaker admits it; on a provider failure the next provider is
+    tried within the same call, while request errors are raised at once. Streams only fail over before the first chunk is produced.
+    Calls are admitted through the provider's rate limiter; if every provider
+    is saturated the shortest RateLimitExceeded is raised. invoke and ainvoke
+    record the model that served the call in the result's response_metadata
+    under SERVED_MODEL_KEY.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 pool: Any,
+                 fallback_models: Optional[List[str]] = None,
+                 temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None):
+        """
+        Initialize the routed client.
+
+        Args:
+            model_name: The preferred model
+            pool: The LLMClientPool the provider clients come from
+            fallback_models: Models to try, in order, when the preferred one is unavailable
+            temperature: Optional sampling temperature (provider default if None)
+            max_tokens: Optional output token limit (provider default if None)
+        """
+        self.model_name = model_name
+        self.pool = pool
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+        route = [model_name] + list(LLM_FALLBACK_MODELS if fallback_models is None else fallback_models)
+        self.route = list(dict.fromkeys(route))  # Drop duplicates, keep order
+
+    def _candidates(self) -> Iterator[Tuple[str, Any, CircuitBreaker]]:
+        """Yield (model, client, breaker) for each model that may be called now."""
+        tried_providers = set()
+        for model_name in self.route:
+            try:
+                provider_name = get_model_info(model_name)['provider']
+            except ValueError as e:
+                logger.error(f"Skipping unknown fallback model: {str(e)}")
+                continue
+
+            # One attempt per provider and request
+            if provider_name in tried_providers:
+                continue
+            tried_providers.add(provider_name)
+
+            breaker = get_circuit_breaker(provider_name)
+            if not breaker.allow_request():
+                logger.info(f"Skipping {model_name}: circuit breaker for {provider_name} is open")
+                continue
+
+            try:
+                client = self.pool.get(model_name, temperature=self.temperature, max_tokens=self.max_tokens)
+            except Exception as e:
+                # Configuration problems (missing package or API key) are not provider incidents
+                logger.error(f"Skipping {model_name}: {str(e)}")
+                breaker.release()
+                continue
+
+            if model_name != self.model_name:
+                logger.warning(f"Failing over from {self.model_name} to {model_name}")
+            yield model_name, client, breaker
+
+    def _no_provider_error(self,
+                           last_error: Optional[Exception],
+                           rate_limited: Optional[RateLimitExceeded] = None) -> Exception:
+        """Build the error raised when no model could serve the call."""
+        if last_error is None and rate_limited is not None:
+            # Every available provider is saturated: tell the caller when to retry
+            return rate_limited
+        message = f"No LLM provider available for {self.model_name} (tried {', '.join(self.route)})"
+        if last_error is not None:
+            message += f": {str(last_error)}"
+        return NoAvailableProviderError(message)
+
+    @staticmethod
+    def _mark_served(result: Any, model_name: str) -> Any:
+        """Record the model that served a call on its result, if the result carries metadata."""
+        metadata = getattr(result, 'response_metadata', None)
+        if isinstance(metadata, dict):
+            metadata[SERVED_MODEL_KEY] = model_name
+        return result
+
+    @staticmethod
+    def _shortest_wait(current: Optional[RateLimitExceeded], error: RateLimitExceeded) -> RateLimitExceeded:
+        """Keep the rate limit error with the shortest Retry-After."""
+        if current is None or error.retry_after < current.retry_after:
+            return error
+        return current
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Invoke the first available model, failing over on errors."""
+        last_error = None
+        rate_limited = None
+        for model_name, client, breaker in self._candidates():
+            limiter = get_rate_limiter(model_name)
+            try:
+                with limiter.acquire(estimate_tokens(prompt), deadline=get_current_deadline()) if limiter else nullcontext():
+                    start_time = time.monotonic()
+                    result = client.invoke(prompt, *args, **kwargs)
+            except RateLimitExceeded as e:
+                breaker.release()
+                rate_limited = self._shortest_wait(rate_limited, e)
+                continue
+            except Exception as e:
+                if not is_provider_failure(e):
+                    # The request itself is at fault; another provider would reject it too
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                logger.error(f"LLM call to {model_name} failed: {str(e)}")
+                last_error = e
+                continue
+            breaker.record_success(time.monotonic() - start_time)
+            return self._mark_served(result, model_name)
+        raise self._no_provider_error(last_error, rate_limited) from last_error
+
+    def stream(self, prompt: Any, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """Stream from the first available model, failing over until the first chunk."""
+        last_error = None
+        rate_limited = None
+        for model_name, client, breaker in self._candidates():
+            limiter = get_rate_limiter(model_name)
+            started = False
+            try:
+                with limiter.acquire(estimate_tokens(prompt), deadline=get_current_deadline()) if limiter else nullcontext():
+                    start_time = time.monotonic()
+                    for chunk in client.stream(prompt, *args, **kwargs):
+                        if not started:
+                            started = True
+                            breaker.record_success(time.monotonic() - start_time)
+                        yield chunk
+            except RateLimitExceeded as e:
+                rate_limited = self._shortest_wait(rate_limited, e)
+                continue
+            except Exception as e:
+                if started or not is_provider_failure(e):
+                    # Request errors are not failed over (the breaker is released below)
+                    raise
+                breaker.record_failure()
+                logger.error(f"LLM stream from {model_name} failed: {str(e)}")
+                last_error = e
+                continue
+            finally:
+                # The consumer may stop before the first chunk arrives
+                if not started:
+                    breaker.release()
+            if not started:
+                breaker.record_success(time.monotonic() - start_time)
+            return
+        raise self._no_provider_error(last_error, rate_limited) from last_error
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of invoke()."""
+        last_error = None
+        rate_limited = None
+        for model_name, client, breaker in self._candidates():
+            limiter = get_rate_limiter(model_name)
+            try:
+                async with limiter.aacquire(estimate_tokens(prompt), deadline=get_current_deadline()) if limiter else nullcontext():
+                    start_time = time.monotonic()
+                    result = await client.ainvoke(prompt, *args, **kwargs)
+            except RateLimitExceeded as e:
+                breaker.release()
+                rate_limited = self._shortest_wait(rate_limited, e)
+                continue
+            except Exception as e:
+                if not is_provider_failure(e):
+                    # The request itself is at fault; another provider would reject it too
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                logger.error(f"LLM call to {model_name} failed: {str(e)}")
+                last_error = e
+                continue
+            breaker.record_success(time.monotonic() - start_time)
+            return self._mark_served(result, model_name)
+        raise self._no_provider_error(last_error, rate_limited) from last_error
+
+    async def astream(self, prompt: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Async counterpart of stream()."""
+        last_error = None
+        rate_limited = None
+        for model_name, client, breaker in self._candidates():
+            limiter = get_rate_limiter(model_name)
+            started = False
+            try:
+                async with limiter.aacquire(estimate_tokens(prompt), deadline=get_current_deadline()) if limiter else nullcontext():
+                    start_time = time.monotonic()
+                    async for chunk in client.astream(prompt, *args, **kwargs):
+                        if not started:
+                            started = True
+                            breaker.record_success(time.monotonic() - start_time)
+                        yield chunk
+            except RateLimitExceeded as e:
+                rate_limited = self._shortest_wait(rate_limited, e)
+                continue
+            except Exception as e:
+                if started or not is_provider_failure(e):
+                    # Request errors are not failed over (the breaker is released below)
+                    raise
+                breaker.record_failure()
+                logger.error(f"LLM stream from {model_name} failed: {str(e)}")
+                last_error = e
+                continue
+            finally:
+                # The consumer may stop before the first chunk arrives
+                if not started:
+                    breaker.release()
+            if not started:
+                breaker.record_success(time.monotonic() - start_time)
+            return
+        raise self._no_provider_error(last_error, rate_limited) from last_error
@@ -279,6 +279,18 @@ Help the user manage ADHD-related time perception challenges. Suggest using cale
 Example: "Since time perception can be tricky, let's anchor this action to something concrete. Would it help to connect it to an existing habit, set a special timer, or create a visual countdown for this task? I can also add this to your calendar with a reminder if that would help."
 """
 
+# Instructions for returning the reply and reflection questions in a single response
+STRUCTURED_RESPONSE_INSTRUCTIONS = """
+Respond with a single JSON object and nothing else, using exactly this shape:
+
+{"reply": "<your coaching response to the user>", "reflection_questions": ["<question 1>", "<question 2>", "<question 3>"]}
+
+- "reply" is the message the user will read, written exactly as you would normally respond.
+- "reflection_questions" holds 3 thought-provoking, personalized reflection questions about this exchange.
+  They should relate to Bahá'í principles, help the user apply the wisdom to their specific situation,
+  and avoid formulaic expressions.
+"""
+
 # Bahai quotes for use in prompts
 BAHAI_QUOTES = [
     {
@@ -0,0 +1,155 @@
+"""
+Background Task Module for the Bahai Life Coach.
+
+This module provides a shared, bounded thread pool for work that should not
+delay a response, such as generating reflection questions after a reply, and a
+second pool for running independent stages of a request concurrently.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import contextvars
+import logging
+import threading
+import time
+
+from app.config.settings import BACKGROUND_WORKERS, CONTEXT_STAGE_WORKERS, CONTEXT_STAGE_TIMEOUT
+from app.models.rate_limiter import PRIORITY_BACKGROUND, set_request_priority, reset_request_priority
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Global executor instances (singleton pattern)
+_executor = None
+_stage_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_background_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared background executor (singleton pattern).
+
+    Returns:
+        The thread pool executor
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=BACKGROUND_WORKERS,
+                    thread_name_prefix="background"
+                )
+
+    return _executor
+
+
+def submit_background(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Run a function on the background executor, logging any failure.
+
+    Args:
+        fn: The function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        A future for the function's result
+    """
+    def run():
+        # LLM calls made here queue behind interactive requests
+        token = set_request_priority(PRIORITY_BACKGROUND)
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Background task {getattr(fn, '__name__', fn)} failed: {str(e)}")
+            raise
+        finally:
+            reset_request_priority(token)
+
+    return get_background_executor().submit(run)
+
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared executor for request stages (singleton pattern).
+
+    Kept separate from the background executor so queued background work can
+    never delay the stages a reply is waiting on.
+
+    Returns:
+        The thread pool executor
+    """
+    global _stage_executor
+
+    if _stage_executor is None:
+        with _executor_lock:
+            if _stage_executor is None:
+                _stage_executor = ThreadPoolExecutor(
+                    max_workers=CONTEXT_STAGE_WORKERS,
+                    thread_name_prefix="stage"
+                )
+
+    return _stage_executor
+
+
+def run_stages(stages: Dict[str, Callable[[], Any]],
+               timeout: Optional[float] = CONTEXT_STAGE_TIMEOUT,
+               timeouts: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run independent stages concurrently and collect the ones that finish in time.
+
+    All stages start together, so the total wait is that of the slowest stage,
+    capped at its timeout. A stage that fails or is still running when its
+    timeout expires is skipped; its thread is left to finish on its own, so
+    stages must bound their own I/O (see GOOGLE_API_TIMEOUT). Each stage runs
+    in a copy of the caller's context, keeping the request deadline and
+    priority for its LLM calls.
+
+    Args:
+        stages: Stage names mapped to the callables to run
+        timeout: Default seconds to wait for a stage (None waits indefinitely)
+        timeouts: Optional per-stage timeouts overriding the default
+
+    Returns:
+        A tuple of (results by stage name, names of skipped stages)
+    """
+    if not stages:
+        return {}, []
+
+    start_time = time.time()
+    executor = get_stage_executor()
+    futures = {name: executor.submit(contextvars.copy_context().run, fn) for name, fn in stages.items()}
+    deadlines = {}
+    for name in stages:
+        stage_timeout = (timeouts or {}).get(name, timeout)
+        deadlines[name] = start_time + stage_timeout if stage_timeout is not None else None
+
+    results: Dict[str, Any] = {}
+    skipped: List[str] = []
+    pending = dict(futures)
+    while pending:
+        # Drop the stages whose deadline has passed
+        now = time.time()
+        for name in [n for n, f in pending.items() if not f.done() and deadlines[n] is not None and deadlines[n] <= now]:
+            pending.pop(name).cancel()
+            logger.warning(f"Stage {name} timed out after {time.time() - start_time:.2f}s and was skipped")
+            skipped.append(name)
+
+        # Collect finished stages
+        for name in [n for n, f in pending.items() if f.done()]:
+            try:
+                results[name] = pending.pop(name).result()
+            except Exception as e:
+                logger.error(f"Stage {name} failed: {str(e)}")
+                skipped.append(name)
+
+        if pending:
+            remaining = [deadlines[n] - now for n in pending if deadlines[n] is not None]
+            wait(pending.values(), timeout=max(0, min(remaining)) if remaining else None,
+                 return_when=FIRST_COMPLETED)
+
+    logger.debug(f"Ran {len(stages)} stages in {time.time() - start_time:.2f}s (skipped: {skipped})")
+    return results, skipped
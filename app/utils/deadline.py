@@ -0,0 +1,155 @@
+"""
+Request Deadline Module for the Bahai Life Coach Agent.
+
+A chat request can carry a latency budget (sent by the client as deadline_ms,
+or TURN_DEADLINE_MS by default). The agent checks the time left before each
+optional stage: context gathering is capped so enough time is kept for the
+reply itself, stages that cannot fit are not started, and inline reflection
+questions are deferred to the background when the budget is spent. Under
+overload this returns a good reply without extras instead of a complete one
+that arrives too late.
+
+The deadline of the current turn is also kept in a context variable, so code
+far from the agent (the rate limiter queue, hedged LLM calls) can bound its
+waits by it without threading it through every call.
+"""
+
+import contextvars
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.config.settings import (
+    TURN_DEADLINE_MS,
+    DEADLINE_REPLY_RESERVE,
+    DEADLINE_MIN_STAGE_TIME
+)
+
+
+class Deadline:
+    """
+    Point in time by which a request should be answered.
+
+    A deadline without a budget never expires, so callers can always pass one.
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        """
+        Start the clock.
+
+        Args:
+            budget: Seconds until the deadline (None for no deadline)
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget if budget is not None else None
+
+    @classmethod
+    def from_ms(cls, deadline_ms: Optional[Union[int, float, str]] = None) -> "Deadline":
+        """
+        Create a deadline from a budget in milliseconds.
+
+        Args:
+            deadline_ms: The budget sent by the client (TURN_DEADLINE_MS if None)
+
+        Returns:
+            The deadline
+
+        Raises:
+            ValueError: If the budget is not a positive number
+        """
+        if deadline_ms is None:
+            deadline_ms = TURN_DEADLINE_MS
+        if deadline_ms is None:
+            return cls()
+
+        try:
+            budget_ms = float(deadline_ms)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid deadline_ms: {deadline_ms!r}")
+        if budget_ms <= 0:
+            raise ValueError(f"deadline_ms must be positive, got {deadline_ms!r}")
+        return cls(budget_ms / 1000.0)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if there is no deadline)."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least this many seconds are left."""
+        remaining = self.remaining()
+        return remaining is None or remaining >= seconds
+
+    def cap(self, timeout: Optional[float], reserve: float = 0.0) -> Optional[float]:
+        """
+        Limit a timeout to the time left, keeping a reserve for later work.
+
+        Args:
+            timeout: The timeout to limit (None waits indefinitely)
+            reserve: Seconds to keep free after the timeout
+
+        Returns:
+            The capped timeout (never negative)
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        available = max(0.0, remaining - reserve)
+        return available if timeout is None else min(timeout, available)
+
+    def stage_timeouts(self,
+                       names: Iterable[str],
+                       timeout: Optional[float],
+                       timeouts: Optional[Dict[str, float]] = None,
+                       reserve: float = DEADLINE_REPLY_RESERVE) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        """
+        Fit optional stages into the time left before the reply must be generated.
+
+        Args:
+            names: The stage names
+            timeout: Default stage timeout
+            timeouts: Optional per-stage timeouts overriding the default
+            reserve: Seconds kept for generating the reply
+
+        Returns:
+            A tuple of (timeout per stage to run, names of stages that do not fit
+            and should not be started)
+        """
+        budgeted: Dict[str, Optional[float]] = {}
+        skipped: List[str] = []
+        for name in names:
+            stage_timeout = self.cap((timeouts or {}).get(name, timeout), reserve)
+            if stage_timeout is not None and stage_timeout < DEADLINE_MIN_STAGE_TIME:
+                skipped.append(name)
+            else:
+                budgeted[name] = stage_timeout
+        return budgeted, skipped
+
+
+# Deadline of the request being served in the current context
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+def set_current_deadline(deadline: Optional[Deadline]) -> contextvars.Token:
+    """
+    Set the deadline of the request served in the current context.
+
+    Args:
+        deadline: The deadline (None for no deadline)
+
+    Returns:
+        A token that can be passed to reset_current_deadline()
+    """
+    return _current_deadline.set(deadline)
+
+
+def reset_current_deadline(token: contextvars.Token) -> None:
+    """Restore the deadline that was active before set_current_deadline()."""
+    _current_deadline.reset(token)
+
+
+def get_current_deadline() -> Optional[Deadline]:
+    """Get the deadline of the request served in the current context, if any."""
+    return _current_deadline.get()
@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 
+from app.integrations.intents import detect_intents, REMEMBER
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -304,22 +306,12 @@ class MemoryManager:
         if not text:
             return []
             
-        # Patterns for memory requests
-        patterns = [
-            r"remember that (.+?)(?:\.|$)",
-            r"remember this:?\s*(.+?)(?:\.|$)",
-            r"please remember (?:that )?(.+?)(?:\.|$)",
-            r"can you remember (?:that )?(.+?)(?:\.|$)",
-            r"store this (?:information|fact):?\s*(.+?)(?:\.|$)"
-        ]
-        
+        # The request runs from the end of the trigger phrase to the end of the sentence
         memories = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                memory = match.group(1).strip()
-                if memory and len(memory) > 5:
-                    memories.append(memory)
+        for _, end in detect_intents(text).get(REMEMBER, []):
+            memory = re.split(r"[.\n]", text[end:], maxsplit=1)[0].lstrip(":").strip()
+            if memory and len(memory) > 5 and memory not in memories:
+                memories.append(memory)
         
         return memories
     
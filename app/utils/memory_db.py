@@ -9,19 +9,132 @@ import json
 import sqlite3
 import logging
 import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Union
-import glob
+import re
 import threading
+import bisect
+import heapq
+import itertools
+
+from app.config.settings import (
+    MEMORY_DB_BUSY_TIMEOUT,
+    MEMORY_DB_CACHE_SIZE_KB,
+    MEMORY_DB_MMAP_SIZE,
+    MEMORY_DB_CACHED_STATEMENTS,
+    MEMORY_BODY_CACHE_SIZE
+)
+from app.utils.text_index import APOSTROPHES, InvertedIndex, fold, tokenize
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Memory types, in the order they are reported
+MEMORY_TYPES = ['short', 'mid', 'long']
+
+# Manifest of memory files, kept in the storage directory itself
+MANIFEST_FILE = '.manifest.db'
+
+# Directories modified this recently are rescanned on the next start, since a
+# file written in the same mtime tick would not change the recorded mtime
+MTIME_SETTLE_SECONDS = 2.0
+
+# Per-thread MemoryDatabase connections, and the database files whose schema
+# has been created in this process (mapped to whether FTS5 search is available)
+_local = threading.local()
+_initialized_databases = {}
+_initialize_lock = threading.Lock()
+
+# Words of a search query; each becomes a quoted FTS5 prefix term
+_QUERY_WORD_PATTERN = re.compile(r"\w+")
+
+# Words of memory content as indexed, inner apostrophes included ("Bahá'í")
+_CONTENT_WORD_PATTERN = re.compile(rf"\w+(?:[{APOSTROPHES}]\w+)*")
+
+# Number of words in a search result snippet
+SNIPPET_WORDS = 16
+
+
+# Content table of the full-text index; an index created before it existed is rebuilt
+_FTS_CONTENT_TABLE = 'memories_folded'
+
+
+def _strip_apostrophes_sql(column: str) -> str:
+    """
+    Build an SQL expression removing from a column the apostrophes text_index.fold() removes.
+    
+    unicode61 splits words at apostrophes, so memory content is indexed
+    without them ("Bahá'í" -> "Baháí", which matches "bahai").
+    """
+    expression = column
+    for apostrophe in APOSTROPHES:
+        expression = f"replace({expression}, '{apostrophe.replace(chr(39), chr(39) * 2)}', '')"
+    return expression
+
+
+def _make_snippet(content: str, terms: List[str], highlight: Tuple[str, str]) -> str:
+    """
+    Build a search result snippet from the original memory content.
+    
+    The full-text index matches folded text, so the snippet is built here
+    rather than by FTS5's snippet(): the window of SNIPPET_WORDS words with
+    the most matches, with every word that starts with a folded query term
+    highlighted.
+    
+    Args:
+        content: The memory content
+        terms: Folded query terms
+        highlight: Markers placed before and after matched words
+        
+    Returns:
+        The snippet, with '…' where the content was cut
+    """
+    words = list(_CONTENT_WORD_PATTERN.finditer(content))
+    if not words:
+        return content
+    matched = [fold(word.group()).startswith(tuple(terms)) for word in words]
+    
+    # Find the window covering the most matches, then center it on them
+    size = min(SNIPPET_WORDS, len(words))
+    count = best_count = sum(matched[:size])
+    best_start = 0
+    for start in range(1, len(words) - size + 1):
+        count += matched[start + size - 1] - matched[start - 1]
+        if count > best_count:
+            best_start, best_count = start, count
+    hits = [index for index in range(best_start, best_start + size) if matched[index]]
+    if hits:
+        center = (hits[0] + hits[-1]) // 2
+        best_start = max(0, min(len(words) - size, center - size // 2))
+    window = range(best_start, best_start + size)
+    
+    parts = ['…' if best_start > 0 else content[:words[0].start()]]
+    position = words[best_start].start()
+    for index in window:
+        word = words[index]
+        parts.append(content[position:word.start()])
+        parts.append(f"{highlight[0]}{word.group()}{highlight[1]}" if matched[index] else word.group())
+        position = word.end()
+    last = window[-1]
+    parts.append('…' if last < len(words) - 1 else content[position:])
+    return "".join(parts)
+
 class MemoryDB:
     """
     A singleton database class for managing memory operations.
     This class provides optimized memory storage and retrieval.
+    
+    Startup reads a manifest of id, type, conversation, creation time and
+    path for every memory file instead of parsing the files themselves; only
+    directories whose mtime changed since the last run are rescanned. Memory
+    bodies are read when they are needed, and at most MEMORY_BODY_CACHE_SIZE
+    of them are kept, least recently used evicted first.
+    
+    Entries are indexed by id and kept in time-ordered lists per type and per
+    conversation, so deletes, the latest memory and the newest N memories
+    need a binary search rather than a scan.
     """
     _instance = None
     _lock = threading.Lock()
@@ -38,19 +151,18 @@ class MemoryDB:
             return
             
         self._initialized = True
-        self._cache = {
-            'short': {},
-            'mid': {},
-            'long': {}
-        }
-        self._latest_memory = {
-            'short': None,
-            'mid': None,
-            'long': None
-        }
+        self._data_lock = threading.RLock()
+        self._entries = {}  # path -> (id, type, conversation_id, created_at)
+        self._ids = {}  # memory id -> [paths]
+        self._by_type = {memory_type: [] for memory_type in MEMORY_TYPES}  # sorted (created_at, path)
+        self._by_conversation = {}  # conversation_id -> {type: sorted (created_at, path)}
+        self._bodies: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # path -> memory, LRU order
+        self._max_bodies = max(1, int(MEMORY_BODY_CACHE_SIZE))
+        self._text_index = None  # built on the first search
         self._memory_path = os.environ.get('MEMORY_STORAGE_PATH', 'memory_storage')
+        self._manifest_path = os.path.join(self._memory_path, MANIFEST_FILE)
         self._initialize_memory_path()
-        self._load_cache()
+        self._load_manifest()
     
     def _initialize_memory_path(self):
         """Initialize the memory storage directories."""
@@ -58,42 +170,277 @@ class MemoryDB:
             os.makedirs(self._memory_path)
             logger.info(f"Created memory storage directory at {self._memory_path}")
     
-    def _load_cache(self):
-        """Load all memories into cache for faster access."""
-        logger.info("Loading memory cache...")
+    def _connect_manifest(self) -> sqlite3.Connection:
+        """Open the manifest database, creating its tables if needed."""
+        conn = sqlite3.connect(self._manifest_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            path TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            id TEXT NOT NULL,
+            memory_type TEXT NOT NULL,
+            conversation_id TEXT NOT NULL,
+            created_at TEXT
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_directory ON entries(directory)')
+        return conn
+    
+    def _find_type_directories(self) -> Dict[str, int]:
+        """
+        Find every memory type directory under the storage path.
+        
+        Returns:
+            Directory paths (relative to the storage path) mapped to their mtime in nanoseconds
+        """
+        found = {}
+        pending = [self._memory_path]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        pending.append(entry.path)
+                        if entry.name in MEMORY_TYPES:
+                            found[os.path.relpath(entry.path, self._memory_path)] = entry.stat().st_mtime_ns
+            except OSError as e:
+                logger.error(f"Error scanning memory directory {current}: {str(e)}")
+        return found
+    
+    def _scan_directory(self, directory: str, known: Dict[str, tuple]) -> Dict[str, tuple]:
+        """
+        List the memory files of one type directory, reading only files not yet in the manifest.
         
-        # Walk through memory directory structure
-        for memory_type in ['short', 'mid', 'long']:
-            type_path = os.path.join(self._memory_path, '**', memory_type)
-            memory_files = glob.glob(f"{type_path}/*.json", recursive=True)
+        Args:
+            directory: Directory path relative to the storage path
+            known: Manifest entries previously recorded for the directory
+            
+        Returns:
+            Entries (path -> (id, type, conversation_id, created_at)) for the directory
+        """
+        memory_type = os.path.basename(directory)
+        entries = {}
+        try:
+            file_names = [name for name in os.listdir(os.path.join(self._memory_path, directory)) if name.endswith('.json')]
+        except OSError as e:
+            logger.error(f"Error listing memory directory {directory}: {str(e)}")
+            return entries
+        
+        for file_name in file_names:
+            path = os.path.join(directory, file_name)
+            if path in known:
+                entries[path] = known[path]
+                continue
+            try:
+                with open(os.path.join(self._memory_path, path), 'r') as f:
+                    memory = json.load(f)
+                entries[path] = (
+                    memory.get('id') or file_name.rsplit('_', 1)[0],
+                    memory_type,
+                    memory.get('conversation_id', 'default'),
+                    memory.get('created_at')
+                )
+            except Exception as e:
+                logger.error(f"Error loading memory from {path}: {str(e)}")
+        return entries
+    
+    def _load_manifest(self):
+        """Load the manifest, rescanning only the directories that changed since it was written."""
+        logger.info("Loading memory manifest...")
+        start_time = time.time()
+        
+        conn = self._connect_manifest()
+        try:
+            recorded = dict(conn.execute('SELECT path, mtime_ns FROM directories'))
+            entries_by_dir: Dict[str, Dict[str, tuple]] = {}
+            for path, directory, memory_id, memory_type, conversation_id, created_at in conn.execute(
+                    'SELECT path, directory, id, memory_type, conversation_id, created_at FROM entries'):
+                entries_by_dir.setdefault(directory, {})[path] = (memory_id, memory_type, conversation_id, created_at)
             
-            latest_timestamp = None
-            latest_memory = None
+            current = self._find_type_directories()
+            settle_ns = int((time.time() - MTIME_SETTLE_SECONDS) * 1e9)
+            rescanned = 0
             
-            for file_path in memory_files:
-                try:
-                    with open(file_path, 'r') as f:
-                        memory = json.load(f)
-                    
-                    conversation_id = memory.get('conversation_id', 'default')
-                    if conversation_id not in self._cache[memory_type]:
-                        self._cache[memory_type][conversation_id] = []
-                    
-                    self._cache[memory_type][conversation_id].append(memory)
-                    
-                    # Track latest memory of each type
-                    timestamp = memory.get('created_at')
-                    if timestamp and (latest_timestamp is None or timestamp > latest_timestamp):
-                        latest_timestamp = timestamp
-                        latest_memory = memory
+            for directory, mtime_ns in current.items():
+                if recorded.get(directory) == mtime_ns:
+                    continue
                 
-                except Exception as e:
-                    logger.error(f"Error loading memory from {file_path}: {str(e)}")
+                # New or changed directory: pick up added and removed files
+                rescanned += 1
+                entries = self._scan_directory(directory, entries_by_dir.get(directory, {}))
+                entries_by_dir[directory] = entries
+                conn.execute('DELETE FROM entries WHERE directory = ?', (directory,))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO entries (path, directory, id, memory_type, conversation_id, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(path, directory) + entry for path, entry in entries.items()]
+                )
+                conn.execute(
+                    'INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)',
+                    (directory, mtime_ns if mtime_ns < settle_ns else -1)
+                )
+            
+            # Forget directories that no longer exist
+            for directory in set(recorded) - set(current):
+                entries_by_dir.pop(directory, None)
+                conn.execute('DELETE FROM entries WHERE directory = ?', (directory,))
+                conn.execute('DELETE FROM directories WHERE path = ?', (directory,))
+            
+            conn.commit()
+        finally:
+            conn.close()
+        
+        with self._data_lock:
+            self._entries = {}
+            self._ids = {}
+            self._by_type = {memory_type: [] for memory_type in MEMORY_TYPES}
+            self._by_conversation = {}
+            self._bodies = OrderedDict()
+            self._text_index = None
+            for entries in entries_by_dir.values():
+                for path, entry in entries.items():
+                    self._index_entry(path, entry, sort=False)
             
-            # Set latest memory for this type
-            self._latest_memory[memory_type] = latest_memory
+            # Sort once instead of inserting each entry in order
+            for ordered in self._by_type.values():
+                ordered.sort()
+            for by_type in self._by_conversation.values():
+                for ordered in by_type.values():
+                    ordered.sort()
         
-        logger.info("Memory cache loaded successfully")
+        logger.info(f"Memory manifest loaded: {len(self._entries)} memories, "
+                    f"{rescanned} of {len(current)} directories rescanned in {time.time() - start_time:.2f}s")
+    
+    def _read_memory(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a memory file (path relative to the storage path)."""
+        try:
+            with open(os.path.join(self._memory_path, path), 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading memory from {path}: {str(e)}")
+            return None
+    
+    def _index_entry(self, path: str, entry: tuple, sort: bool = True) -> None:
+        """
+        Add a manifest entry to the in-memory indexes.
+        
+        Args:
+            path: Memory file path relative to the storage path
+            entry: (id, type, conversation_id, created_at)
+            sort: Insert in order; pass False when sorting afterwards
+        """
+        memory_id, memory_type, conversation_id, created_at = entry
+        key = (created_at or '', path)
+        self._entries[path] = entry
+        self._ids.setdefault(memory_id, []).append(path)
+        by_conversation = self._by_conversation.setdefault(
+            conversation_id, {t: [] for t in MEMORY_TYPES}
+        )[memory_type]
+        for ordered in (self._by_type[memory_type], by_conversation):
+            if sort:
+                bisect.insort(ordered, key)
+            else:
+                ordered.append(key)
+    
+    def _unindex_entry(self, path: str) -> tuple:
+        """
+        Remove a manifest entry from the in-memory indexes.
+        
+        Args:
+            path: Memory file path relative to the storage path
+            
+        Returns:
+            The removed entry
+        """
+        entry = self._entries.pop(path)
+        memory_id, memory_type, conversation_id, created_at = entry
+        key = (created_at or '', path)
+        
+        paths = self._ids[memory_id]
+        paths.remove(path)
+        if not paths:
+            del self._ids[memory_id]
+        
+        by_conversation = self._by_conversation[conversation_id]
+        for ordered in (self._by_type[memory_type], by_conversation[memory_type]):
+            index = bisect.bisect_left(ordered, key)
+            if index < len(ordered) and ordered[index] == key:
+                del ordered[index]
+        if not any(by_conversation.values()):
+            del self._by_conversation[conversation_id]
+        
+        self._bodies.pop(path, None)
+        if self._text_index is not None:
+            self._text_index.remove(path)
+        return entry
+    
+    def _get_body(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get a memory by path, reading it from disk if it is not cached."""
+        memory = self._bodies.get(path)
+        if memory is not None:
+            self._bodies.move_to_end(path)
+            return memory
+        memory = self._read_memory(path)
+        if memory is not None:
+            self._cache_body(path, memory)
+        return memory
+    
+    def _cache_body(self, path: str, memory: Dict[str, Any]) -> None:
+        """Keep a memory body, evicting the least recently used ones beyond the cache size."""
+        self._bodies[path] = memory
+        self._bodies.move_to_end(path)
+        while len(self._bodies) > self._max_bodies:
+            self._bodies.popitem(last=False)
+    
+    def _newest(self, ordered: List[Tuple[str, str]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the memories of a time-ordered index, newest first."""
+        keys = ordered[::-1] if limit is None else ordered[:-limit - 1:-1] if limit > 0 else []
+        memories = []
+        for _, path in keys:
+            memory = self._get_body(path)
+            if memory is not None:
+                memories.append(memory)
+        return memories
+    
+    def _record_entry(self, path: str, entry: tuple) -> None:
+        """Add an entry to the manifest, keeping its directory's mtime current."""
+        directory = os.path.dirname(path)
+        mtime_ns = os.stat(os.path.join(self._memory_path, directory)).st_mtime_ns
+        settle_ns = int((time.time() - MTIME_SETTLE_SECONDS) * 1e9)
+        conn = self._connect_manifest()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (path, directory, id, memory_type, conversation_id, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (path, directory) + entry
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)',
+                (directory, mtime_ns if mtime_ns < settle_ns else -1)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _forget_entries(self, paths: List[str]) -> None:
+        """Remove entries from the manifest after their files were deleted."""
+        conn = self._connect_manifest()
+        try:
+            conn.executemany('DELETE FROM entries WHERE path = ?', [(path,) for path in paths])
+            for directory in {os.path.dirname(path) for path in paths}:
+                # Force a rescan if the directory changes again before the next start
+                conn.execute('INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, -1)', (directory,))
+            conn.commit()
+        finally:
+            conn.close()
     
     def add_memory(self, memory: Dict[str, Any]) -> None:
         """
@@ -111,6 +458,8 @@ class MemoryDB:
             
             memory_type = memory['type']
             conversation_id = memory['conversation_id']
+            if memory_type not in MEMORY_TYPES:
+                raise ValueError(f"Invalid memory type: {memory_type}")
             
             # Set timestamps if not present
             if 'created_at' not in memory:
@@ -131,16 +480,15 @@ class MemoryDB:
             with open(file_path, 'w') as f:
                 json.dump(memory, f, indent=2)
             
-            # Update cache
-            if conversation_id not in self._cache[memory_type]:
-                self._cache[memory_type][conversation_id] = []
-            
-            self._cache[memory_type][conversation_id].append(memory)
-            
-            # Update latest memory if this is newer
-            current_latest = self._latest_memory[memory_type]
-            if current_latest is None or memory['created_at'] > current_latest['created_at']:
-                self._latest_memory[memory_type] = memory
+            # Update manifest and indexes
+            path = os.path.relpath(file_path, self._memory_path)
+            entry = (memory['id'], memory_type, conversation_id, memory['created_at'])
+            with self._data_lock:
+                self._record_entry(path, entry)
+                self._index_entry(path, entry)
+                self._cache_body(path, memory)
+                if self._text_index is not None:
+                    self._text_index.add(path, memory.get('content', ''))
             
             logger.info(f"Added {memory_type} memory for conversation {conversation_id}")
             
@@ -148,33 +496,32 @@ class MemoryDB:
             logger.error(f"Error adding memory: {str(e)}")
             raise
     
-    def get_memories(self, memory_type: str, conversation_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_memories(self,
+                     memory_type: str,
+                     conversation_id: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get memories of a specific type, optionally filtered by conversation.
         
         Args:
             memory_type: Type of memory to retrieve (short, mid, long)
             conversation_id: Optional conversation ID to filter by
+            limit: Optional maximum number of memories to return
         
         Returns:
-            List of memory objects
+            List of memory objects, newest first
         """
-        if memory_type not in ['short', 'mid', 'long']:
+        if memory_type not in MEMORY_TYPES:
             raise ValueError(f"Invalid memory type: {memory_type}")
         
-        # If conversation_id provided, filter by it
-        if conversation_id:
-            return self._cache[memory_type].get(conversation_id, [])
-        
-        # Otherwise, return all memories of this type
-        all_memories = []
-        for conv_memories in self._cache[memory_type].values():
-            all_memories.extend(conv_memories)
-        
-        # Sort by created_at timestamp, newest first
-        all_memories.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        return all_memories
+        with self._data_lock:
+            # If conversation_id provided, filter by it
+            if conversation_id:
+                by_conversation = self._by_conversation.get(conversation_id)
+                return self._newest(by_conversation[memory_type], limit) if by_conversation else []
+            
+            # Otherwise, return memories of this type
+            return self._newest(self._by_type[memory_type], limit)
     
     def get_latest_memory(self, memory_type: str) -> Optional[Dict[str, Any]]:
         """
@@ -186,33 +533,57 @@ class MemoryDB:
         Returns:
             Most recent memory object or None if no memories exist
         """
-        if memory_type not in ['short', 'mid', 'long']:
+        if memory_type not in MEMORY_TYPES:
             raise ValueError(f"Invalid memory type: {memory_type}")
         
-        return self._latest_memory[memory_type]
+        with self._data_lock:
+            latest = self._newest(self._by_type[memory_type], 1)
+        return latest[0] if latest else None
     
-    def search_memories(self, query: str) -> List[Dict[str, Any]]:
+    def _get_text_index(self) -> InvertedIndex:
+        """Get the full-text index, reading every memory to build it on first use."""
+        if self._text_index is None:
+            start_time = time.time()
+            text_index = InvertedIndex()
+            for path in self._entries:
+                # Read directly so building the index does not keep every body in memory
+                memory = self._bodies.get(path) or self._read_memory(path)
+                if memory is not None:
+                    text_index.add(path, memory.get('content', ''))
+            self._text_index = text_index
+            logger.info(f"Built memory search index for {len(text_index)} memories in {time.time() - start_time:.2f}s")
+        return self._text_index
+    
+    def search_memories(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
-        Search for memories containing the given query.
+        Search for memories matching the given query.
+        
+        Matching ignores case and diacritics, and query words also match
+        words they are a prefix of. Results are ranked by relevance (BM25);
+        an empty query returns the newest memories.
         
         Args:
             query: Search string to look for in memory content
+            limit: Optional maximum number of results
+            offset: Number of results to skip, for paging
         
         Returns:
-            List of memory objects matching the query
+            List of memory objects matching the query, best match first
         """
-        results = []
-        
-        # Search across all memory types and conversations
-        for memory_type in ['short', 'mid', 'long']:
-            for conversation_memories in self._cache[memory_type].values():
-                for memory in conversation_memories:
-                    content = memory.get('content', '').lower()
-                    if query.lower() in content:
-                        results.append(memory)
-        
-        # Sort by created_at timestamp, newest first
-        results.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        offset = max(0, offset)
+        with self._data_lock:
+            if not tokenize(query):
+                newest = heapq.merge(*(reversed(ordered) for ordered in self._by_type.values()), reverse=True)
+                stop = None if limit is None else offset + limit
+                paths = [path for _, path in itertools.islice(newest, offset, stop)]
+            else:
+                paths = [path for path, _ in self._get_text_index().search(query, limit, offset)]
+            
+            results = []
+            for path in paths:
+                memory = self._get_body(path)
+                if memory is not None:
+                    results.append(memory)
         
         return results
     
@@ -226,52 +597,29 @@ class MemoryDB:
         Returns:
             True if successful, False otherwise
         """
-        # Search for the memory in the cache
-        for memory_type in ['short', 'mid', 'long']:
-            for conversation_id, memories in self._cache[memory_type].items():
-                for i, memory in enumerate(memories):
-                    if memory.get('id') == memory_id:
-                        # Remove from cache
-                        removed_memory = self._cache[memory_type][conversation_id].pop(i)
-                        
-                        # Remove file
-                        conversation_path = os.path.join(self._memory_path, conversation_id, memory_type)
-                        memory_files = glob.glob(f"{conversation_path}/{memory_id}_*.json")
-                        
-                        for file_path in memory_files:
-                            try:
-                                os.remove(file_path)
-                                logger.info(f"Deleted memory file: {file_path}")
-                            except Exception as e:
-                                logger.error(f"Error deleting memory file {file_path}: {str(e)}")
-                        
-                        # Update latest memory if needed
-                        if self._latest_memory[memory_type] and self._latest_memory[memory_type].get('id') == memory_id:
-                            # Find new latest memory
-                            memories = self.get_memories(memory_type)
-                            if memories:
-                                self._latest_memory[memory_type] = memories[0]
-                            else:
-                                self._latest_memory[memory_type] = None
-                        
-                        return True
-        
-        logger.warning(f"Memory {memory_id} not found for deletion")
-        return False
+        with self._data_lock:
+            paths = list(self._ids.get(memory_id, ()))
+            if not paths:
+                logger.warning(f"Memory {memory_id} not found for deletion")
+                return False
+            
+            for path in paths:
+                self._unindex_entry(path)
+                
+                # Remove file
+                file_path = os.path.join(self._memory_path, path)
+                try:
+                    os.remove(file_path)
+                    logger.info(f"Deleted memory file: {file_path}")
+                except Exception as e:
+                    logger.error(f"Error deleting memory file {file_path}: {str(e)}")
+            self._forget_entries(paths)
+            
+            return True
     
     def clear_cache(self):
-        """Clear the memory cache and reload from disk."""
-        self._cache = {
-            'short': {},
-            'mid': {},
-            'long': {}
-        }
-        self._latest_memory = {
-            'short': None,
-            'mid': None,
-            'long': None
-        }
-        self._load_cache()
+        """Clear the memory cache and reload the manifest from disk."""
+        self._load_manifest()
         
     def get_memory_stats(self):
         """
@@ -280,31 +628,16 @@ class MemoryDB:
         Returns:
             Dictionary with memory statistics
         """
-        stats = {
-            'total_memories': 0,
-            'short_term': 0,
-            'mid_term': 0,
-            'long_term': 0,
-            'conversations': set()
-        }
-        
-        for memory_type in ['short', 'mid', 'long']:
-            for conversation_id, memories in self._cache[memory_type].items():
-                count = len(memories)
-                stats['total_memories'] += count
-                
-                if memory_type == 'short':
-                    stats['short_term'] += count
-                elif memory_type == 'mid':
-                    stats['mid_term'] += count
-                elif memory_type == 'long':
-                    stats['long_term'] += count
-                
-                stats['conversations'].add(conversation_id)
-        
-        # Convert set to list for JSON serialization
-        stats['conversations'] = list(stats['conversations'])
-        stats['conversation_count'] = len(stats['conversations'])
+        with self._data_lock:
+            conversations = list(self._by_conversation)
+            stats = {
+                'total_memories': len(self._entries),
+                'short_term': len(self._by_type['short']),
+                'mid_term': len(self._by_type['mid']),
+                'long_term': len(self._by_type['long']),
+                'conversations': conversations,
+                'conversation_count': len(conversations)
+            }
         
         return stats
 
@@ -312,6 +645,10 @@ class MemoryDatabase:
     """
     SQLite database for memory storage and retrieval.
     Provides fast, indexed queries for memory operations.
+    
+    Each thread reuses one connection per database file, opened in WAL mode so
+    readers do not block on a writer, and the schema is created once per
+    process rather than once per instance.
     """
     
     def __init__(self, db_path='data/memory.db'):
@@ -322,9 +659,16 @@ class MemoryDatabase:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
-        self._ensure_directory_exists()
-        self._initialize_db()
-        logger.info(f"Memory database initialized at {db_path}")
+        
+        key = os.path.abspath(db_path)
+        if key not in _initialized_databases:
+            with _initialize_lock:
+                if key not in _initialized_databases:
+                    self._ensure_directory_exists()
+                    self._initialize_db()
+                    _initialized_databases[key] = self._initialize_fts()
+                    logger.info(f"Memory database initialized at {db_path}")
+        self._fts_enabled = _initialized_databases[key]
     
     def _ensure_directory_exists(self):
         """Ensure the directory for the database file exists"""
@@ -332,9 +676,44 @@ class MemoryDatabase:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection to the database, opening it on first use.
+        
+        Returns:
+            A connection returning rows as sqlite3.Row
+        """
+        connections = getattr(_local, 'connections', None)
+        if connections is None or _local.pid != os.getpid():
+            # Connections must not be shared with a forked child
+            connections = _local.connections = {}
+            _local.pid = os.getpid()
+        
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=MEMORY_DB_BUSY_TIMEOUT,
+                cached_statements=MEMORY_DB_CACHED_STATEMENTS
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA cache_size=-{int(MEMORY_DB_CACHE_SIZE_KB)}')
+            conn.execute(f'PRAGMA mmap_size={int(MEMORY_DB_MMAP_SIZE)}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            connections[self.db_path] = conn
+        return conn
+    
+    def _rollback(self):
+        """Roll back a failed write so the shared connection is left usable."""
+        conn = getattr(_local, 'connections', {}).get(self.db_path)
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+    
     def _initialize_db(self):
         """Create tables and indexes if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         # Create memories table
@@ -369,7 +748,74 @@ class MemoryDatabase:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_transcript_user_id ON conversation_transcripts(user_id)')
         
         conn.commit()
-        conn.close()
+    
+    def _initialize_fts(self) -> bool:
+        """
+        Create the full-text index of memory content and the triggers that keep it in sync.
+        
+        memories_fts is an FTS5 table over the memories_folded view, which is
+        memory content without apostrophes; the tokenizer folds case and
+        diacritics. It is backfilled from existing rows the first time it is
+        created, and an index from before the view existed is rebuilt.
+        
+        Returns:
+            True if full-text search is available, False if SQLite lacks FTS5
+        """
+        conn = self._get_connection()
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+        ).fetchone()
+        exists = row is not None and f"content='{_FTS_CONTENT_TABLE}'" in row[0]
+        
+        try:
+            with conn:
+                if row is not None and not exists:
+                    # Indexed with apostrophes splitting words: drop and rebuild it
+                    for trigger in ('memories_fts_insert', 'memories_fts_delete', 'memories_fts_update'):
+                        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                    conn.execute("DROP TABLE memories_fts")
+                    logger.info("Rebuilding full-text index of memories without apostrophes")
+                
+                conn.execute(f'''
+                CREATE VIEW IF NOT EXISTS {_FTS_CONTENT_TABLE} AS
+                SELECT rowid AS rowid, {_strip_apostrophes_sql('content')} AS content FROM memories
+                ''')
+                conn.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content,
+                    content='{_FTS_CONTENT_TABLE}',
+                    content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                ''')
+                new_content = _strip_apostrophes_sql('new.content')
+                old_content = _strip_apostrophes_sql('old.content')
+                conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts (rowid, content) VALUES (new.rowid, {new_content});
+                END
+                ''')
+                conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, content) VALUES ('delete', old.rowid, {old_content});
+                END
+                ''')
+                conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF content ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, content) VALUES ('delete', old.rowid, {old_content});
+                    INSERT INTO memories_fts (rowid, content) VALUES (new.rowid, {new_content});
+                END
+                ''')
+                
+                if not exists:
+                    # Index memories stored before the full-text table existed
+                    conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('rebuild')")
+                    logger.info("Built full-text index of existing memories")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search unavailable, falling back to LIKE queries: {e}")
+            return False
+        
+        return True
     
     def get_latest_memories(self, user_id: str, limit_per_type: int = 1) -> Dict[str, Any]:
         """
@@ -388,8 +834,7 @@ class MemoryDatabase:
             "long": None
         }
         
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return results as dictionaries
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         for memory_type in ["short", "mid", "long"]:
@@ -407,7 +852,6 @@ class MemoryDatabase:
                 # Convert row to dictionary
                 result[memory_type] = dict(rows[0])
         
-        conn.close()
         return result
     
     def get_memory_by_id(self, memory_id: str) -> Optional[Dict[str, Any]]:
@@ -420,14 +864,12 @@ class MemoryDatabase:
         Returns:
             Memory object if found, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM memories WHERE id = ?", (memory_id,))
         row = cursor.fetchone()
         
-        conn.close()
         return dict(row) if row else None
     
     def get_memories_by_conversation(self, conversation_id: str) -> List[Dict[str, Any]]:
@@ -440,8 +882,7 @@ class MemoryDatabase:
         Returns:
             List of memory objects
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -450,7 +891,6 @@ class MemoryDatabase:
         )
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
@@ -485,17 +925,27 @@ class MemoryDatabase:
                         logger.error(f"Missing required field {field} in memory data")
                         return False
             
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             # Handling both "type" and "memory_type" fields for flexibility
             memory_type = memory_data.get('type', memory_data.get('memory_type', 'short'))
             
+            # Upsert rather than REPLACE, so the row keeps its rowid and the
+            # full-text index is updated by its UPDATE trigger
             cursor.execute(
                 """
-                INSERT OR REPLACE INTO memories 
+                INSERT INTO memories 
                 (id, user_id, conversation_id, content, memory_type, created_at, updated_at, relevance_score)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    conversation_id = excluded.conversation_id,
+                    content = excluded.content,
+                    memory_type = excluded.memory_type,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at,
+                    relevance_score = excluded.relevance_score
                 """,
                 (
                     memory_data['id'],
@@ -510,12 +960,12 @@ class MemoryDatabase:
             )
             
             conn.commit()
-            conn.close()
             logger.info(f"Stored {memory_type} memory with ID {memory_data['id']}")
             return True
             
         except Exception as e:
             logger.error(f"Error storing memory: {e}")
+            self._rollback()
             return False
     
     def store_conversation_transcript(self, user_id: str, conversation_id: str, messages: List[Dict[str, Any]]) -> bool:
@@ -531,7 +981,7 @@ class MemoryDatabase:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             # Convert messages to JSON string
@@ -553,12 +1003,12 @@ class MemoryDatabase:
             )
             
             conn.commit()
-            conn.close()
             logger.info(f"Stored transcript for conversation {conversation_id}")
             return True
             
         except Exception as e:
             logger.error(f"Error storing conversation transcript: {e}")
+            self._rollback()
             return False
     
     def get_conversation_transcript(self, conversation_id: str) -> Optional[Dict[str, Any]]:
@@ -571,8 +1021,7 @@ class MemoryDatabase:
         Returns:
             Transcript object if found, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -581,7 +1030,6 @@ class MemoryDatabase:
         )
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             data = dict(row)
@@ -591,20 +1039,64 @@ class MemoryDatabase:
         
         return None
     
-    def search_memories(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def search_memories(self,
+                        user_id: str,
+                        query: str,
+                        limit: int = 10,
+                        highlight: Tuple[str, str] = ('**', '**')) -> List[Dict[str, Any]]:
         """
-        Search memories using simple text matching.
+        Search memories with the full-text index.
+        
+        Every word of the query must appear, as a word or the start of one,
+        ignoring case, diacritics and apostrophes (the query is folded with
+        text_index.fold, so "bahai" finds "Bahá'í"). Results are ranked by
+        BM25 and carry a 'snippet' of the original content around the
+        matches. Without FTS5, or for a
+        query without words, falls back to a substring match, newest first.
         
         Args:
             user_id: User identifier
             query: Search query
             limit: Maximum number of results
+            highlight: Markers placed before and after matched words in the snippet
             
         Returns:
             List of matching memory objects
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        words = _QUERY_WORD_PATTERN.findall(fold(query))
+        if not self._fts_enabled or not words:
+            return self._search_memories_like(user_id, query, limit)
+        
+        # Quote each word so query syntax (AND, NEAR, "-", ...) is matched literally
+        match = " ".join(f'"{word}"*' for word in words)
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            """
+            SELECT m.*
+            FROM memories_fts
+            JOIN memories AS m ON m.rowid = memories_fts.rowid
+            WHERE memories_fts MATCH ? AND m.user_id = ?
+            ORDER BY bm25(memories_fts)
+            LIMIT ?
+            """,
+            (match, user_id, limit)
+        )
+        
+        rows = cursor.fetchall()
+        
+        results = []
+        for row in rows:
+            memory = dict(row)
+            memory['snippet'] = _make_snippet(memory['content'], words, highlight)
+            results.append(memory)
+        return results
+    
+    def _search_memories_like(self, user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Search memories by substring, newest first."""
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -618,7 +1110,6 @@ class MemoryDatabase:
         )
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
@@ -633,14 +1124,13 @@ class MemoryDatabase:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             cursor.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
             
             deleted = cursor.rowcount > 0
             conn.commit()
-            conn.close()
             
             if deleted:
                 logger.info(f"Deleted memory with ID {memory_id}")
@@ -651,6 +1141,7 @@ class MemoryDatabase:
             
         except Exception as e:
             logger.error(f"Error deleting memory: {e}")
+            self._rollback()
             return False
             
     def clean_database(self):
@@ -658,7 +1149,6 @@ class MemoryDatabase:
         Vacuum the database to reclaim space and optimize performance.
         Should be called periodically for maintenance.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         conn.execute("VACUUM")
-        conn.close()
         logger.info("Database cleaned and optimized") 
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""
+Memory Job Queue Module for Bahá'í Life Coach
+
+This module moves the end-of-session work (storing the transcript and creating
+a memory with the LLM summarizer) off the request path. Jobs are written to a
+SQLite table next to the memories before they are acknowledged, so they survive
+a restart, and a single worker thread processes them in order. A failed job is
+retried after an exponential backoff (MEMORY_JOB_RETRY_DELAY, doubled per
+attempt), so its retries are not used up while a provider is down.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import MEMORY_JOB_MAX_ATTEMPTS, MEMORY_JOB_RETRY_DELAY, MEMORY_JOB_MAX_RETRY_DELAY
+from app.models.rate_limiter import PRIORITY_BACKGROUND, set_request_priority
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Seconds the worker sleeps when the queue is empty (enqueue wakes it earlier)
+POLL_INTERVAL = 5
+
+# Global queue instance (singleton pattern)
+_queue_instance = None
+_queue_lock = threading.Lock()
+
+
+class MemoryJobQueue:
+    """
+    Durable queue of end-of-conversation memory jobs backed by SQLite.
+    """
+
+    def __init__(self,
+                 db_path: str = 'data/memory.db',
+                 max_attempts: int = MEMORY_JOB_MAX_ATTEMPTS,
+                 retry_delay: float = MEMORY_JOB_RETRY_DELAY,
+                 max_retry_delay: float = MEMORY_JOB_MAX_RETRY_DELAY):
+        """
+        Initialize the job queue.
+
+        Args:
+            db_path: Path to SQLite database file
+            max_attempts: Number of times a job is tried before it is marked failed
+            retry_delay: Seconds before the first retry of a failed job, doubled per attempt
+            max_retry_delay: Upper bound of the retry delay in seconds
+        """
+        self.db_path = db_path
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._initialize_db()
+
+    def _initialize_db(self):
+        """Create the jobs table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS memory_jobs (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            conversation_id TEXT NOT NULL,
+            messages TEXT NOT NULL,
+            summary TEXT,
+            summary_covered INTEGER,
+            llm_model TEXT,
+            remember INTEGER NOT NULL DEFAULT 1,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            memory_id TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            next_attempt_at TEXT
+        )
+        ''')
+
+        # Add the columns missing from tables created by earlier versions
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(memory_jobs)")]
+        if 'next_attempt_at' not in columns:
+            cursor.execute('ALTER TABLE memory_jobs ADD COLUMN next_attempt_at TEXT')
+        if 'summary_covered' not in columns:
+            cursor.execute('ALTER TABLE memory_jobs ADD COLUMN summary_covered INTEGER')
+        if 'llm_model' not in columns:
+            cursor.execute('ALTER TABLE memory_jobs ADD COLUMN llm_model TEXT')
+        cursor.execute('UPDATE memory_jobs SET next_attempt_at = created_at WHERE next_attempt_at IS NULL')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_jobs_status ON memory_jobs(status, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_jobs_due ON memory_jobs(status, next_attempt_at)')
+
+        conn.commit()
+        conn.close()
+
+    def start(self):
+        """
+        Start the worker thread, requeueing jobs interrupted by a previous shutdown.
+        """
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+
+            requeued = self._execute(
+                "UPDATE memory_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (JOB_QUEUED, datetime.now().isoformat(), JOB_RUNNING)
+            )
+            if requeued:
+                logger.info(f"Requeued {requeued} interrupted memory jobs")
+
+            self._worker = threading.Thread(target=self._run, name="memory-jobs", daemon=True)
+            self._worker.start()
+
+    def enqueue(
+        self,
+        user_id: str,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        remember: bool = True,
+        summary: Optional[str] = None,
+        summary_covered: Optional[int] = None,
+        llm_model: Optional[str] = None
+    ) -> str:
+        """
+        Queue a conversation for transcript storage and memory creation.
+
+        Args:
+            user_id: User identifier
+            conversation_id: The conversation ID
+            messages: The conversation messages
+            remember: Whether to create a memory from the conversation
+            summary: Precomputed summary to use instead of calling the LLM
+            summary_covered: Number of leading messages the summary covers
+                (None if it covers them all); the rest are folded into it
+            llm_model: The session's LLM model, whose auxiliary model writes
+                the summary (None for the configured default)
+
+        Returns:
+            The job ID
+        """
+        job_id = str(uuid.uuid4())
+        timestamp = datetime.now().isoformat()
+        self._execute(
+            """
+            INSERT INTO memory_jobs
+            (id, user_id, conversation_id, messages, summary, summary_covered, llm_model, remember, status,
+             attempts, created_at, updated_at, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+            """,
+            (job_id, user_id, conversation_id, json.dumps(messages), summary, summary_covered, llm_model,
+             1 if remember else 0, JOB_QUEUED, timestamp, timestamp, timestamp)
+        )
+
+        self.start()
+        self._wakeup.set()
+        logger.info(f"Queued memory job {job_id} for conversation {conversation_id}")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            Job status dictionary or None if not found
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT id, conversation_id, status, attempts, memory_id, error, created_at, updated_at, next_attempt_at
+            FROM memory_jobs WHERE id = ?
+            """,
+            (job_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        return {
+            "job_id": row["id"],
+            "conversation_id": row["conversation_id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "memory_id": row["memory_id"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "next_attempt_at": row["next_attempt_at"] if row["status"] == JOB_QUEUED else None
+        }
+
+    def _run(self):
+        """Worker loop: process queued jobs oldest first."""
+        # Summaries made by the worker queue behind interactive LLM calls
+        set_request_priority(PRIORITY_BACKGROUND)
+        while True:
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error(f"Error reading memory job queue: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+
+            self._process(job)
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job that is due as running and return it."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        try:
+            while True:
+                cursor.execute(
+                    """
+                    SELECT * FROM memory_jobs WHERE status = ? AND next_attempt_at <= ?
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (JOB_QUEUED, datetime.now().isoformat())
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                # Only claim the job if no other worker got to it first
+                cursor.execute(
+                    """
+                    UPDATE memory_jobs SET status = ?, attempts = attempts + 1, updated_at = ?
+                    WHERE id = ? AND status = ?
+                    """,
+                    (JOB_RUNNING, datetime.now().isoformat(), row["id"], JOB_QUEUED)
+                )
+                conn.commit()
+                if cursor.rowcount:
+                    job = dict(row)
+                    job["attempts"] += 1
+                    return job
+        finally:
+            conn.close()
+
+    def _process(self, job: Dict[str, Any]):
+        """Store the transcript and create the memory for a job."""
+        # Imported here because the memory manager itself enqueues jobs
+        from app.utils.tiered_memory import TieredMemoryManager
+
+        job_id = job["id"]
+        try:
+            manager = TieredMemoryManager(user_id=job["user_id"], llm_model=job["llm_model"])
+            memory_id = manager.persist_conversation(
+                job["conversation_id"],
+                json.loads(job["messages"]),
+                remember=bool(job["remember"]),
+                summary=job["summary"],
+                summary_covered=job["summary_covered"],
+                strict=True,
+                # Retry LLM failures; settle for an excerpt summary on the last attempt
+                fallback_summary=job["attempts"] >= self.max_attempts
+            )
+            self._execute(
+                "UPDATE memory_jobs SET status = ?, memory_id = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (JOB_DONE, memory_id, datetime.now().isoformat(), job_id)
+            )
+            logger.info(f"Completed memory job {job_id}")
+        except Exception as e:
+            now = datetime.now()
+            if job["attempts"] < self.max_attempts:
+                status = JOB_QUEUED
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (job["attempts"] - 1))
+                logger.error(f"Memory job {job_id} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {e}")
+            else:
+                status = JOB_FAILED
+                delay = 0
+                logger.error(f"Memory job {job_id} failed (attempt {job['attempts']}): {e}")
+            self._execute(
+                "UPDATE memory_jobs SET status = ?, error = ?, updated_at = ?, next_attempt_at = ? WHERE id = ?",
+                (status, str(e), now.isoformat(), (now + timedelta(seconds=delay)).isoformat(), job_id)
+            )
+
+    def _execute(self, query: str, params: tuple) -> int:
+        """Run a write statement and return the number of affected rows."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+
+def get_memory_job_queue() -> MemoryJobQueue:
+    """
+    Get the shared memory job queue (singleton pattern), starting its worker.
+
+    Returns:
+        The memory job queue
+    """
+    global _queue_instance
+
+    if _queue_instance is None:
+        with _queue_lock:
+            if _queue_instance is None:
+                _queue_instance = MemoryJobQueue()
+                _queue_instance.start()
+
+    return _queue_instance
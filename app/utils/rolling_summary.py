@@ -0,0 +1,179 @@
+"""
+Rolling Summary Module for Bahá'í Life Coach
+
+This module maintains an incremental summary of a conversation. After each
+exchange the new messages are folded into the running summary on the
+background executor, so a summary of the whole conversation is available as
+soon as the session ends.
+"""
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.background import submit_background
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Maximum number of words kept in a summary
+MAX_SUMMARY_WORDS = 100
+
+SUMMARY_UPDATE_PROMPT = """
+Below is the running summary of a conversation between a user and a Bahá'í life coach assistant,
+followed by the newest messages of that conversation.
+Please update the summary so it also covers the new messages, in 20-100 words.
+Focus on the key points, questions asked, and insights shared.
+
+Current summary:
+{summary}
+
+New messages:
+{conversation_text}
+
+Updated summary:
+"""
+
+
+class RollingSummary:
+    """
+    Incrementally maintained summary of a single conversation.
+
+    Updates are serialized, and each one folds every message not yet covered,
+    so several quick turns collapse into a single LLM call.
+    """
+
+    def __init__(self, llm_factory: Callable[[], Any]):
+        """
+        Initialize an empty rolling summary.
+
+        Args:
+            llm_factory: Callable returning the LLM used for summary updates
+        """
+        self.llm_factory = llm_factory
+        self.summary = ""
+        self.covered = 0  # Number of messages folded into the summary
+        self._generation = 0  # Incremented on reset to discard stale updates
+        self._update_lock = threading.Lock()  # Serializes LLM updates
+        self._state_lock = threading.Lock()  # Guards summary, covered and generation
+        self._future: Optional[Future] = None
+
+    def reset(self, summary: str = "", covered: int = 0):
+        """
+        Reset the summary, e.g. when a new conversation starts.
+
+        Args:
+            summary: Initial summary text
+            covered: Number of messages the initial summary covers
+        """
+        with self._state_lock:
+            self.summary = summary
+            self.covered = covered
+            self._generation += 1
+            self._future = None
+
+    def schedule_update(self, messages: List[Dict[str, Any]]) -> Future:
+        """
+        Fold new messages into the summary on the background executor.
+
+        Args:
+            messages: All messages of the conversation so far
+
+        Returns:
+            A future for the update
+        """
+        self._future = submit_background(self._update, list(messages), self._generation)
+        return self._future
+
+    def get(self, messages: List[Dict[str, Any]], wait: float = 0) -> Optional[str]:
+        """
+        Get the summary if it covers all the given messages.
+
+        Args:
+            messages: All messages of the conversation
+            wait: Seconds to wait for an in-flight update
+
+        Returns:
+            The summary, or None if it is not up to date
+        """
+        summary, covered = self.snapshot(wait)
+        if summary and covered >= len(messages):
+            return summary
+        return None
+
+    def snapshot(self, wait: float = 0) -> Tuple[str, int]:
+        """
+        Get the summary and the number of messages it covers, even if it is behind.
+
+        Args:
+            wait: Seconds to wait for an in-flight update
+
+        Returns:
+            A tuple of (summary, number of messages covered)
+        """
+        future = self._future
+        if future is not None and wait > 0:
+            try:
+                future.result(timeout=wait)
+            except FutureTimeoutError:
+                logger.info("Rolling summary update still running")
+            except Exception:
+                pass
+
+        with self._state_lock:
+            return self.summary, self.covered
+
+    def update_now(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Fold the messages not yet covered into the summary in the calling thread.
+
+        Args:
+            messages: All messages of the conversation
+
+        Returns:
+            The updated summary
+        """
+        return self._update(list(messages), self._generation)
+
+    def _update(self, messages: List[Dict[str, Any]], generation: int) -> str:
+        """Fold the messages not yet covered into the summary."""
+        with self._update_lock:
+            with self._state_lock:
+                if generation != self._generation:
+                    return self.summary
+                current_summary = self.summary
+                new_messages = messages[self.covered:]
+
+            conversation_text = ""
+            for msg in new_messages:
+                role = msg.get("role", "unknown")
+                content = msg.get("content", "")
+                if content and role in ["user", "assistant"]:
+                    conversation_text += f"{role.capitalize()}: {content}\n\n"
+
+            if conversation_text:
+                prompt = SUMMARY_UPDATE_PROMPT.format(
+                    summary=current_summary or "(no summary yet)",
+                    conversation_text=conversation_text
+                )
+
+                response = self.llm_factory().invoke(prompt)
+                summary = response.content if hasattr(response, 'content') else str(response)
+                summary = summary.strip()
+
+                # Ensure summary is not too long
+                words = summary.split()
+                if len(words) > MAX_SUMMARY_WORDS:
+                    summary = " ".join(words[:MAX_SUMMARY_WORDS]) + "..."
+            else:
+                summary = current_summary
+
+            with self._state_lock:
+                # Discard the result if the conversation was reset meanwhile
+                if generation != self._generation:
+                    return self.summary
+                self.summary = summary
+                self.covered = len(messages)
+
+            logger.debug(f"Rolling summary now covers {len(messages)} messages")
+            return summary
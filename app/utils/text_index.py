@@ -0,0 +1,195 @@
+"""
+Text Index Module for the Bahai Life Coach Agent.
+
+An in-memory inverted index for searching memories. Text is tokenized with
+case and diacritic folding and inner apostrophes removed, so "Bahai" matches
+"Bahá'í" and "Baha'i". Results are ranked with BM25, and a query term also
+matches the indexed terms it is a prefix of ("pray" finds "prayer"), at a
+lower weight than an exact match. Documents are added and removed
+incrementally, and a query only visits the postings of its terms, so query
+time depends on how many documents match rather than on the corpus size.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms shorter than this only match exactly
+MIN_PREFIX_LENGTH = 3
+
+# Weight of a term matched through a query prefix, relative to an exact match
+PREFIX_WEIGHT = 0.5
+
+# Maximum number of indexed terms a single query prefix expands to
+MAX_PREFIX_EXPANSIONS = 50
+
+# Apostrophes removed by fold(), so "Bahá'í" and "Bahai" match
+APOSTROPHES = "'’‘ʼ"
+
+_APOSTROPHES = re.compile(f"[{APOSTROPHES}]")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """
+    Fold text for matching: lower-case, without diacritics and apostrophes.
+
+    Args:
+        text: The text to fold
+
+    Returns:
+        The folded text
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _APOSTROPHES.sub("", stripped).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into folded terms.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        The terms, in order
+    """
+    return _WORD_PATTERN.findall(fold(text))
+
+
+class InvertedIndex:
+    """
+    Incrementally maintained inverted index with BM25 ranking and prefix matching.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[str, Dict[Hashable, int]] = {}  # term -> {doc_id: term frequency}
+        self._doc_terms: Dict[Hashable, Dict[str, int]] = {}  # doc_id -> {term: term frequency}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        self._total_length = 0
+        self._terms: List[str] = []  # sorted vocabulary, for prefix lookups
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """
+        Index a document, replacing any earlier version with the same ID.
+
+        Args:
+            doc_id: The document ID
+            text: The document text
+        """
+        terms = tokenize(text)
+        frequencies: Dict[str, int] = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._terms, term)
+                postings[doc_id] = frequency
+            self._doc_terms[doc_id] = frequencies
+            self._doc_lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id: The document ID
+
+        Returns:
+            True if the document was indexed, False otherwise
+        """
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: Hashable) -> bool:
+        frequencies = self._doc_terms.pop(doc_id, None)
+        if frequencies is None:
+            return False
+
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        return True
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Get the indexed terms a query term matches, with their weights."""
+        matches = [(term, 1.0)] if term in self._postings else []
+        if len(term) < MIN_PREFIX_LENGTH:
+            return matches
+
+        start = bisect.bisect_right(self._terms, term)
+        for candidate in self._terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            matches.append((candidate, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Tuple[Hashable, float]]:
+        """
+        Find the documents that best match a query.
+
+        Args:
+            query: The query text; documents matching any of its terms are ranked
+            limit: Maximum number of results (None for all)
+            offset: Number of top results to skip
+
+        Returns:
+            (doc_id, score) tuples, best match first
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or (limit is not None and limit <= 0):
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count or 1.0
+
+            scores: Dict[Hashable, float] = {}
+            for query_term in query_terms:
+                best: Dict[Hashable, float] = {}
+                for term, weight in self._expand(query_term):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, frequency in postings.items():
+                        length_norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length
+                        score = weight * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                        # A query term counts once per document, through its best match
+                        if score > best.get(doc_id, 0.0):
+                            best[doc_id] = score
+                for doc_id, score in best.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+        return ranked[offset:]
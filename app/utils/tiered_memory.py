@@ -14,9 +14,11 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple, Union
 from functools import lru_cache
 
-from app.config.settings import ENABLE_MEMORY_TRACKING
-from app.models.llm import get_llm_model
+from app.config.settings import ENABLE_MEMORY_TRACKING, ENABLE_ROLLING_SUMMARY, ROLLING_SUMMARY_WAIT
+from app.models.llm import get_llm_for_purpose
 from app.utils.memory_db import MemoryDatabase
+from app.utils.memory_jobs import get_memory_job_queue
+from app.utils.rolling_summary import RollingSummary
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -29,28 +31,46 @@ class TieredMemoryManager:
     - Caches memory retrieval results to reduce database calls
     - Only injects memory context at the start of a conversation
     - Creates memories only when explicitly requested or at conversation end
+    - Keeps a rolling conversation summary up to date in the background
     - Uses SQLite for efficient storage and querying
     """
     
-    def __init__(self, user_id: str = "default_user"):
+    def __init__(self, user_id: str = "default_user", llm_model: Optional[str] = None):
         """
         Initialize the memory manager for a specific user.
         
         Args:
             user_id: The user identifier for managing memories
+            llm_model: The session's LLM model, whose auxiliary model writes
+                the summaries (None for the configured default)
         """
         self.user_id = user_id
+        self.llm_model = llm_model
         self.db = MemoryDatabase()
         self.memory_cache = {}  # Cache to store retrieved memories
         self.memory_enabled = ENABLE_MEMORY_TRACKING
         self.current_conversation_id = None
         self.current_messages = []
+        self.rolling_summary = RollingSummary(self._summary_llm)
         
         logger.info(f"TieredMemoryManager initialized for user {user_id}")
         
         if not self.memory_enabled:
             logger.warning("Memory tracking is disabled in settings")
     
+    def set_llm_model(self, llm_model: Optional[str]) -> None:
+        """
+        Switch the model whose auxiliary model writes the summaries.
+        
+        Args:
+            llm_model: The session's LLM model (None for the configured default)
+        """
+        self.llm_model = llm_model
+    
+    def _summary_llm(self) -> Any:
+        """Get the client for summaries: the cheaper auxiliary model of the session's model."""
+        return get_llm_for_purpose('aux', self.llm_model)
+    
     def start_conversation(self, conversation_id: Optional[str] = None) -> str:
         """
         Start a new conversation and prepare memory context.
@@ -66,6 +86,7 @@ class TieredMemoryManager:
             
         self.current_conversation_id = conversation_id
         self.current_messages = []
+        self.rolling_summary.reset()
         
         # Clear cached memories for this conversation
         if conversation_id in self.memory_cache:
@@ -91,6 +112,82 @@ class TieredMemoryManager:
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
+        
+        # Fold each completed exchange into the rolling summary
+        if role == "assistant" and self.memory_enabled and ENABLE_ROLLING_SUMMARY:
+            self.rolling_summary.schedule_update(self.current_messages)
+    
+    def remove_last_message(self, role: str) -> bool:
+        """
+        Remove the last message of the current conversation if it has the given role.
+        
+        Used to roll back a user message whose reply could not be generated.
+        
+        Args:
+            role: The expected role of the last message
+            
+        Returns:
+            True if a message was removed, False otherwise
+        """
+        if self.current_messages and self.current_messages[-1]["role"] == role:
+            self.current_messages.pop()
+            return True
+        return False
+    
+    def get_rolling_summary(self) -> Optional[str]:
+        """
+        Get the latest rolling summary of the current conversation.
+        
+        Returns:
+            The summary text, or None if no summary has been produced yet
+        """
+        if not self.memory_enabled or not ENABLE_ROLLING_SUMMARY:
+            return None
+        return self.rolling_summary.summary or None
+    
+    def save_transcript(self) -> bool:
+        """
+        Store the transcript of the current conversation without ending it.
+        
+        Returns:
+            True if a transcript was stored, False otherwise
+        """
+        if not self.memory_enabled or not self.current_conversation_id or not self.current_messages:
+            return False
+            
+        return self.db.store_conversation_transcript(
+            self.user_id,
+            self.current_conversation_id,
+            self.current_messages
+        )
+    
+    def restore_conversation(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """
+        Resume a conversation from its stored transcript.
+        
+        Args:
+            conversation_id: The conversation ID
+            
+        Returns:
+            The restored messages (empty if no transcript exists)
+        """
+        if not self.memory_enabled:
+            return []
+            
+        try:
+            transcript = self.db.get_conversation_transcript(conversation_id)
+        except Exception as e:
+            logger.error(f"Error restoring conversation {conversation_id}: {e}")
+            return []
+            
+        if not transcript:
+            return []
+            
+        messages = transcript.get("messages", [])
+        self.current_conversation_id = conversation_id
+        self.current_messages = list(messages)
+        self.rolling_summary.reset()
+        return messages
     
     @lru_cache(maxsize=32)
     def get_memory_context(self, conversation_id: str) -> str:
@@ -174,31 +271,132 @@ class TieredMemoryManager:
             
         conversation_id = self.current_conversation_id
         
-        # Store conversation transcript
+        memory_id = None
         if self.memory_enabled:
-            self.db.store_conversation_transcript(
+            summary, summary_covered = None, None
+            if remember and ENABLE_ROLLING_SUMMARY:
+                summary, summary_covered = self.rolling_summary.snapshot(wait=ROLLING_SUMMARY_WAIT)
+            memory_id = self.persist_conversation(
+                conversation_id,
+                self.current_messages,
+                remember,
+                summary,
+                summary_covered=summary_covered
+            )
+            
+        self._reset_conversation()
+        
+        logger.info(f"Ended conversation {conversation_id}")
+        return memory_id
+    
+    def end_conversation_in_background(self, remember: bool = True) -> Optional[str]:
+        """
+        End the current conversation and queue transcript storage and memory
+        creation on the durable memory job queue.
+        
+        Args:
+            remember: Whether to create a memory from this conversation
+            
+        Returns:
+            Job ID if a job was queued, None otherwise
+        """
+        if not self.current_conversation_id or not self.current_messages:
+            logger.warning("No active conversation to end")
+            return None
+            
+        conversation_id = self.current_conversation_id
+        
+        job_id = None
+        if self.memory_enabled:
+            # Hand over the rolling summary as far as it got; the update for
+            # the last exchange is usually still running, and the job folds
+            # in whatever the summary does not cover yet
+            summary, summary_covered = None, None
+            if remember and ENABLE_ROLLING_SUMMARY:
+                summary, summary_covered = self.rolling_summary.snapshot()
+            job_id = get_memory_job_queue().enqueue(
                 self.user_id,
                 conversation_id,
-                self.current_messages
+                self.current_messages,
+                remember=remember,
+                summary=summary or None,
+                summary_covered=summary_covered,
+                llm_model=self.llm_model
             )
+            
+        self._reset_conversation()
         
-        # Create memory if requested
-        memory_id = None
-        if remember and self.memory_enabled:
-            memory_id = self.create_memory_from_conversation(conversation_id, self.current_messages)
+        logger.info(f"Ended conversation {conversation_id}")
+        return job_id
+    
+    def persist_conversation(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        remember: bool = True,
+        summary: Optional[str] = None,
+        strict: bool = False,
+        fallback_summary: bool = True,
+        summary_covered: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Store a conversation transcript and optionally create a memory from it.
+        
+        Args:
+            conversation_id: The conversation ID
+            messages: List of message objects
+            remember: Whether to create a memory from the conversation
+            summary: Precomputed summary to use instead of calling the LLM
+            strict: Raise when the transcript or memory cannot be stored
+                instead of logging it (used by the memory job queue, which
+                retries failed jobs)
+            fallback_summary: Summarize from message excerpts when the LLM
+                fails; when False the failure is an error, so a job can retry
+            summary_covered: Number of leading messages the summary covers
+                (None if it covers them all); the rest are folded into it
+            
+        Returns:
+            Memory ID if created, None otherwise (including when the
+            conversation is too short for a memory)
             
-        # Reset current conversation
+        Raises:
+            RuntimeError: In strict mode, if storing the transcript or memory failed
+        """
+        if not self.memory_enabled:
+            return None
+            
+        # Store conversation transcript
+        stored = self.db.store_conversation_transcript(self.user_id, conversation_id, messages)
+        if not stored and strict:
+            raise RuntimeError(f"Failed to store transcript for conversation {conversation_id}")
+        
+        # Create memory if requested
+        if not remember:
+            return None
+        return self.create_memory_from_conversation(
+            conversation_id,
+            messages,
+            summary=summary,
+            strict=strict,
+            fallback_summary=fallback_summary,
+            summary_covered=summary_covered
+        )
+    
+    def _reset_conversation(self):
+        """Forget the current conversation."""
         self.current_conversation_id = None
         self.current_messages = []
-        
-        logger.info(f"Ended conversation {conversation_id}")
-        return memory_id
+        self.rolling_summary.reset()
     
     def create_memory_from_conversation(
         self, 
         conversation_id: str, 
         messages: List[Dict[str, Any]], 
-        memory_type: str = "short"
+        memory_type: str = "short",
+        summary: Optional[str] = None,
+        strict: bool = False,
+        fallback_summary: bool = True,
+        summary_covered: Optional[int] = None
     ) -> Optional[str]:
         """
         Create a memory from a conversation.
@@ -207,9 +405,17 @@ class TieredMemoryManager:
             conversation_id: The conversation ID
             messages: List of message objects
             memory_type: Memory type (short, mid, long)
+            summary: Precomputed summary to use instead of calling the LLM
+            strict: Raise when summarizing or storing fails instead of returning None
+            fallback_summary: Summarize from message excerpts when the LLM fails
+            summary_covered: Number of leading messages the summary covers
+                (None if it covers them all)
             
         Returns:
             Memory ID if created, None otherwise
+            
+        Raises:
+            RuntimeError: In strict mode, if the memory could not be created
         """
         if not self.memory_enabled or not messages:
             return None
@@ -221,8 +427,13 @@ class TieredMemoryManager:
             return None
             
         try:
-            # Generate summary using LLM
-            summary = self._generate_summary(messages)
+            # Use the given summary (e.g. the rolling summary) when there is one,
+            # folding in the messages it does not cover yet; otherwise
+            # summarize the transcript with the LLM
+            if not summary:
+                summary = self._generate_summary(messages, fallback=fallback_summary)
+            elif summary_covered is not None and summary_covered < len(messages):
+                summary = self._extend_summary(summary, summary_covered, messages, fallback=fallback_summary)
             
             # Create memory object
             timestamp = datetime.now().isoformat()
@@ -249,10 +460,14 @@ class TieredMemoryManager:
                 return memory_id
             else:
                 logger.error(f"Failed to store memory for conversation {conversation_id}")
+                if strict:
+                    raise RuntimeError(f"Failed to store memory for conversation {conversation_id}")
                 return None
                 
         except Exception as e:
             logger.error(f"Error creating memory: {e}")
+            if strict:
+                raise RuntimeError(f"Error creating memory for conversation {conversation_id}: {e}") from e
             return None
     
     def create_memory_now(self, content: str, memory_type: str = "short") -> Optional[str]:
@@ -305,12 +520,14 @@ class TieredMemoryManager:
             logger.error(f"Error creating custom memory: {e}")
             return None
     
-    def _generate_summary(self, messages: List[Dict[str, Any]]) -> str:
+    def _generate_summary(self, messages: List[Dict[str, Any]], fallback: bool = True) -> str:
         """
         Generate a summary of a conversation using the LLM.
         
         Args:
             messages: List of message objects
+            fallback: Return a summary built from message excerpts if the LLM
+                fails, instead of raising
             
         Returns:
             Summary text
@@ -336,8 +553,8 @@ class TieredMemoryManager:
             Summary:
             """
             
-            # Get LLM instance (using singleton pattern)
-            llm = get_llm_model()
+            # Summaries go to the cheaper auxiliary model
+            llm = self._summary_llm()
             
             # Generate summary
             response = llm.invoke(prompt)
@@ -361,9 +578,38 @@ class TieredMemoryManager:
             
         except Exception as e:
             logger.error(f"Error creating conversation summary: {e}")
+            if not fallback:
+                raise
             # Fallback to a simple summary
             return self._create_fallback_summary(messages)
     
+    def _extend_summary(self,
+                        summary: str,
+                        covered: int,
+                        messages: List[Dict[str, Any]],
+                        fallback: bool = True) -> str:
+        """
+        Fold the messages a partial summary does not cover into it.
+        
+        Args:
+            summary: Summary of the first messages
+            covered: Number of messages the summary covers
+            messages: All messages of the conversation
+            fallback: Keep the partial summary if the LLM fails, instead of raising
+            
+        Returns:
+            Summary text
+        """
+        rolling_summary = RollingSummary(self.rolling_summary.llm_factory)
+        rolling_summary.reset(summary, covered)
+        try:
+            return rolling_summary.update_now(messages)
+        except Exception as e:
+            logger.error(f"Error extending conversation summary: {e}")
+            if not fallback:
+                raise
+            return summary
+    
     def _create_fallback_summary(self, messages: List[Dict[str, Any]]) -> str:
         """
         Create a simple summary by extracting parts of messages when LLM is unavailable.
@@ -415,7 +661,6 @@ class TieredMemoryManager:
         
         try:
             conn = self.db._get_connection()
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
             cursor.execute(
@@ -424,7 +669,6 @@ class TieredMemoryManager:
             )
             
             rows = cursor.fetchall()
-            conn.close()
             
             for row in rows:
                 data = dict(row)
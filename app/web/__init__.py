@@ -16,10 +16,11 @@ def create_app():
                 template_folder='templates')
     
     # Configure the app
-    app.config['SECRET_KEY'] = 'bahai-life-coach-secret-key'
+    from app.config.settings import FLASK_SECRET_KEY
+    app.config['SECRET_KEY'] = FLASK_SECRET_KEY
     
     # Register blueprints
-    from app.web.routes import main
-    app.register_blueprint(main)
+    from app.web.routes import web_bp
+    app.register_blueprint(web_bp)
     
     return app 
\ No newline at end of file
@@ -3,7 +3,7 @@ Routes for the Bahai Life Coach web interface.
 """
 
 # Import Flask and Blueprint classes first to avoid circular imports
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response, stream_with_context
 
 # Create a Blueprint before importing anything from app
 web_bp = Blueprint('web', __name__)
@@ -18,7 +18,8 @@ from datetime import datetime
 from pathlib import Path
 import re
 
-from app.agents.agent_adapter import get_agent
+from app.agents.agent_adapter import AgentAdapter, get_agent
+from app.agents.session_registry import get_session_registry
 from app.config.settings import (
     ENABLE_GOOGLE_INTEGRATION,
     ENABLE_SPEECH,
@@ -26,10 +27,19 @@ from app.config.settings import (
     SPEECH_RATE,
     SPEECH_PITCH,
     SPEECH_PAUSE_THRESHOLD,
+    ENABLE_RESPONSE_CACHE,
+    MEMORY_SEARCH_DEFAULT_LIMIT,
+    MEMORY_SEARCH_MAX_LIMIT,
     validate_configuration
 )
 from app.models.llm import get_llm_model
+from app.models.response_cache import get_response_cache
+from app.models.router import get_breaker_stats
+from app.integrations.task_extraction import get_task_extraction_stats
+from app.models.rate_limiter import RateLimitExceeded
+from app.utils.deadline import Deadline
 from app.utils.memory_db import MemoryDB
+from app.utils.memory_jobs import get_memory_job_queue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -69,6 +79,12 @@ def chat():
         include_memories = data.get('include_memories', False)
         settings = data.get('settings', {})
         
+        # Latency budget for this request (client-supplied or the configured default)
+        try:
+            deadline = Deadline.from_ms(data.get('deadline_ms'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'error': str(e)}), 400
+        
         # Update session settings if provided
         if settings:
             session['speech_enabled'] = settings.get('speech_enabled', True)
@@ -84,18 +100,32 @@ def chat():
         )
         
         # Process user input
-        response, metadata = agent.process_input(user_input)
+        response, metadata = agent.process_input(user_input, deadline)
         
         # Format response
         result = {
             'status': 'success',
             'response': response,
             'conversation_id': metadata.get('conversation_id'),
-            'insights': metadata.get('insights', [])
+            'turn': metadata.get('turn'),
+            'insights': metadata.get('insights', []),
+            'insights_pending': metadata.get('insights_pending', False),
+            'skipped_stages': metadata.get('skipped_stages', [])
         }
         
         return jsonify(result)
     
+    except RateLimitExceeded as e:
+        logger.warning(f"Chat request rate limited: {str(e)}")
+        response = jsonify({
+            'status': 'error',
+            'error': str(e),
+            'retry_after': e.retry_after
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
         return jsonify({
@@ -103,6 +133,83 @@ def chat():
             'error': str(e)
         })
 
+@web_bp.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle chat API requests, streaming the reply as Server-Sent Events."""
+    try:
+        data = request.json
+        user_input = data.get('message', '')
+        conversation_id = data.get('conversation_id')
+        include_memories = data.get('include_memories', False)
+        settings = data.get('settings', {})
+        
+        # Update session settings if provided
+        if settings:
+            session['speech_enabled'] = settings.get('speech_enabled', True)
+            session['google_enabled'] = settings.get('google_enabled', False)
+            session['llm_model'] = settings.get('llm_model', 'gemini-2.0-flash')
+        
+        # Get agent with current settings
+        agent = get_agent(
+            llm_model=session.get('llm_model', 'gemini-2.0-flash'),
+            google_enabled=session.get('google_enabled', False),
+            conversation_id=conversation_id,
+            include_memories=include_memories
+        )
+    
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        })
+    
+    def generate():
+        for event in agent.stream_input(user_input):
+            event_type = event.pop('type')
+            yield format_sse(event_type, event)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@web_bp.route('/api/insights/<conversation_id>/<int:turn>', methods=['GET'])
+def get_turn_insights(conversation_id, turn):
+    """Get the reflection questions generated in the background for a turn."""
+    try:
+        agent = get_session_registry().get(conversation_id)
+        if agent is None:
+            return jsonify({
+                'status': 'error',
+                'message': f'Conversation {conversation_id} is not active'
+            }), 404
+        
+        result = agent.agent.get_turn_insights(turn)
+        if result['status'] == 'unknown':
+            return jsonify({
+                'status': 'error',
+                'message': f'No insights for turn {turn}'
+            }), 404
+        
+        return jsonify({
+            'status': result['status'],
+            'conversation_id': conversation_id,
+            'turn': turn,
+            'insights': result['insights']
+        })
+    
+    except Exception as e:
+        logger.error(f"Error retrieving insights: {str(e)}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 500
+
 @web_bp.route('/api/settings', methods=['POST'])
 def update_settings():
     """Update user settings."""
@@ -188,16 +295,30 @@ def search_memories():
     """Search memories using a query string."""
     try:
         query = request.args.get('query', '')
+        try:
+            limit = int(request.args.get('limit', MEMORY_SEARCH_DEFAULT_LIMIT))
+            offset = int(request.args.get('offset', 0))
+            if limit < 1 or offset < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit must be a positive integer and offset a non-negative integer',
+                'memories': []
+            }), 400
+        limit = min(limit, MEMORY_SEARCH_MAX_LIMIT)
         
         # Initialize memory DB
         memory_db = MemoryDB()
         
         # Search memories
-        memories = memory_db.search_memories(query)
+        memories = memory_db.search_memories(query, limit=limit, offset=offset)
         
         return jsonify({
             'status': 'success',
-            'memories': memories
+            'memories': memories,
+            'limit': limit,
+            'offset': offset
         })
     except Exception as e:
         logger.error(f"Error searching memories: {str(e)}", exc_info=True)
@@ -290,25 +411,84 @@ def end_session():
         if not conversation_id:
             return jsonify({'status': 'error', 'message': 'No conversation ID provided'}), 400
         
-        # Get agent with the existing conversation ID
-        agent = get_agent(
-            llm_model=session.get('llm_model', 'gemini-2.0-flash'),
-            google_enabled=session.get('google_enabled', False),
-            conversation_id=conversation_id
-        )
+        # The session is finished, so it no longer needs to stay warm. A cold
+        # conversation is restored from its transcript without registering it,
+        # which could evict another warm session
+        agent = get_session_registry().pop(conversation_id)
+        if agent is None:
+            agent = AgentAdapter(
+                llm_model=session.get('llm_model', 'gemini-2.0-flash'),
+                google_enabled=session.get('google_enabled', False),
+                conversation_id=conversation_id
+            )
+        
+        # End conversation; the transcript and memory are stored by a background job
+        with agent.lock:
+            job_id = agent.agent.end_conversation_in_background(remember=remember)
+        
+        if not job_id:
+            return jsonify({
+                'status': 'success',
+                'message': 'Conversation ended successfully',
+                'memory_id': None
+            })
         
-        # End conversation
-        result = agent.agent.end_conversation(remember=remember)
+        return jsonify({
+            'status': 'success',
+            'message': 'Conversation ended, memory is being created',
+            'job_id': job_id,
+            'job_status': 'queued'
+        }), 202
+    except Exception as e:
+        logger.error(f"Error ending session: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@web_bp.route('/api/end_session/<job_id>', methods=['GET'])
+def end_session_status(job_id):
+    """Get the status of the memory job queued when a session ended."""
+    try:
+        job = get_memory_job_queue().get_job(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Unknown job'}), 404
         
         return jsonify({
             'status': 'success',
-            'message': 'Conversation ended successfully',
-            'memory_id': result
+            'job': job,
+            'memory_ready': job['status'] == 'done'
         })
     except Exception as e:
-        logger.error(f"Error ending session: {str(e)}", exc_info=True)
+        logger.error(f"Error getting memory job status: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@web_bp.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    """Get LLM response cache metrics, provider circuit breaker states and task extraction paths."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'response_cache': get_response_cache().stats() if ENABLE_RESPONSE_CACHE else None,
+            'circuit_breakers': get_breaker_stats(),
+            'task_extraction': get_task_extraction_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting LLM stats: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Helper functions for streaming
+
+def format_sse(event, data):
+    """
+    Format a Server-Sent Event.
+    
+    Args:
+        event (str): The event name
+        data (dict): The event payload, sent as JSON
+        
+    Returns:
+        str: The encoded event
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 # Helper functions for memory management
 
 def create_short_term_memory(conversation_id, user_input, assistant_response):
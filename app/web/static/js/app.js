@@ -114,84 +114,172 @@ function sendMessage() {
         window.stopListening();
     }
     
-    // Send request to server
-    fetch('/api/chat', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-            user_input: userInput,
-            conversation_id: conversationId,
-            speech_enabled: currentSettings.speechEnabled,
-            google_enabled: currentSettings.googleEnabled,
-            llm_provider: currentSettings.llmProvider,
-            memory_enabled: currentSettings.memoryEnabled
-        })
-    })
-    .then(response => response.json())
-    .then(data => {
-        // Hide loading
+    // Stream the reply from the server as it is generated
+    let assistantParagraph = null;
+    let streamedText = '';
+    
+    // Display the assistant message element once content arrives
+    const showAssistantMessage = (text) => {
         if (loadingOverlay) loadingOverlay.classList.add('hidden');
-        
-        // Store conversation ID for future requests
-        conversationId = data.conversation_id;
-        
-        // Display assistant message
-        const assistantMessageElement = document.createElement('div');
-        assistantMessageElement.className = 'message assistant';
-        assistantMessageElement.innerHTML = `
-            <div class="message-content">
-                <p>${formatMessage(data.reply)}</p>
-            </div>
-        `;
-        chatMessages.appendChild(assistantMessageElement);
+        if (!assistantParagraph) {
+            const assistantMessageElement = document.createElement('div');
+            assistantMessageElement.className = 'message assistant';
+            assistantMessageElement.innerHTML = `
+                <div class="message-content">
+                    <p></p>
+                </div>
+            `;
+            chatMessages.appendChild(assistantMessageElement);
+            assistantParagraph = assistantMessageElement.querySelector('p');
+        }
+        assistantParagraph.innerHTML = formatMessage(text);
         
         // Scroll to bottom
         chatMessages.scrollTop = chatMessages.scrollHeight;
-        
-        // Speak the reply if speech is enabled
-        if (currentSettings.speechEnabled && typeof window.speakText === 'function') {
-            window.speakText(data.reply);
-        }
-        
-        // Update any insights if available
-        if (data.insights && data.insights.length > 0) {
-            updateInsights(data.insights);
-        }
-        
-        // Resume listening after response if it was active before
+    };
+    
+    // Resume listening after response if it was active before
+    const resumeListening = () => {
         if (currentSettings.speechEnabled && typeof window.startListening === 'function') {
             setTimeout(() => {
                 window.startListening();
             }, 1000); // Small delay to avoid conflict with TTS
         }
-    })
-    .catch(error => {
-        console.error('Error sending message:', error);
-        
-        // Hide loading
+    };
+    
+    // Display an error message
+    const showError = (text) => {
         if (loadingOverlay) loadingOverlay.classList.add('hidden');
         
-        // Display error message
         const errorMessageElement = document.createElement('div');
         errorMessageElement.className = 'message assistant error';
         errorMessageElement.innerHTML = `
             <div class="message-content">
-                <p>Sorry, there was an error processing your request. Please try again.</p>
+                <p>${text}</p>
             </div>
         `;
         chatMessages.appendChild(errorMessageElement);
         
         // Scroll to bottom
         chatMessages.scrollTop = chatMessages.scrollHeight;
-        
-        // Resume listening if it was active
-        if (currentSettings.speechEnabled && typeof window.startListening === 'function') {
-            setTimeout(() => {
-                window.startListening();
-            }, 1000);
+    };
+    
+    streamChat({
+        message: userInput,
+        conversation_id: conversationId,
+        settings: {
+            speech_enabled: currentSettings.speechEnabled,
+            google_enabled: currentSettings.googleEnabled,
+            llm_model: currentSettings.llmProvider
+        },
+        include_memories: currentSettings.memoryEnabled
+    }, {
+        token: (data) => {
+            streamedText += data.content;
+            showAssistantMessage(streamedText);
+        },
+        done: (data) => {
+            // Store conversation ID for future requests
+            conversationId = data.conversation_id;
+            
+            showAssistantMessage(data.response);
+            
+            // Speak the reply if speech is enabled
+            if (currentSettings.speechEnabled && typeof window.speakText === 'function') {
+                window.speakText(data.response);
+            }
+            
+            // Update any insights if available
+            if (data.insights && data.insights.length > 0 && typeof updateInsights === 'function') {
+                updateInsights(data.insights);
+            }
+            
+            resumeListening();
+        },
+        insights: (data) => {
+            // Reflection questions are pushed once generated in the background
+            if (data.insights && data.insights.length > 0 && typeof updateInsights === 'function') {
+                updateInsights(data.insights);
+            }
+        },
+        error: (data) => {
+            showError(data.response || 'Sorry, there was an error processing your request. Please try again.');
+            resumeListening();
         }
+    })
+    .catch(error => {
+        console.error('Error sending message:', error);
+        showError('Sorry, there was an error processing your request. Please try again.');
+        resumeListening();
+    });
+}
+
+// Send a chat message to the streaming endpoint and dispatch the
+// Server-Sent Events of the reply (token, done, error) to the handlers
+function streamChat(payload, handlers) {
+    return fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(payload)
+    })
+    .then(response => {
+        if (!response.ok || !response.body) {
+            throw new Error('Network response was not ok');
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        const dispatch = (block) => {
+            let eventName = 'message';
+            const dataLines = [];
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    eventName = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    // Multi-line data fields are joined with newlines, per the SSE spec
+                    const value = line.slice(5);
+                    dataLines.push(value.startsWith(' ') ? value.slice(1) : value);
+                }
+            });
+            const data = dataLines.join('\n');
+            if (!data || !handlers[eventName]) {
+                return;
+            }
+            let parsed;
+            try {
+                parsed = JSON.parse(data);
+            } catch (e) {
+                console.error('Error parsing stream event:', e);
+                if (handlers.error) {
+                    handlers.error({});
+                }
+                return;
+            }
+            handlers[eventName](parsed);
+        };
+        
+        const read = () => reader.read().then(({ done, value }) => {
+            if (done) {
+                if (buffer.trim()) {
+                    dispatch(buffer);
+                }
+                return;
+            }
+            
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                dispatch(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+            }
+            return read();
+        });
+        
+        return read();
     });
 }
 
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for intent detection.
+
+Compares the single-pass detector in app/integrations/intents.py with the
+previous approach, which ran the agent's keyword scans, the integration
+manager's regex lists and the explicit-memory regexes one after another.
+
+Usage:
+    python benchmark_intents.py [--messages N]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app.integrations.intents import detect_intents
+
+SAMPLE_MESSAGES = [
+    "Remind me to call my mother by Friday",
+    "What do you remember about my goals for this year?",
+    "Please remember that I volunteer at the community garden on Saturdays.",
+    "Can you show my calendar for tomorrow?",
+    "I've finished the report, can you mark it as completed?",
+    "I have been feeling overwhelmed at work lately and I am not sure how to balance service and family.",
+    "Add a task to prepare for the study circle next week",
+    "Do I have any meetings this afternoon?",
+    "What do I need to do today?",
+    "I keep procrastinating on my morning prayers and I would like some encouragement.",
+]
+
+# The scans the detector replaced, as they ran before
+LEGACY_PATTERNS = [
+    r"(schedule|create|add|set up|organize|book|plan)\s+(a|an|the)?\s*(meeting|event|appointment|reminder)",
+    r"remind me (to|about|of)",
+    r"(add|put) (this|that|it) (on|in) my calendar",
+    r"add (an|a) event",
+    r"schedule (for|on|at)",
+    r"(show|check|view|get|what( is|'s))\s+my\s+(calendar|schedule|agenda)",
+    r"(what do I have|what's|what is)(\s+planned|\s+scheduled)?\s+(today|tomorrow|this week|next week|on)",
+    r"(do I have|are there) any (events|meetings|appointments)",
+    r"(add|create|make)\s+(a|an|the)?\s*(task|to-?do|item|reminder)",
+    r"(remind me to|add to my to-?do list)",
+    r"I need to (remember to|do)",
+    r"(show|check|view|get|what( is|'s))\s+my\s+(tasks|to-?do list)",
+    r"what do I need to do",
+    r"(show|list) (all|my)?\s*(tasks|to-?dos)",
+    r"(mark|set)\s+(as)?\s*completed",
+    r"(I('ve| have)|i) (finished|completed|done)",
+    r"(mark|check) off",
+    r"remember that (.+?)(?:\.|$)",
+    r"remember this:?\s*(.+?)(?:\.|$)",
+    r"please remember (?:that )?(.+?)(?:\.|$)",
+    r"can you remember (?:that )?(.+?)(?:\.|$)",
+    r"store this (?:information|fact):?\s*(.+?)(?:\.|$)",
+]
+
+
+def legacy_detect(text):
+    """Run the old keyword checks and regexes in sequence."""
+    found = []
+    if "what do you remember about" in text.lower() or "recall our discussions on" in text.lower():
+        found.append("memory_recall")
+    lowered = text.lower()
+    if any(keyword in lowered for keyword in ["calendar", "schedule", "appointment", "meeting", "event"]):
+        found.append("calendar_mention")
+    if any(keyword in lowered for keyword in ["task", "todo", "to-do", "to do", "reminder"]):
+        found.append("task_mention")
+    if any(verb in lowered for verb in ["add", "create", "make", "set"]):
+        found.append("create_verb")
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            found.append(pattern)
+    return found
+
+
+def run(label, detect, messages):
+    """Time a detector over the messages and print its throughput."""
+    start = time.perf_counter()
+    for message in messages:
+        detect(message)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {len(messages) / elapsed:>12,.0f} messages/s  {elapsed / len(messages) * 1e6:8.1f} us/message")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent detection throughput")
+    parser.add_argument("--messages", type=int, default=100000, help="Number of messages to classify")
+    args = parser.parse_args()
+
+    random.seed(42)
+    messages = [random.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+
+    # Warm up both paths (regex compilation, caches)
+    for message in SAMPLE_MESSAGES:
+        legacy_detect(message)
+        detect_intents(message)
+
+    legacy = run("legacy", legacy_detect, messages)
+    single_pass = run("single-pass", detect_intents, messages)
+    print(f"speedup: {legacy / single_pass:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
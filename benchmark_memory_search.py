@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Search latency benchmark for MemoryDatabase.
+
+Fills a memory database with generated memories and compares the full-text
+search in MemoryDatabase.search_memories (FTS5, BM25-ranked) with the
+previous LIKE '%query%' scan. Before timing, it checks that the search folds
+diacritics and apostrophes the way text_index.fold does, and that snippets
+show the original text.
+
+Usage:
+    python benchmark_memory_search.py [--rows N] [--users N]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from app.utils.memory_db import MemoryDatabase
+
+WORDS = (
+    "prayer service family work stress youth devotional community study circle patience joy "
+    "detachment unity justice meditation gratitude courage kindness reflection goal habit "
+    "morning evening friend neighbour garden teaching learning balance health rest"
+).split()
+
+QUERIES = ["prayer", "study circle", "gratitude morning", "medit", "justice unity courage"]
+
+
+def make_vocabulary(size=20000):
+    """Build a vocabulary with Zipf-like word frequencies, the theme words spread across it."""
+    syllables = ["ba", "ha", "ri", "lo", "me", "ta", "ne", "so", "ku", "vi", "da", "fe"]
+    words = ["".join(parts) for parts in itertools.product(syllables, repeat=4)]
+    random.shuffle(words)
+    words = words[:size]
+    for rank, word in zip(range(50, size, size // len(WORDS)), WORDS):
+        words[rank] = word
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+def fill(db, rows, users):
+    """Insert generated memories in one transaction."""
+    conn = db._get_connection()
+    random.seed(42)
+    words, cum_weights = make_vocabulary()
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO memories (id, user_id, conversation_id, content, memory_type, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    f"m{i}",
+                    f"user-{i % users}",
+                    f"conv-{i // 20}",
+                    " ".join(random.choices(words, cum_weights=cum_weights, k=40)),
+                    random.choice(["short", "mid", "long"]),
+                    f"2024-01-01T00:00:{i:09d}",
+                    f"2024-01-01T00:00:{i:09d}"
+                )
+                for i in range(rows)
+            )
+        )
+
+
+def check_folding(db):
+    """Check that queries match memories regardless of case, diacritics and apostrophes."""
+    for i, content in enumerate(["Reflections on the Bahá'í writings", "Baha’i community life"]):
+        db.store_memory({
+            'id': f"folding-{i}",
+            'user_id': "folding-check",
+            'conversation_id': "folding-check",
+            'content': content,
+            'type': "long",
+            'created_at': "2024-01-01T00:00:00",
+            'updated_at': "2024-01-01T00:00:00"
+        })
+    for query in ["bahai", "Bahá'í", "BAHA"]:
+        results = db.search_memories("folding-check", query)
+        found = sorted(memory['id'] for memory in results)
+        if found != ["folding-0", "folding-1"]:
+            raise SystemExit(f"Folding check failed: {query!r} found {found}")
+        # Snippets show the original text, not the folded text that was matched
+        snippets = sorted(memory['snippet'] for memory in results)
+        if snippets != ["**Baha’i** community life", "Reflections on the **Bahá'í** writings"]:
+            raise SystemExit(f"Folding check failed: {query!r} gave snippets {snippets}")
+    print("Folding check passed")
+
+
+def run(label, search, user_id, repeats=20):
+    """Time a search function over the sample queries."""
+    timings = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            search(user_id, query, 10)
+        timings.append((time.perf_counter() - start) / repeats)
+    print(f"{label:<6} " + "  ".join(f"{query!r}: {t * 1e3:7.2f} ms" for query, t in zip(QUERIES, timings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory search latency")
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of memories to generate")
+    parser.add_argument("--users", type=int, default=10, help="Number of users the memories belong to")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="memory_search_bench_")
+    try:
+        db = MemoryDatabase(os.path.join(path, "memory.db"))
+        check_folding(db)
+        print(f"Generating {args.rows:,} memories...")
+        start = time.perf_counter()
+        fill(db, args.rows, args.users)
+        print(f"Inserted and indexed in {time.perf_counter() - start:.1f}s")
+
+        run("fts5", db.search_memories, "user-0")
+        run("like", db._search_memories_like, "user-0", repeats=2)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
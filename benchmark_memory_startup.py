@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for MemoryDB.
+
+Generates a memory store on disk and compares the previous startup, which
+globbed and parsed every memory file, with the manifest-based startup in
+app/utils/memory_db.py: a cold start (no manifest yet), a warm start (nothing
+changed) and an incremental start after a few memories were added.
+
+Usage:
+    python benchmark_memory_startup.py [--memories N] [--conversations N]
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+
+def generate_store(path, memories, conversations):
+    """Write memory files in the MemoryDB layout (<conversation>/<type>/<id>_<timestamp>.json)."""
+    start = datetime(2024, 1, 1)
+    types = ['short', 'mid', 'long']
+    for i in range(memories):
+        conversation_id = f"conv-{i % conversations}"
+        memory_type = types[i % len(types)]
+        created_at = (start + timedelta(minutes=i)).isoformat()
+        memory = {
+            'id': str(uuid.uuid4()),
+            'conversation_id': conversation_id,
+            'type': memory_type,
+            'content': f"Reflection {i} on prayer, service and family life in the community.",
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+        directory = os.path.join(path, conversation_id, memory_type)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{memory['id']}_{i:014d}.json"), 'w') as f:
+            json.dump(memory, f)
+
+
+def legacy_startup(path):
+    """Load every memory file, as MemoryDB did before the manifest."""
+    cache = {'short': {}, 'mid': {}, 'long': {}}
+    for memory_type in cache:
+        for file_path in glob.glob(os.path.join(path, '*', memory_type, '*.json')):
+            with open(file_path, 'r') as f:
+                memory = json.load(f)
+            cache[memory_type].setdefault(memory.get('conversation_id', 'default'), []).append(memory)
+    return cache
+
+
+def manifest_startup(path):
+    """Create a fresh MemoryDB instance on the store."""
+    from app.utils.memory_db import MemoryDB
+    MemoryDB._instance = None
+    os.environ['MEMORY_STORAGE_PATH'] = path
+    return MemoryDB()
+
+
+def measure(label, startup, path):
+    """Time a startup and report its peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = startup(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {elapsed:8.2f} s  {peak / 2**20:8.1f} MiB peak")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MemoryDB startup")
+    parser.add_argument("--memories", type=int, default=100000, help="Number of memory files to generate")
+    parser.add_argument("--conversations", type=int, default=500, help="Number of conversations")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="memory_bench_")
+    try:
+        print(f"Generating {args.memories:,} memories in {path}...")
+        generate_store(path, args.memories, args.conversations)
+        # Let directory mtimes settle so the manifest records them
+        time.sleep(2.5)
+
+        measure("legacy", legacy_startup, path)
+        measure("cold manifest", manifest_startup, path)
+        measure("warm", manifest_startup, path)
+
+        db = manifest_startup(path)
+        for i in range(10):
+            db.add_memory({
+                'id': str(uuid.uuid4()),
+                'conversation_id': f"conv-{i}",
+                'type': 'short',
+                'content': f"New memory {i}"
+            })
+        measure("incremental", manifest_startup, path)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,9 @@ try:
             google_api_key=GEMINI_API_KEY,
             temperature=0.7
         )
+        # Re-runs over the same conversations reuse the cached summaries
+        from app.models.response_cache import CachedLLM
+        llm = CachedLLM(llm, gemini_model, temperature=0.7)
         logger.info(f"Gemini LLM initialized with model: {gemini_model}")
     else:
         logger.warning("Gemini API key not found in environment variables, will use fallback method")
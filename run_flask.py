@@ -109,6 +109,11 @@ def main():
     import app.agents.agent_adapter
     logger.info("🧠 Agent adapter initialized")
 
+    # Start the memory job worker, resuming jobs left over from the last run
+    from app.utils.memory_jobs import get_memory_job_queue
+    get_memory_job_queue()
+    logger.info("🗂️ Memory job queue started")
+
     # Import and register the blueprint
     from app.web.routes import web_bp
     flask_app.register_blueprint(web_bp)